@@ -0,0 +1,208 @@
+"""
+Measures the latency of the prefix name and tag number filters and of the pregnancy status filter
+of the dairy lists at 100k rows, against `icontains` queries for the same values.
+
+The inseminators, cows and pregnancies are seeded in bulk into a throwaway test database of the
+backend configured by the `EFARM_DB_*` environment variables (see efarm/database.py). Each filter
+is timed as an `icontains` query and as the queryset of its FilterSet, fetching the ids of the
+matching rows so the figures measure the database rather than building models.
+
+Usage, from the efarm-backend directory:
+
+    python benchmarks/filter_latency.py
+    python benchmarks/filter_latency.py --rows 10000 --repeats 50
+    EFARM_DB_ENGINE=postgresql EFARM_DB_USER=efarm EFARM_DB_PASSWORD=efarm python benchmarks/filter_latency.py
+
+"""
+import argparse
+import json
+import random
+import statistics
+import string
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from write_throughput import setup_django
+
+BATCH_SIZE = 5000
+
+
+def random_name(generator):
+    return generator.choice(string.ascii_uppercase) + "".join(
+        generator.choices(string.ascii_lowercase, k=generator.randint(4, 9))
+    )
+
+
+def seed(rows, generator):
+    """
+    Creates `rows` inseminators, cows and pregnancies, returning the values filtered by.
+    """
+    from django.db import connection
+
+    from dairy.choices import CowBreedChoices, PregnancyStatusChoices, SexChoices
+    from dairy.models import Cow, CowBreed, Inseminator, Pregnancy
+    from efarm.lookups import normalize_text
+
+    names = [(random_name(generator), random_name(generator)) for _ in range(rows)]
+    Inseminator.objects.bulk_create(
+        [
+            Inseminator(
+                first_name=first_name,
+                last_name=last_name,
+                normalized_first_name=normalize_text(first_name),
+                normalized_last_name=normalize_text(last_name),
+                phone_number=f"+2547{number:08d}",
+                sex=SexChoices.MALE,
+                license_number=f"LIC-{number}",
+            )
+            for number, (first_name, last_name) in enumerate(names)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    breeds = [CowBreed.objects.create(name=name) for name in CowBreedChoices.values]
+    cows = []
+    # Ids are given so the tag numbers, which hold them, are known before inserting
+    for pk in range(1, rows + 1):
+        breed = generator.choice(breeds)
+        date_of_birth = date(2015, 1, 1) + timedelta(days=generator.randrange(3000))
+        cows.append(
+            Cow(
+                pk=pk,
+                name=random_name(generator),
+                breed=breed,
+                date_of_birth=date_of_birth,
+                gender=SexChoices.FEMALE,
+                tag_number=f"{breed.name[:2].upper()}-{date_of_birth.year}-{pk}",
+            )
+        )
+    Cow.objects.bulk_create(cows, batch_size=BATCH_SIZE)
+
+    # Most pregnancies are confirmed, few fail
+    statuses = generator.choices(
+        PregnancyStatusChoices.values, weights=[80, 19, 1], k=rows
+    )
+    Pregnancy.objects.bulk_create(
+        [
+            Pregnancy(
+                cow_id=generator.randint(1, rows),
+                start_date=date(2023, 1, 1) + timedelta(days=generator.randrange(700)),
+                pregnancy_status=pregnancy_status,
+            )
+            for pregnancy_status in statuses
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    first_name, last_name = generator.choice(names)
+    tag_number = generator.choice(cows).tag_number
+    return {
+        "first_name": first_name[:3].lower(),
+        "last_name": last_name[:4].upper(),
+        # The tag numbers sharing all but the last digit of the id of a cow
+        "tag_number": tag_number[:-1].lower(),
+        "pregnancy_status": "fail",
+    }
+
+
+def measure(queryset, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ids = list(queryset.values_list("pk", flat=True))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "rows": len(ids),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+def run(rows, repeats, seed_value):
+    """
+    Benchmarks the filters, returning the results by filter.
+    """
+    from dairy.filters import CowFilterSet, InseminatorFilterSet, PregnancyFilterSet
+    from dairy.models import Cow, Inseminator, Pregnancy
+
+    values = seed(rows, random.Random(seed_value))
+    filters = {
+        "inseminator first name": (
+            Inseminator.objects.filter(first_name__icontains=values["first_name"]),
+            InseminatorFilterSet(
+                {"first_name_prefix": values["first_name"]}, queryset=Inseminator.objects.all()
+            ).qs,
+        ),
+        "inseminator last name": (
+            Inseminator.objects.filter(last_name__icontains=values["last_name"]),
+            InseminatorFilterSet(
+                {"last_name_prefix": values["last_name"]}, queryset=Inseminator.objects.all()
+            ).qs,
+        ),
+        "cow tag number": (
+            Cow.objects.filter(tag_number__icontains=values["tag_number"]),
+            CowFilterSet(
+                {"tag_number_prefix": values["tag_number"]}, queryset=Cow.objects.all()
+            ).qs,
+        ),
+        "pregnancy cow": (
+            Pregnancy.objects.filter(cow__tag_number__icontains=values["tag_number"]),
+            PregnancyFilterSet(
+                {"cow_prefix": values["tag_number"]}, queryset=Pregnancy.objects.all()
+            ).qs,
+        ),
+        "pregnancy status": (
+            Pregnancy.objects.filter(pregnancy_status__icontains=values["pregnancy_status"]),
+            PregnancyFilterSet(
+                {"pregnancy_status": values["pregnancy_status"]},
+                queryset=Pregnancy.objects.all(),
+            ).qs,
+        ),
+    }
+    return {
+        name: {"icontains": measure(before, repeats), "indexed": measure(after, repeats)}
+        for name, (before, after) in filters.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=100000, help="Rows per table.")
+    parser.add_argument("--repeats", type=int, default=20, help="Runs of each query.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random names.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            # A file rather than the in-memory database the test runner defaults to
+            connection.settings_dict["TEST"]["NAME"] = str(Path(directory) / "benchmark.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = run(args.rows, args.repeats, args.seed)
+        finally:
+            connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+
+    if args.json:
+        print(json.dumps({"backend": connection.vendor, "rows": args.rows, "filters": results}))
+        return
+
+    print(f"{connection.vendor}, {args.rows} rows per table, median of {args.repeats} runs")
+    print(f"{'filter':<24}{'rows':>6}{'icontains ms':>14}{'indexed ms':>12}{'p95 ms':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<24}{result['indexed']['rows']:>6}{result['icontains']['median_ms']:>14}"
+            f"{result['indexed']['median_ms']:>12}{result['indexed']['p95_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
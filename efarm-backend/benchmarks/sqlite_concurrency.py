@@ -0,0 +1,156 @@
+"""
+Runs dashboard reads and milk inserts side by side on SQLite, with the stock Django backend and
+with the tuned profile of efarm/backends/sqlite3, counting "database is locked" errors.
+
+Readers request the `dairy/admin/dashboard/*` endpoints in a loop while writers record milk
+for their own cow, against a throwaway database file migrated like the test suite does.
+
+Usage, from the efarm-backend directory:
+
+    python benchmarks/sqlite_concurrency.py
+    python benchmarks/sqlite_concurrency.py --profiles tuned --readers 8 --writers 8 --writes 100
+
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from write_throughput import record_milk, seed, setup_django
+
+PROFILES = {
+    "stock": "django.db.backends.sqlite3",
+    "tuned": "efarm.backends.sqlite3",
+}
+
+DASHBOARD_URLS = [
+    "/dairy/admin/dashboard/daily-milk-production",
+    "/dairy/admin/dashboard/milked-cows",
+    "/dairy/admin/dashboard/total-alive-cows",
+    "/dairy/admin/dashboard/weekly-milk-chart-data",
+    "/dairy/admin/dashboard/pregnant-cows",
+    "/dairy/admin/dashboard/lactating-cows",
+]
+
+
+def run_profile(profile, readers, writers, writes):
+    """
+    Benchmarks a profile, printing the results as JSON.
+    """
+    os.environ["EFARM_DB_ENGINE"] = "sqlite"
+    setup_django(engine=PROFILES[profile])
+    from django.db import OperationalError, connection
+    from django.test import Client
+
+    def count_error(errors, error):
+        errors[str(error)] = errors.get(str(error), 0) + 1
+
+    def write(cow):
+        succeeded, errors = 0, {}
+        try:
+            for _ in range(writes):
+                try:
+                    record_milk(cow)
+                    succeeded += 1
+                except OperationalError as error:
+                    count_error(errors, error)
+        finally:
+            connection.close()
+        return succeeded, errors
+
+    def read(writing):
+        client = Client()
+        succeeded, errors = 0, {}
+        try:
+            while writing.is_set():
+                for url in DASHBOARD_URLS:
+                    try:
+                        assert client.get(url).status_code == 200
+                        succeeded += 1
+                    except OperationalError as error:
+                        count_error(errors, error)
+        finally:
+            connection.close()
+        return succeeded, errors
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict["TEST"]["NAME"] = str(Path(directory) / "benchmark.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            cows, _ = seed(writers)
+            connection.close()
+
+            writing = threading.Event()
+            writing.set()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=readers + writers) as executor:
+                read_futures = [executor.submit(read, writing) for _ in range(readers)]
+                write_results = list(executor.map(write, cows))
+                writing.clear()
+                read_results = [future.result() for future in read_futures]
+            elapsed = time.perf_counter() - started
+        finally:
+            connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+
+    results = {"profile": profile, "seconds": round(elapsed, 3)}
+    for name, outcomes in [("writes", write_results), ("reads", read_results)]:
+        errors = {}
+        for _, outcome_errors in outcomes:
+            for message, count in outcome_errors.items():
+                errors[message] = errors.get(message, 0) + count
+        succeeded = sum(outcome[0] for outcome in outcomes)
+        results[name] = {
+            "succeeded": succeeded,
+            "per_second": round(succeeded / elapsed, 1),
+            "errors": errors,
+        }
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent dashboard readers.")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent milk writers.")
+    parser.add_argument("--writes", type=int, default=50, help="Milk records per writer.")
+    parser.add_argument("--run-profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_profile:
+        run_profile(args.run_profile, args.readers, args.writers, args.writes)
+        return
+
+    print(f"{args.readers} readers, {args.writers} writers x {args.writes} milk records")
+    print(f"{'profile':<10}{'seconds':>9}{'writes':>8}{'reads':>8}{'writes/s':>10}{'reads/s':>9}  errors")
+    for profile in args.profiles:
+        # A process per profile, the backend cannot change once connections are set up
+        process = subprocess.run(
+            [sys.executable, __file__, "--run-profile", profile, "--readers", str(args.readers),
+             "--writers", str(args.writers), "--writes", str(args.writes)],
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            print(f"{profile:<10}failed: {process.stderr.strip().splitlines()[-1]}")
+            continue
+        results = json.loads(process.stdout.strip().splitlines()[-1])
+        errors = ", ".join(
+            f"{count} x {message} ({name})"
+            for name in ["writes", "reads"]
+            for message, count in results[name]["errors"].items()
+        )
+        print(
+            f"{profile:<10}{results['seconds']:>9}{results['writes']['succeeded']:>8}"
+            f"{results['reads']['succeeded']:>8}{results['writes']['per_second']:>10}"
+            f"{results['reads']['per_second']:>9}  {errors or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Compares the concurrent write throughput of the milk and flock inspection paths on SQLite and
+PostgreSQL.
+
+Each backend is benchmarked in a separate process configured through the `EFARM_DB_*`
+environment variables (see efarm/database.py), against a throwaway test database created and
+migrated like the test suite does. Workers write in parallel to their own cow and flock, so
+the figures measure how the database handles concurrent writers rather than row contention.
+
+Usage, from the efarm-backend directory with a local PostgreSQL server:
+
+    EFARM_DB_USER=efarm EFARM_DB_PASSWORD=efarm python benchmarks/write_throughput.py
+    python benchmarks/write_throughput.py --backends sqlite --workers 4 --writes 100
+
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(engine=None):
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "efarm.settings")
+    import django
+    from django.conf import settings
+
+    if engine:
+        settings.DATABASES["default"]["ENGINE"] = engine
+    django.setup()
+
+
+def seed(workers):
+    from django.utils import timezone
+
+    from dairy.choices import (
+        CowAvailabilityChoices,
+        CowBreedChoices,
+        CowCategoryChoices,
+        CowPregnancyChoices,
+        CowProductionStatusChoices,
+        SexChoices,
+    )
+    from dairy.models import Cow, CowBreed, Lactation
+    from poultry.choices import (
+        ChickenTypeChoices,
+        FlockBreedTypeChoices,
+        FlockSourceChoices,
+        HousingStructureCategoryChoices,
+        HousingStructureTypeChoices,
+        RearingMethodChoices,
+    )
+    from poultry.serializers import FlockSerializer, HousingStructureSerializer
+
+    today = timezone.localdate()
+    breed, _ = CowBreed.objects.get_or_create(name=CowBreedChoices.FRIESIAN)
+    # Created in bulk to skip the validators of new cows, the milk validators still apply. Ids are
+    # given so the tag numbers, which hold them and are set by `Cow.save`, are known beforehand
+    date_of_birth = today - timedelta(days=1200)
+    cows = Cow.objects.bulk_create(
+        [
+            Cow(
+                pk=worker + 1,
+                name=f"Benchmark cow {worker}",
+                breed=breed,
+                date_of_birth=date_of_birth,
+                tag_number=f"{breed.name[:2].upper()}-{date_of_birth.year}-{worker + 1}",
+                gender=SexChoices.FEMALE,
+                availability_status=CowAvailabilityChoices.ALIVE,
+                current_pregnancy_status=CowPregnancyChoices.OPEN,
+                category=CowCategoryChoices.MILKING_COW,
+                current_production_status=CowProductionStatusChoices.OPEN,
+            )
+            for worker in range(workers)
+        ]
+    )
+    Lactation.objects.bulk_create(
+        [Lactation(cow=cow, start_date=today - timedelta(days=30)) for cow in cows]
+    )
+
+    flocks = []
+    for worker in range(workers):
+        housing_structure = HousingStructureSerializer(
+            data={
+                "house_type": HousingStructureTypeChoices.DEEP_LITTER_HOUSE,
+                "category": HousingStructureCategoryChoices.BROODER_CHICK_HOUSE,
+            }
+        )
+        housing_structure.is_valid(raise_exception=True)
+        flock = FlockSerializer(
+            data={
+                "source": {"name": FlockSourceChoices.KEN_CHICK},
+                "breed": {"name": FlockBreedTypeChoices.KENBRO},
+                "date_of_hatching": today,
+                "chicken_type": ChickenTypeChoices.LAYERS,
+                "initial_number_of_birds": 300,
+                "current_rearing_method": RearingMethodChoices.DEEP_LITTER,
+                "current_housing_structure": housing_structure.save().id,
+            }
+        )
+        flock.is_valid(raise_exception=True)
+        flocks.append(flock.save())
+    return cows, flocks
+
+
+def record_milk(cow):
+    from dairy.models import Milk
+
+    Milk.objects.create(cow=cow, amount_in_kgs=Decimal("12.50"))
+
+
+def record_inspection(flock):
+    from django.db import models
+
+    from poultry.models import FlockInspectionRecord
+
+    # The validators of FlockInspectionRecord.save() allow a few inspections a day, only the
+    # row and the flock inventory updated by its signals are written
+    models.Model.save(FlockInspectionRecord(flock=flock, number_of_dead_birds=0))
+
+
+def run_workers(write, targets, writes):
+    from django.db import OperationalError, connection
+
+    def worker(target):
+        succeeded, errors = 0, {}
+        try:
+            for _ in range(writes):
+                try:
+                    write(target)
+                    succeeded += 1
+                except OperationalError as error:
+                    errors[str(error)] = errors.get(str(error), 0) + 1
+        finally:
+            # Every thread opens its own connection
+            connection.close()
+        return succeeded, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        results = list(executor.map(worker, targets))
+    elapsed = time.perf_counter() - started
+
+    succeeded = sum(result[0] for result in results)
+    errors = {}
+    for _, worker_errors in results:
+        for message, count in worker_errors.items():
+            errors[message] = errors.get(message, 0) + count
+    return {
+        "writes": succeeded,
+        "seconds": round(elapsed, 3),
+        "writes_per_second": round(succeeded / elapsed, 1) if elapsed else None,
+        "errors": errors,
+    }
+
+
+def run_backend(workers, writes):
+    """
+    Benchmarks the database configured by the environment, printing the results as JSON.
+    """
+    setup_django()
+    from django.db import connection
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            # A file rather than the in-memory database the test runner defaults to
+            connection.settings_dict["TEST"]["NAME"] = str(Path(directory) / "benchmark.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            cows, flocks = seed(workers)
+            connection.close()
+            results = {
+                "backend": connection.vendor,
+                "milk": run_workers(record_milk, cows, writes),
+                "inspection": run_workers(record_inspection, flocks, writes),
+            }
+        finally:
+            connection.creation.destroy_test_db(
+                connection.settings_dict["NAME"], verbosity=0
+            )
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--backends", nargs="+", default=["sqlite", "postgresql"])
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent writers.")
+    parser.add_argument("--writes", type=int, default=200, help="Writes per worker and path.")
+    parser.add_argument("--run-backend", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_backend:
+        run_backend(args.workers, args.writes)
+        return
+
+    print(f"{args.workers} workers x {args.writes} writes per path")
+    print(f"{'backend':<12}{'path':<12}{'writes':>8}{'seconds':>10}{'writes/s':>10}  errors")
+    for backend in args.backends:
+        process = subprocess.run(
+            [sys.executable, __file__, "--run-backend", "--workers", str(args.workers),
+             "--writes", str(args.writes)],
+            env=dict(os.environ, EFARM_DB_ENGINE=backend),
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            print(f"{backend:<12}failed: {process.stderr.strip().splitlines()[-1]}")
+            continue
+        results = json.loads(process.stdout.strip().splitlines()[-1])
+        for path in ["milk", "inspection"]:
+            result = results[path]
+            errors = ", ".join(f"{count} x {message}" for message, count in result["errors"].items())
+            print(
+                f"{backend:<12}{path:<12}{result['writes']:>8}{result['seconds']:>10}"
+                f"{result['writes_per_second']:>10}  {errors or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
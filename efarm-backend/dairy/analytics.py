@@ -0,0 +1,1058 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import (
+    Avg,
+    Count,
+    DateField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Window,
+)
+from django.db.models.functions import Lag, Lead, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from dairy.choices import CowAvailabilityChoices, PregnancyStatusChoices, SexChoices
+from dairy.models import (
+    Barn,
+    Cow,
+    CowFertilityRecord,
+    CowInPenMovement,
+    CowPen,
+    Disease,
+    DiseaseCategory,
+    Heat,
+    Insemination,
+    Pregnancy,
+    Treatment,
+    WeightRecord,
+)
+from efarm.tenancy import UNSCOPED, current_farm
+
+
+def percentage(numerator, denominator):
+    """
+    Returns `numerator` as a percentage of `denominator`, rounded to two decimal places.
+    """
+    if not denominator:
+        return None
+    return (Decimal(numerator) * 100 / Decimal(denominator)).quantize(Decimal("0.00"))
+
+
+def ratio(numerator, denominator):
+    """
+    Returns `numerator` divided by `denominator`, rounded to two decimal places.
+    """
+    if not denominator:
+        return None
+    return (Decimal(numerator) / Decimal(denominator)).quantize(Decimal("0.00"))
+
+
+def start_of_day(date):
+    """
+    Returns the first instant of `date` in the current time zone.
+    """
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+class FertilityAnalytics:
+    """
+    Computes the fertility indicators of female cows and of the herd as a whole.
+
+    Every indicator is derived from a handful of herd-wide queries: window functions over
+    `Pregnancy` and `Insemination` relate each event to the previous or next one of the same
+    cow, and heats are counted per cow in a single grouped query. The per cow indicators are
+    stored in `CowFertilityRecord`, so the herd indicators only aggregate one row per cow.
+
+    Methods:
+    - `build_fertility_records(cow_ids)`: Computes unsaved `CowFertilityRecord` instances for female cows.
+    - `refresh_fertility_records(cow_ids)`: Computes and upserts the records, returning the number of cows.
+    - `herd_fertility()`: Aggregates the stored records into herd indicators.
+
+    Passing `cow_ids` restricts every query to those cows, which is how records are refreshed
+    incrementally when a heat, insemination or pregnancy is recorded.
+
+    """
+
+    HEAT_CYCLE_LENGTH_IN_DAYS = 21
+
+    @staticmethod
+    def _filter_cows(queryset, cow_ids, field_name="cow"):
+        if cow_ids is not None:
+            queryset = queryset.filter(**{f"{field_name}__in": cow_ids})
+        return queryset
+
+    @classmethod
+    def _calvings(cls, cow_ids=None):
+        """
+        Returns the most recent calving of each cow and the number of days since the one before it.
+        """
+        calvings = {}
+        records = (
+            cls._filter_cows(Pregnancy.objects.filter(date_of_calving__isnull=False), cow_ids)
+            .annotate(
+                previous_date_of_calving=Window(
+                    Lag("date_of_calving"),
+                    partition_by=[F("cow")],
+                    order_by=F("date_of_calving").asc(),
+                )
+            )
+            .values("cow", "date_of_calving", "previous_date_of_calving")
+            .order_by("cow", "date_of_calving")
+        )
+        for record in records:
+            # Rows are ordered by date, so the last row of each cow is its most recent calving
+            calving_interval = None
+            if record["previous_date_of_calving"]:
+                calving_interval = (
+                    record["date_of_calving"] - record["previous_date_of_calving"]
+                ).days
+            calvings[record["cow"]] = (record["date_of_calving"], calving_interval)
+        return calvings
+
+    @classmethod
+    def _conceptions_after_calving(cls, cow_ids=None):
+        """
+        Returns, per cow, the start date of the pregnancy that followed its most recent calving.
+        """
+        conceptions = {}
+        records = (
+            cls._filter_cows(Pregnancy.objects.all(), cow_ids)
+            .annotate(
+                next_start_date=Window(
+                    Lead("start_date"),
+                    partition_by=[F("cow")],
+                    order_by=F("start_date").asc(),
+                )
+            )
+            .values("cow", "date_of_calving", "next_start_date")
+            .order_by("cow", "start_date")
+        )
+        for record in records:
+            if record["date_of_calving"]:
+                conceptions[record["cow"]] = record["next_start_date"]
+        return conceptions
+
+    @classmethod
+    def _services(cls, cow_ids=None):
+        """
+        Returns the number of services, conceptions, first services and first service conceptions per cow.
+
+        A service is the first of its breeding cycle when it is the first insemination of the cow
+        or when the insemination before it was successful.
+        """
+        services = {}
+        records = (
+            cls._filter_cows(Insemination.objects.all(), cow_ids)
+            .annotate(
+                previous_success=Window(
+                    Lag("success"),
+                    partition_by=[F("cow")],
+                    order_by=F("date_of_insemination").asc(),
+                )
+            )
+            .values("cow", "success", "previous_success")
+            .order_by()
+        )
+        for record in records:
+            totals = services.setdefault(record["cow"], [0, 0, 0, 0])
+            is_first_service = record["previous_success"] is None or bool(record["previous_success"])
+            totals[0] += 1
+            totals[1] += int(record["success"])
+            totals[2] += int(is_first_service)
+            totals[3] += int(is_first_service and record["success"])
+        return services
+
+    @classmethod
+    def _heats_since_calving(cls, cow_ids=None):
+        latest_date_of_calving = (
+            Pregnancy.objects.filter(cow=OuterRef("cow"), date_of_calving__isnull=False)
+            .order_by("-date_of_calving")
+            .values("date_of_calving")[:1]
+        )
+        records = (
+            cls._filter_cows(Heat.objects.all(), cow_ids)
+            .annotate(latest_date_of_calving=Subquery(latest_date_of_calving))
+            .filter(observation_time__date__gte=F("latest_date_of_calving"))
+            .values("cow")
+            .annotate(number_of_heats=Count("id"))
+            .order_by()
+        )
+        return {record["cow"]: record["number_of_heats"] for record in records}
+
+    @classmethod
+    def build_fertility_records(cls, cow_ids=None):
+        calvings = cls._calvings(cow_ids)
+        conceptions = cls._conceptions_after_calving(cow_ids)
+        services = cls._services(cow_ids)
+        heats = cls._heats_since_calving(cow_ids)
+        computed_at = timezone.now()
+        today = timezone.localdate()
+        records = []
+
+        cows = cls._filter_cows(Cow.objects.filter(gender=SexChoices.FEMALE), cow_ids, "pk")
+        for cow_id in cows.values_list("id", flat=True):
+            latest_date_of_calving, calving_interval = calvings.get(cow_id, (None, None))
+            (
+                number_of_services,
+                number_of_conceptions,
+                number_of_first_services,
+                number_of_first_service_conceptions,
+            ) = services.get(cow_id, (0, 0, 0, 0))
+
+            days_open = None
+            number_of_expected_heats = 0
+            if latest_date_of_calving:
+                end_of_open_period = conceptions.get(cow_id) or today
+                days_open = max((end_of_open_period - latest_date_of_calving).days, 0)
+                number_of_expected_heats = days_open // cls.HEAT_CYCLE_LENGTH_IN_DAYS
+            number_of_heats_detected = heats.get(cow_id, 0)
+
+            heat_detection_rate = percentage(number_of_heats_detected, number_of_expected_heats)
+            if heat_detection_rate is not None:
+                heat_detection_rate = min(heat_detection_rate, Decimal("100.00"))
+
+            records.append(
+                CowFertilityRecord(
+                    cow_id=cow_id,
+                    latest_date_of_calving=latest_date_of_calving,
+                    calving_interval=calving_interval,
+                    days_open=days_open,
+                    number_of_services=number_of_services,
+                    number_of_conceptions=number_of_conceptions,
+                    services_per_conception=ratio(number_of_services, number_of_conceptions),
+                    number_of_first_services=number_of_first_services,
+                    number_of_first_service_conceptions=number_of_first_service_conceptions,
+                    first_service_conception_rate=percentage(
+                        number_of_first_service_conceptions, number_of_first_services
+                    ),
+                    number_of_heats_detected=number_of_heats_detected,
+                    number_of_expected_heats=number_of_expected_heats,
+                    heat_detection_rate=heat_detection_rate,
+                    computed_at=computed_at,
+                )
+            )
+        return records
+
+    @classmethod
+    def refresh_fertility_records(cls, cow_ids=None):
+        records = cls.build_fertility_records(cow_ids)
+        CowFertilityRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["cow"],
+            update_fields=[
+                "latest_date_of_calving",
+                "calving_interval",
+                "days_open",
+                "number_of_services",
+                "number_of_conceptions",
+                "services_per_conception",
+                "number_of_first_services",
+                "number_of_first_service_conceptions",
+                "first_service_conception_rate",
+                "number_of_heats_detected",
+                "number_of_expected_heats",
+                "heat_detection_rate",
+                "computed_at",
+            ],
+        )
+        return len(records)
+
+    @staticmethod
+    def herd_fertility():
+        totals = CowFertilityRecord.objects.aggregate(
+            number_of_cows=Count("id"),
+            average_calving_interval=Avg("calving_interval"),
+            average_days_open=Avg("days_open"),
+            number_of_services=Sum("number_of_services"),
+            number_of_conceptions=Sum("number_of_conceptions"),
+            number_of_first_services=Sum("number_of_first_services"),
+            number_of_first_service_conceptions=Sum("number_of_first_service_conceptions"),
+            number_of_heats_detected=Sum("number_of_heats_detected"),
+            number_of_expected_heats=Sum("number_of_expected_heats"),
+        )
+        for average in ["average_calving_interval", "average_days_open"]:
+            if totals[average] is not None:
+                totals[average] = Decimal(totals[average]).quantize(Decimal("0.00"))
+
+        totals["services_per_conception"] = ratio(
+            totals["number_of_services"] or 0, totals["number_of_conceptions"]
+        )
+        totals["first_service_conception_rate"] = percentage(
+            totals["number_of_first_service_conceptions"] or 0, totals["number_of_first_services"]
+        )
+        heat_detection_rate = percentage(
+            totals["number_of_heats_detected"] or 0, totals["number_of_expected_heats"]
+        )
+        if heat_detection_rate is not None:
+            heat_detection_rate = min(heat_detection_rate, Decimal("100.00"))
+        totals["heat_detection_rate"] = heat_detection_rate
+        return totals
+
+
+class BreedingCalendar:
+    """
+    Projects the upcoming breeding events of the herd.
+
+    - Expected heats follow a 21-day cycle from the latest heat of every open cow.
+    - Pregnancy scans are due a fixed number of days after the successful insemination of an unscanned pregnancy.
+    - Calvings are due 285 days after the start of an open pregnancy, and dry-off 60 days before.
+
+    The whole herd is served by two queries, one over open pregnancies and one grouping the latest
+    heat per cow, and the projected calendar of each farm is cached for the rest of the day. Saving a
+    reproductive event bumps a version stored in the cache, which invalidates the cached calendars.
+
+    Methods:
+    - `herd_calendar()`: Returns every projected event of the herd of the current farm, cached per day.
+    - `upcoming_events(days)`: Returns the events falling within the next `days` days, overdue ones included.
+    - `invalidate()`: Discards the calendars cached for today.
+
+    """
+
+    HEAT_CYCLE_LENGTH_IN_DAYS = FertilityAnalytics.HEAT_CYCLE_LENGTH_IN_DAYS
+    DAYS_TO_PREGNANCY_SCAN = 35
+    GESTATION_LENGTH_IN_DAYS = 285
+    DRY_PERIOD_IN_DAYS = 60
+    EVENT_TYPES = ["expected_heats", "pregnancy_scans_due", "dry_offs_due", "calvings_due"]
+    VERSION_CACHE_KEY = "dairy:breeding-calendar:version"
+
+    @classmethod
+    def _cache_key(cls, date):
+        version = cache.get(cls.VERSION_CACHE_KEY)
+        if version is None:
+            version = uuid4().hex
+            cache.set(cls.VERSION_CACHE_KEY, version, timeout=None)
+        farm_id = current_farm()
+        farm = "all" if farm_id is UNSCOPED else farm_id
+        return f"dairy:breeding-calendar:{version}:{farm}:{date.isoformat()}"
+
+    @staticmethod
+    def _open_pregnancies():
+        return Pregnancy.objects.filter(
+            date_of_calving__isnull=True,
+            pregnancy_outcome__isnull=True,
+            cow__availability_status=CowAvailabilityChoices.ALIVE,
+        ).exclude(pregnancy_status=PregnancyStatusChoices.FAILED)
+
+    @classmethod
+    def _build_calendar(cls, today):
+        calendar = {event_type: [] for event_type in cls.EVENT_TYPES}
+
+        pregnancies = cls._open_pregnancies().values(
+            "cow",
+            "cow__name",
+            "start_date",
+            "pregnancy_status",
+            "pregnancy_scan_date",
+            "insemination__date_of_insemination",
+        )
+        for pregnancy in pregnancies:
+            cow = {"cow": pregnancy["cow"], "cow_name": pregnancy["cow__name"]}
+            date_of_insemination = pregnancy["insemination__date_of_insemination"]
+            if (
+                date_of_insemination
+                and not pregnancy["pregnancy_scan_date"]
+                and pregnancy["pregnancy_status"] == PregnancyStatusChoices.UNCONFIRMED
+            ):
+                scan_date = timezone.localtime(date_of_insemination).date() + timedelta(
+                    days=cls.DAYS_TO_PREGNANCY_SCAN
+                )
+                calendar["pregnancy_scans_due"].append({**cow, "date": scan_date})
+
+            due_date = pregnancy["start_date"] + timedelta(days=cls.GESTATION_LENGTH_IN_DAYS)
+            calendar["calvings_due"].append({**cow, "date": due_date})
+            calendar["dry_offs_due"].append(
+                {**cow, "date": due_date - timedelta(days=cls.DRY_PERIOD_IN_DAYS)}
+            )
+
+        heats = (
+            Heat.objects.filter(
+                cow__gender=SexChoices.FEMALE,
+                cow__availability_status=CowAvailabilityChoices.ALIVE,
+            )
+            .exclude(cow__in=cls._open_pregnancies().values("cow"))
+            .values("cow", "cow__name")
+            .annotate(latest_observation_time=Max("observation_time"))
+            .order_by()
+        )
+        for heat in heats:
+            latest_heat_date = timezone.localtime(heat["latest_observation_time"]).date()
+            # Project the cycle forward to the first expected heat that is not in the past
+            elapsed_cycles = max(
+                -(-(today - latest_heat_date).days // cls.HEAT_CYCLE_LENGTH_IN_DAYS), 1
+            )
+            calendar["expected_heats"].append(
+                {
+                    "cow": heat["cow"],
+                    "cow_name": heat["cow__name"],
+                    "date": latest_heat_date
+                    + timedelta(days=elapsed_cycles * cls.HEAT_CYCLE_LENGTH_IN_DAYS),
+                }
+            )
+
+        for events in calendar.values():
+            events.sort(key=lambda event: (event["date"], event["cow"]))
+        return calendar
+
+    @classmethod
+    def herd_calendar(cls):
+        today = timezone.localdate()
+        cache_key = cls._cache_key(today)
+        calendar = cache.get(cache_key)
+        if calendar is None:
+            calendar = cls._build_calendar(today)
+            cache.set(cache_key, calendar, timeout=24 * 60 * 60)
+        return calendar
+
+    @classmethod
+    def upcoming_events(cls, days=7):
+        last_date = timezone.localdate() + timedelta(days=days)
+        return {
+            event_type: [event for event in events if event["date"] <= last_date]
+            for event_type, events in cls.herd_calendar().items()
+        }
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete(cls.VERSION_CACHE_KEY)
+
+
+class InseminationAnalytics:
+    """
+    Compares the success of inseminations grouped by inseminator, semen producer or semen batch.
+
+    Services and conceptions are counted in a single grouped query over the insemination date
+    range, and the days to pregnancy are only computed for the successful inseminations.
+
+    Methods:
+    - `success_rates(group_by, start_date, end_date)`: Returns one row of indicators per group.
+
+    Each row contains the group fields and:
+    - `number_of_services`: The number of inseminations.
+    - `number_of_conceptions`: The number of successful inseminations.
+    - `conception_rate`: Successful inseminations as a percentage of the inseminations.
+    - `services_per_pregnancy`: The number of inseminations per successful insemination.
+    - `average_days_to_pregnancy`: The average days from the previous calving of the cow to the
+      successful insemination, for cows that had calved before.
+
+    """
+
+    GROUPINGS = {
+        "inseminator": ["inseminator", "inseminator__first_name", "inseminator__last_name"],
+        "producer": ["semen__producer"],
+        "semen_batch": ["semen__producer", "semen__semen_batch"],
+    }
+    FIELD_NAMES = {
+        "inseminator__first_name": "first_name",
+        "inseminator__last_name": "last_name",
+        "semen__producer": "producer",
+        "semen__semen_batch": "semen_batch",
+    }
+
+    @staticmethod
+    def _inseminations(start_date=None, end_date=None):
+        # Half-open datetime ranges keep the (inseminator, date_of_insemination) index usable
+        queryset = Insemination.objects.order_by()
+        if start_date:
+            queryset = queryset.filter(date_of_insemination__gte=start_of_day(start_date))
+        if end_date:
+            queryset = queryset.filter(
+                date_of_insemination__lt=start_of_day(end_date + timedelta(days=1))
+            )
+        return queryset
+
+    @classmethod
+    def _days_to_pregnancy(cls, fields, start_date=None, end_date=None):
+        latest_date_of_calving = (
+            Pregnancy.objects.filter(
+                cow=OuterRef("cow"),
+                date_of_calving__lt=OuterRef("date_of_insemination"),
+            )
+            .order_by("-date_of_calving")
+            .values("date_of_calving")[:1]
+        )
+        conceptions = (
+            cls._inseminations(start_date, end_date)
+            .filter(success=True)
+            .annotate(latest_date_of_calving=Subquery(latest_date_of_calving))
+            .filter(latest_date_of_calving__isnull=False)
+            .values(*fields, "date_of_insemination", "latest_date_of_calving")
+        )
+
+        days_to_pregnancy = {}
+        for conception in conceptions:
+            key = tuple(conception[field] for field in fields)
+            date_of_conception = timezone.localtime(conception["date_of_insemination"]).date()
+            days_to_pregnancy.setdefault(key, []).append(
+                (date_of_conception - conception["latest_date_of_calving"]).days
+            )
+        return days_to_pregnancy
+
+    @classmethod
+    def success_rates(cls, group_by="inseminator", start_date=None, end_date=None):
+        fields = cls.GROUPINGS[group_by]
+        totals = (
+            cls._inseminations(start_date, end_date)
+            .values(*fields)
+            .annotate(
+                number_of_services=Count("id"),
+                number_of_conceptions=Count("id", filter=Q(success=True)),
+            )
+            .order_by(*fields)
+        )
+        days_to_pregnancy = cls._days_to_pregnancy(fields, start_date, end_date)
+
+        rows = []
+        for total in totals:
+            row = {cls.FIELD_NAMES.get(field, field): total[field] for field in fields}
+            number_of_services = total["number_of_services"]
+            number_of_conceptions = total["number_of_conceptions"]
+            group_days_to_pregnancy = days_to_pregnancy.get(tuple(total[field] for field in fields))
+
+            row.update(
+                {
+                    "number_of_services": number_of_services,
+                    "number_of_conceptions": number_of_conceptions,
+                    "conception_rate": percentage(number_of_conceptions, number_of_services),
+                    "services_per_pregnancy": ratio(number_of_services, number_of_conceptions),
+                    "average_days_to_pregnancy": ratio(
+                        sum(group_days_to_pregnancy), len(group_days_to_pregnancy)
+                    )
+                    if group_days_to_pregnancy
+                    else None,
+                }
+            )
+            rows.append(row)
+        return rows
+
+
+class OccupancyAnalytics:
+    """
+    Computes the occupancy of barns or pens over time for capacity planning.
+
+    Occupancy is a step function that only changes when a cow is moved, so it is rebuilt from the
+    `CowInPenMovement` and `CowInBarnMovement` records: every movement is turned into a +1 for
+    the pen (or barn) the cow entered and a -1 for the one it left. The database sums the changes
+    before the period into the occupancy it starts with, and returns a running sum per unit for
+    the changes within the period, which are sampled into hourly or daily buckets.
+
+    Methods:
+    - `occupancy(scope, interval, start_date, end_date)`: Returns one series per barn or pen.
+
+    Each series contains:
+    - `id`, `name` / `type`, `capacity`: The barn or pen.
+    - `peak_occupancy`: The highest number of cows present at the same time in the period.
+    - `peak_utilization`: The peak occupancy as a percentage of the capacity.
+    - `buckets`: The `occupancy` at the end of each bucket and its `peak_occupancy` within the bucket.
+
+    """
+
+    BARN = "barn"
+    PEN = "pen"
+    SCOPES = [BARN, PEN]
+    HOUR = "hour"
+    DAY = "day"
+    INTERVALS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+    MAX_BUCKETS = 24 * 93
+
+    @classmethod
+    def number_of_buckets(cls, interval, start_date, end_date):
+        return ((end_date - start_date).days + 1) * timedelta(days=1) // cls.INTERVALS[interval]
+
+    @classmethod
+    def _units(cls, scope):
+        if scope == cls.BARN:
+            return {barn["id"]: barn for barn in Barn.objects.values("id", "name", "capacity")}
+        return {
+            pen["id"]: pen
+            for pen in CowPen.objects.values("id", "barn", "type", "category", "capacity")
+        }
+
+    # Location of each cow after each of its pen and barn movements, and the +1 and -1 changes of
+    # the occupancy of the barns or pens it arrived in and left. A barn movement keeps the pen of
+    # the cow when it stays in the barn of the pen and clears it otherwise, as `CowInBarnMovement`
+    # does with `Cow.current_pen`.
+    DELTAS_SQL = """
+        WITH events AS (
+            SELECT m.id, m.cow_id, m.timestamp, 0 AS kind, m.new_pen_id AS pen_id, p.barn_id
+            FROM dairy_cowinpenmovement m
+            JOIN dairy_cowpen p ON p.id = m.new_pen_id
+            JOIN dairy_cow c ON c.id = m.cow_id
+            WHERE m.timestamp < %s{farm_condition}
+            UNION ALL
+            SELECT b.id, b.cow_id, b.timestamp, 1 AS kind, NULL AS pen_id, b.new_barn_id AS barn_id
+            FROM dairy_cowinbarnmovement b
+            JOIN dairy_cow c ON c.id = b.cow_id
+            WHERE b.timestamp < %s{farm_condition}
+        ),
+        pen_groups AS (
+            -- The events following each pen movement, up to the next one
+            SELECT id, cow_id, timestamp, kind, pen_id, barn_id,
+                SUM(1 - kind) OVER (PARTITION BY cow_id ORDER BY timestamp, kind, id) AS pen_group
+            FROM events
+        ),
+        group_pens AS (
+            SELECT id, cow_id, timestamp, kind, barn_id, pen_group,
+                FIRST_VALUE(pen_id) OVER group_events AS group_pen_id,
+                FIRST_VALUE(barn_id) OVER group_events AS group_barn_id
+            FROM pen_groups
+            WINDOW group_events AS (PARTITION BY cow_id, pen_group ORDER BY timestamp, kind, id)
+        ),
+        locations AS (
+            -- The pen is kept until the cow is moved to another barn
+            SELECT id, cow_id, timestamp, kind, barn_id,
+                CASE
+                    WHEN SUM(CASE WHEN barn_id <> group_barn_id THEN 1 ELSE 0 END) OVER (
+                        PARTITION BY cow_id, pen_group ORDER BY timestamp, kind, id
+                    ) = 0 THEN group_pen_id
+                END AS pen_id
+            FROM group_pens
+        ),
+        moves AS (
+            SELECT id, timestamp, kind, {unit} AS unit,
+                LAG({unit}) OVER (PARTITION BY cow_id ORDER BY timestamp, kind, id) AS previous_unit
+            FROM locations
+        ),
+        deltas AS (
+            SELECT id, timestamp, kind, unit, 1 AS delta FROM moves
+            WHERE unit IS NOT NULL AND (previous_unit IS NULL OR previous_unit <> unit)
+            UNION ALL
+            SELECT id, timestamp, kind, previous_unit AS unit, -1 AS delta FROM moves
+            WHERE previous_unit IS NOT NULL AND (unit IS NULL OR unit <> previous_unit)
+        )
+    """
+
+    @classmethod
+    def _farm_condition(cls):
+        farm_id = current_farm()
+        if farm_id is UNSCOPED:
+            return "", []
+        if farm_id is None:
+            return " AND c.farm_id IS NULL", []
+        return " AND c.farm_id = %s", [farm_id]
+
+    @classmethod
+    def _deltas(cls, scope, start, end):
+        """
+        Returns the occupancy of each unit at `start`, and the `(timestamp, unit, occupancy)` of
+        every change of occupancy from `start` to `end` in chronological order.
+
+        The occupancy at `start` is a grouped sum of the earlier changes, and the occupancy after
+        each later change a running sum of the changes of its unit, both computed by the database.
+        """
+        connection = connections[router.db_for_read(CowInPenMovement)]
+        farm_condition, farm_params = cls._farm_condition()
+        deltas_sql = cls.DELTAS_SQL.format(
+            farm_condition=farm_condition, unit="barn_id" if scope == cls.BARN else "pen_id"
+        )
+        start_param = connection.ops.adapt_datetimefield_value(start)
+        end_param = connection.ops.adapt_datetimefield_value(end)
+        params = [end_param, *farm_params, end_param, *farm_params]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{deltas_sql} SELECT unit, SUM(delta) FROM deltas WHERE timestamp < %s GROUP BY unit",
+                [*params, start_param],
+            )
+            initial_occupancy = dict(cursor.fetchall())
+            cursor.execute(
+                f"""
+                {deltas_sql}
+                SELECT timestamp, unit, SUM(delta) OVER (
+                    PARTITION BY unit ORDER BY timestamp, kind, id ROWS UNBOUNDED PRECEDING
+                )
+                FROM deltas WHERE timestamp >= %s
+                ORDER BY timestamp, kind, id, delta
+                """,
+                [*params, start_param],
+            )
+            rows = cursor.fetchall()
+
+        # Timestamps are returned as stored, such as strings of UTC times on SQLite
+        timestamp_field = CowInPenMovement._meta.get_field("timestamp")
+        converters = connection.ops.get_db_converters(timestamp_field.cached_col)
+        changes = []
+        for timestamp, unit, running_sum in rows:
+            for converter in converters:
+                timestamp = converter(timestamp, timestamp_field.cached_col, connection)
+            changes.append((timestamp, unit, initial_occupancy.get(unit, 0) + running_sum))
+        return initial_occupancy, changes
+
+    @classmethod
+    def occupancy(cls, scope=BARN, interval=DAY, start_date=None, end_date=None):
+        end_date = end_date or timezone.localdate()
+        start_date = start_date or end_date - timedelta(days=29)
+        start, end = start_of_day(start_date), start_of_day(end_date + timedelta(days=1))
+        bucket_length = cls.INTERVALS[interval]
+
+        units = cls._units(scope)
+        current_occupancy, changes = cls._deltas(scope, start, end)
+        current_occupancy = defaultdict(int, current_occupancy)
+        buckets = defaultdict(list)
+
+        # The changes are sampled into the buckets, keeping the occupancy at the end of each
+        # bucket and its peak within the bucket
+        change_index = 0
+        bucket_start = start
+        while bucket_start < end:
+            bucket_end = bucket_start + bucket_length
+            bucket_peaks = dict(current_occupancy)
+            while change_index < len(changes) and changes[change_index][0] < bucket_end:
+                _, unit_id, occupancy = changes[change_index]
+                current_occupancy[unit_id] = occupancy
+                bucket_peaks[unit_id] = max(bucket_peaks.get(unit_id, 0), occupancy)
+                change_index += 1
+
+            for unit_id in units:
+                buckets[unit_id].append(
+                    {
+                        "bucket_start": bucket_start,
+                        "occupancy": current_occupancy[unit_id],
+                        "peak_occupancy": bucket_peaks.get(unit_id, 0),
+                    }
+                )
+            bucket_start = bucket_end
+
+        series = []
+        for unit_id, unit in units.items():
+            peak_occupancy = max(
+                (bucket["peak_occupancy"] for bucket in buckets[unit_id]), default=0
+            )
+            series.append(
+                {
+                    **unit,
+                    "peak_occupancy": peak_occupancy,
+                    "peak_utilization": percentage(peak_occupancy, unit["capacity"]),
+                    "buckets": buckets[unit_id],
+                }
+            )
+        return series
+
+
+class DiseaseAnalytics:
+    """
+    Computes disease incidence, prevalence, recovery time and treatment cost per disease
+    category and period.
+
+    A case is an affected cow of a `Disease` record, so cases are counted over the through table
+    of `Disease.cows` with queries grouped by category and period: one for the cases that started
+    in each period, one for those that recovered and one for the cases still active when the
+    period starts. The number of active cases at the end of each period is then a running sum,
+    and treatment costs are summed per period from `Treatment` in a fourth query.
+
+    Rates are relative to the herd at the end of the period: the cows born by then that had not
+    died, sold cows being left out as their date of sale is not recorded.
+
+    Methods:
+    - `number_of_periods(period, start_date, end_date)`: Returns the number of periods in the range.
+    - `disease_statistics(period, start_date, end_date)`: Returns one row per category and period.
+
+    Each row contains:
+    - `category`: The name of the disease category.
+    - `period_start`: The Monday of the week, or the first day of the month, the row covers.
+    - `new_cases` / `recovered_cases`: The number of cases that started / recovered in the period.
+    - `active_cases`: The number of cases not yet recovered at the end of the period.
+    - `herd_size`: The number of cows in the herd at the end of the period.
+    - `incidence_rate`: The new cases as a percentage of the herd.
+    - `prevalence`: The active cases as a percentage of the herd.
+    - `average_recovery_days`: The average number of days the recovered cases lasted.
+    - `number_of_treatments` / `treatment_cost`: The treatments given in the period and their total cost.
+
+    """
+
+    WEEK = "week"
+    MONTH = "month"
+    PERIODS = {WEEK: TruncWeek, MONTH: TruncMonth}
+    MAX_PERIODS = 260
+
+    @classmethod
+    def period_start(cls, period, day):
+        if period == cls.WEEK:
+            return day - timedelta(days=day.weekday())
+        return day.replace(day=1)
+
+    @classmethod
+    def next_period_start(cls, period, period_start):
+        if period == cls.WEEK:
+            return period_start + timedelta(weeks=1)
+        return (period_start + timedelta(days=31)).replace(day=1)
+
+    @classmethod
+    def period_starts(cls, period, start_date, end_date):
+        period_start = cls.period_start(period, start_date)
+        while period_start <= end_date:
+            yield period_start
+            period_start = cls.next_period_start(period, period_start)
+
+    @classmethod
+    def number_of_periods(cls, period, start_date, end_date):
+        return sum(1 for _ in cls.period_starts(period, start_date, end_date))
+
+    @staticmethod
+    def _cases():
+        cases = Disease.cows.through.objects.annotate(category=F("disease__categories__name"))
+        # The through table has no farm scoped manager, cases belong to the farm of their cow
+        farm_id = current_farm()
+        if farm_id is not UNSCOPED:
+            cases = cases.filter(cow__farm=farm_id)
+        return cases
+
+    @classmethod
+    def _grouped(cls, queryset, date_field, period, **aggregates):
+        return (
+            queryset.annotate(
+                period_start=cls.PERIODS[period](date_field, output_field=DateField())
+            )
+            .values("category", "period_start")
+            .annotate(**aggregates)
+            .order_by()
+        )
+
+    @staticmethod
+    def _herd_sizes(period_ends):
+        births, deaths = [], []
+        cows = Cow.objects.exclude(availability_status=CowAvailabilityChoices.SOLD)
+        for date_of_birth, date_of_death in cows.values_list("date_of_birth", "date_of_death"):
+            births.append(date_of_birth)
+            if date_of_death:
+                deaths.append(date_of_death)
+        births.sort()
+        deaths.sort()
+        return [
+            bisect_right(births, period_end) - bisect_right(deaths, period_end)
+            for period_end in period_ends
+        ]
+
+    @classmethod
+    def disease_statistics(cls, period=MONTH, start_date=None, end_date=None):
+        end_date = end_date or timezone.localdate()
+        start_date = cls.period_start(period, start_date or end_date - timedelta(days=364))
+        period_starts = list(cls.period_starts(period, start_date, end_date))
+        period_ends = [
+            cls.next_period_start(period, period_start) - timedelta(days=1)
+            for period_start in period_starts
+        ]
+        last_date = period_ends[-1]
+
+        active_at_start = dict(
+            cls._cases()
+            .filter(disease__occurrence_date__lt=start_date)
+            .filter(
+                Q(disease__recovered_date__isnull=True)
+                | Q(disease__recovered_date__gte=start_date)
+            )
+            .values("category")
+            .annotate(cases=Count("id"))
+            .order_by()
+            .values_list("category", "cases")
+        )
+        new_cases = {
+            (row["category"], row["period_start"]): row["cases"]
+            for row in cls._grouped(
+                cls._cases().filter(disease__occurrence_date__range=(start_date, last_date)),
+                "disease__occurrence_date",
+                period,
+                cases=Count("id"),
+            )
+        }
+        recovered_cases = {
+            (row["category"], row["period_start"]): row
+            for row in cls._grouped(
+                cls._cases().filter(disease__recovered_date__range=(start_date, last_date)),
+                "disease__recovered_date",
+                period,
+                cases=Count("id"),
+                recovery_time=Sum(
+                    ExpressionWrapper(
+                        F("disease__recovered_date") - F("disease__occurrence_date"),
+                        output_field=DurationField(),
+                    )
+                ),
+            )
+        }
+        treatments = {
+            (row["category"], row["period_start"]): row
+            for row in cls._grouped(
+                Treatment.objects.annotate(category=F("disease__categories__name")).filter(
+                    date_of_treatment__gte=start_of_day(start_date),
+                    date_of_treatment__lt=start_of_day(last_date + timedelta(days=1)),
+                ),
+                "date_of_treatment",
+                period,
+                treatments=Count("id"),
+                cost=Sum("cost"),
+            )
+        }
+        herd_sizes = cls._herd_sizes(period_ends)
+
+        statistics = []
+        for category in DiseaseCategory.objects.order_by("name").values_list("name", flat=True):
+            active_cases = active_at_start.get(category, 0)
+            for period_start, herd_size in zip(period_starts, herd_sizes):
+                key = (category, period_start)
+                started = new_cases.get(key, 0)
+                recovered = recovered_cases.get(key, {"cases": 0, "recovery_time": None})
+                treated = treatments.get(key, {"treatments": 0, "cost": None})
+                active_cases += started - recovered["cases"]
+
+                average_recovery_days = None
+                if recovered["cases"]:
+                    average_recovery_days = ratio(
+                        recovered["recovery_time"].days, recovered["cases"]
+                    )
+                statistics.append(
+                    {
+                        "category": category,
+                        "period_start": period_start,
+                        "new_cases": started,
+                        "recovered_cases": recovered["cases"],
+                        "active_cases": active_cases,
+                        "herd_size": herd_size,
+                        "incidence_rate": percentage(started, herd_size),
+                        "prevalence": percentage(active_cases, herd_size),
+                        "average_recovery_days": average_recovery_days,
+                        "number_of_treatments": treated["treatments"],
+                        "treatment_cost": treated["cost"] or Decimal("0.00"),
+                    }
+                )
+        return statistics
+
+
+def percentile(sorted_values, fraction):
+    """
+    Returns the percentile of already sorted values, interpolating between the closest ranks.
+    """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * Decimal(fraction)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    value = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+    return value.quantize(Decimal("0.000"))
+
+
+class WeightGainAnalytics:
+    """
+    Computes the average daily gain (ADG) of cows between consecutive weighings, and its
+    distribution within cohorts of cows of the same breed and age band.
+
+    Each weighing is paired with the previous weighing of the same cow by a `LAG` window over
+    (`cow`, `date`), so every gain of the herd is computed in one query walking the
+    (`cow`, `date`) index. Weighings before the requested range are still read so the first
+    weighing in the range has its predecessor.
+
+    Methods:
+    - `daily_gains(cow_ids, start_date, end_date)`: Returns one row per weighing preceded by another.
+    - `cohort_percentiles(start_date, end_date)`: Returns ADG percentiles per breed and age band.
+
+    Each gain row contains:
+    - `cow`, `date`, `weight_in_kgs`: The weighing.
+    - `previous_date`, `previous_weight_in_kgs`: The previous weighing of the cow.
+    - `days`, `gain_in_kgs`, `average_daily_gain`: The gain between both weighings.
+    - `age_in_days`: The age of the cow at the weighing.
+
+    Each cohort row contains the `breed`, the `age_band`, the `number_of_gains` and the 10th, 25th,
+    50th, 75th and 90th percentiles of the average daily gain.
+
+    """
+
+    # Age bands by the age, in days, they end at, following the categories of the herd
+    AGE_BANDS = [
+        (90, "0-3 months"),
+        (180, "3-6 months"),
+        (365, "6-12 months"),
+        (730, "1-2 years"),
+        (None, "Over 2 years"),
+    ]
+    PERCENTILES = {"p10": "0.10", "p25": "0.25", "p50": "0.50", "p75": "0.75", "p90": "0.90"}
+
+    @classmethod
+    def age_band(cls, age_in_days):
+        for last_day, name in cls.AGE_BANDS:
+            if last_day is None or age_in_days <= last_day:
+                return name
+
+    @staticmethod
+    def _weighings(cow_ids=None, end_date=None):
+        window = {"partition_by": [F("cow")], "order_by": [F("date").asc(), F("id").asc()]}
+        queryset = WeightRecord.objects.all()
+        if cow_ids:
+            queryset = queryset.filter(cow__in=cow_ids)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        return (
+            queryset.annotate(
+                previous_date=Window(Lag("date"), **window),
+                previous_weight_in_kgs=Window(Lag("weight_in_kgs"), **window),
+            )
+            .values(
+                "cow",
+                "cow__breed__name",
+                "cow__date_of_birth",
+                "date",
+                "weight_in_kgs",
+                "previous_date",
+                "previous_weight_in_kgs",
+            )
+            .order_by("cow", "date", "id")
+        )
+
+    @classmethod
+    def _gains(cls, cow_ids=None, start_date=None, end_date=None):
+        for weighing in cls._weighings(cow_ids, end_date):
+            if weighing["previous_date"] is None or weighing["previous_date"] == weighing["date"]:
+                continue
+            if start_date and weighing["date"] < start_date:
+                continue
+            days = (weighing["date"] - weighing["previous_date"]).days
+            gain = weighing["weight_in_kgs"] - weighing["previous_weight_in_kgs"]
+            yield weighing, days, gain
+
+    @classmethod
+    def daily_gains(cls, cow_ids=None, start_date=None, end_date=None):
+        return [
+            {
+                "cow": weighing["cow"],
+                "date": weighing["date"],
+                "weight_in_kgs": weighing["weight_in_kgs"],
+                "previous_date": weighing["previous_date"],
+                "previous_weight_in_kgs": weighing["previous_weight_in_kgs"],
+                "days": days,
+                "gain_in_kgs": gain,
+                "average_daily_gain": ratio(gain, days),
+                "age_in_days": (weighing["date"] - weighing["cow__date_of_birth"]).days,
+            }
+            for weighing, days, gain in cls._gains(cow_ids, start_date, end_date)
+        ]
+
+    @classmethod
+    def cohort_percentiles(cls, start_date=None, end_date=None):
+        cohorts = defaultdict(list)
+        for weighing, days, gain in cls._gains(start_date=start_date, end_date=end_date):
+            age_in_days = (weighing["date"] - weighing["cow__date_of_birth"]).days
+            key = (weighing["cow__breed__name"], cls.age_band(age_in_days))
+            cohorts[key].append(Decimal(gain) / days)
+
+        band_order = {name: index for index, (_, name) in enumerate(cls.AGE_BANDS)}
+        rows = []
+        for (breed, age_band), gains in sorted(
+            cohorts.items(), key=lambda cohort: (cohort[0][0], band_order[cohort[0][1]])
+        ):
+            gains.sort()
+            row = {"breed": breed, "age_band": age_band, "number_of_gains": len(gains)}
+            for name, fraction in cls.PERCENTILES.items():
+                row[name] = percentile(gains, fraction)
+            rows.append(row)
+        return rows
@@ -0,0 +1,187 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from dairy.analytics import start_of_day
+from dairy.models import ArchivedMilk, Lactation, Milk, MilkRollup
+
+
+class MilkArchive:
+    """
+    Moves the milk records of lactations closed before the archive horizon out of `Milk`, which
+    every milking writes to and the dashboards read, into `ArchivedMilk`, keeping the daily
+    totals of each cow in `MilkRollup`.
+
+    Milk is archived a whole lactation at a time, in one transaction per lactation, so a
+    lactation is either entirely hot or entirely archived. Milk of open lactations, and milk
+    recorded outside a lactation, stays in `Milk` whatever its age.
+
+    Reads only span the archive when the requested range needs it: archived milk is read when
+    rollups exist on or after the start of the range, which the (`date`) index of the rollups
+    answers without touching the archived records.
+
+    Methods:
+    - `horizon()`: Returns the date before which closed lactations are archived.
+    - `archivable_lactations(horizon)`: Returns the lactations closed before the horizon with milk left in `Milk`.
+    - `archive_lactation(lactation)`: Moves the milk of a lactation to the archive, returning the number of records.
+    - `archive(horizon)`: Archives the archivable lactations, returning the numbers of lactations and records.
+    - `spans_archive(start_date)`: Returns whether archived milk was recorded on or after `start_date`.
+    - `daily_totals(start_date, end_date, cow_ids)`: Returns the milk produced per day.
+    - `records(start_date, end_date, cow_ids)`: Returns the milk records, hot and archived.
+
+    """
+
+    # Days after which the milk of a closed lactation is archived, see `MILK_ARCHIVE_HORIZON_DAYS`
+    DEFAULT_HORIZON_DAYS = 365
+    BATCH_SIZE = 1000
+    RECORD_FIELDS = ["id", "cow", "lactation", "milking_date", "amount_in_kgs"]
+
+    @classmethod
+    def horizon(cls, horizon_days=None):
+        if horizon_days is None:
+            horizon_days = getattr(settings, "MILK_ARCHIVE_HORIZON_DAYS", cls.DEFAULT_HORIZON_DAYS)
+        return timezone.localdate() - timedelta(days=horizon_days)
+
+    @classmethod
+    def archivable_lactations(cls, horizon=None):
+        horizon = horizon or cls.horizon()
+        return Lactation.objects.filter(
+            end_date__lt=horizon,
+            id__in=Milk.objects.filter(lactation__isnull=False).values("lactation"),
+        ).order_by("end_date", "id")
+
+    @classmethod
+    def archive_lactation(cls, lactation):
+        with transaction.atomic():
+            milk_records = Milk.objects.filter(lactation=lactation)
+            archived_records = ArchivedMilk.objects.bulk_create(
+                [
+                    ArchivedMilk(
+                        id=record["id"],
+                        cow_id=record["cow"],
+                        lactation_id=record["lactation"],
+                        milking_date=record["milking_date"],
+                        amount_in_kgs=record["amount_in_kgs"],
+                    )
+                    for record in milk_records.values(*cls.RECORD_FIELDS)
+                ],
+                batch_size=cls.BATCH_SIZE,
+            )
+
+            # Rolled up from the whole archive of the lactation, in case milk was added to it
+            # after a previous run
+            MilkRollup.objects.filter(lactation=lactation).delete()
+            MilkRollup.objects.bulk_create(
+                [
+                    MilkRollup(
+                        cow_id=lactation.cow_id,
+                        lactation=lactation,
+                        date=rollup["date"],
+                        number_of_milkings=rollup["number_of_milkings"],
+                        total_amount_in_kgs=rollup["total_amount_in_kgs"],
+                    )
+                    for rollup in ArchivedMilk.objects.filter(lactation=lactation)
+                    .annotate(date=TruncDate("milking_date"))
+                    .values("date")
+                    .annotate(
+                        number_of_milkings=Count("id"),
+                        total_amount_in_kgs=Sum("amount_in_kgs"),
+                    )
+                    .order_by("date")
+                ],
+                batch_size=cls.BATCH_SIZE,
+            )
+            milk_records.delete()
+        return len(archived_records)
+
+    @classmethod
+    def archive(cls, horizon=None):
+        number_of_lactations = number_of_records = 0
+        for lactation in cls.archivable_lactations(horizon).iterator():
+            number_of_records += cls.archive_lactation(lactation)
+            number_of_lactations += 1
+        return number_of_lactations, number_of_records
+
+    @staticmethod
+    def spans_archive(start_date=None):
+        rollups = MilkRollup.objects.all()
+        if start_date:
+            rollups = rollups.filter(date__gte=start_date)
+        return rollups.exists()
+
+    @staticmethod
+    def _filter_range(queryset, field_name, start_date, end_date, cow_ids):
+        if start_date:
+            queryset = queryset.filter(**{f"{field_name}__gte": start_of_day(start_date)})
+        if end_date:
+            queryset = queryset.filter(
+                **{f"{field_name}__lt": start_of_day(end_date + timedelta(days=1))}
+            )
+        if cow_ids:
+            queryset = queryset.filter(cow__in=cow_ids)
+        return queryset
+
+    @classmethod
+    def daily_totals(cls, start_date=None, end_date=None, cow_ids=None):
+        """
+        Returns the `date`, the `number_of_milkings` and the `total_amount_in_kgs` of each day
+        with milk in the range, ordered by date.
+        """
+        totals = {}
+        hot_totals = (
+            cls._filter_range(Milk.objects.all(), "milking_date", start_date, end_date, cow_ids)
+            .annotate(date=TruncDate("milking_date"))
+            .values("date")
+            .annotate(
+                number_of_milkings=Count("id"),
+                total_amount_in_kgs=Sum("amount_in_kgs"),
+            )
+            .order_by("date")
+        )
+        for total in hot_totals:
+            totals[total["date"]] = total
+
+        if cls.spans_archive(start_date):
+            rollups = MilkRollup.objects.all()
+            if start_date:
+                rollups = rollups.filter(date__gte=start_date)
+            if end_date:
+                rollups = rollups.filter(date__lte=end_date)
+            if cow_ids:
+                rollups = rollups.filter(cow__in=cow_ids)
+            for rollup in (
+                rollups.values("date")
+                .annotate(
+                    number_of_milkings=Sum("number_of_milkings"),
+                    total_amount_in_kgs=Sum("total_amount_in_kgs"),
+                )
+                .order_by("date")
+            ):
+                total = totals.setdefault(
+                    rollup["date"],
+                    {"date": rollup["date"], "number_of_milkings": 0, "total_amount_in_kgs": 0},
+                )
+                total["number_of_milkings"] += rollup["number_of_milkings"]
+                total["total_amount_in_kgs"] += rollup["total_amount_in_kgs"]
+
+        return [totals[date] for date in sorted(totals)]
+
+    @classmethod
+    def records(cls, start_date=None, end_date=None, cow_ids=None):
+        """
+        Returns the values of the milk records in the range ordered by milking date, reading
+        the archive through a `UNION ALL` only when the range needs it.
+        """
+        hot_records = cls._filter_range(
+            Milk.objects.all(), "milking_date", start_date, end_date, cow_ids
+        ).values(*cls.RECORD_FIELDS)
+        if not cls.spans_archive(start_date):
+            return hot_records.order_by("milking_date", "id")
+        archived_records = cls._filter_range(
+            ArchivedMilk.objects.all(), "milking_date", start_date, end_date, cow_ids
+        ).values(*cls.RECORD_FIELDS)
+        return hot_records.union(archived_records, all=True).order_by("milking_date", "id")
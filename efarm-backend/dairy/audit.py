@@ -0,0 +1,199 @@
+from datetime import date, timedelta
+
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from dairy.choices import (
+    CowAvailabilityChoices,
+    CowCategoryChoices,
+    CowPregnancyChoices,
+    SexChoices,
+)
+from dairy.lifecycle import HerdLifecycle
+from dairy.models import Cow, Lactation, Milk, Pregnancy
+
+
+class HerdAudit:
+    """
+    Checks the invariants enforced by the model validators against the whole herd at once.
+
+    Validators only run when a record is saved, so legacy or imported data breaking them goes
+    unnoticed until somebody edits it. Each invariant is instead expressed as a single query
+    selecting the records that violate it, so auditing the herd costs a handful of queries
+    whatever its size and no model is instantiated or re-validated.
+
+    Methods:
+    - `checks()`: Returns the available checks, by name, as (description, queryset) pairs.
+    - `run(names, limit)`: Runs the checks, returning the number and sample ids of the offending records.
+
+    """
+
+    DEFAULT_SAMPLE_SIZE = 20
+
+    @staticmethod
+    def _male_cows_with_pregnancy_status(today):
+        return Cow.objects.filter(gender=SexChoices.MALE).exclude(
+            current_pregnancy_status=CowPregnancyChoices.UNAVAILABLE
+        )
+
+    @staticmethod
+    def _young_cows_with_pregnancy_status(today):
+        return Cow.objects.filter(date_of_birth__gte=today - timedelta(days=365)).exclude(
+            current_pregnancy_status=CowPregnancyChoices.UNAVAILABLE
+        )
+
+    @staticmethod
+    def _dead_cows_with_pregnancy_status(today):
+        return Cow.objects.filter(availability_status=CowAvailabilityChoices.DEAD).exclude(
+            current_pregnancy_status=CowPregnancyChoices.UNAVAILABLE
+        )
+
+    @staticmethod
+    def _dead_cows_without_date_of_death(today):
+        return Cow.objects.filter(
+            availability_status=CowAvailabilityChoices.DEAD, date_of_death__isnull=True
+        )
+
+    @staticmethod
+    def _living_cows_with_date_of_death(today):
+        return Cow.objects.filter(
+            availability_status=CowAvailabilityChoices.ALIVE, date_of_death__isnull=False
+        )
+
+    @staticmethod
+    def _milking_cows_without_calf_records(today):
+        return Cow.objects.filter(
+            category=CowCategoryChoices.MILKING_COW, is_bought=False
+        ).exclude(
+            Exists(Cow.objects.filter(dam=OuterRef("pk")))
+            | Exists(Pregnancy.objects.filter(cow=OuterRef("pk")))
+        )
+
+    @staticmethod
+    def _outdated_lifecycle(today):
+        return HerdLifecycle.annotate_expected(
+            Cow.objects.filter(availability_status=CowAvailabilityChoices.ALIVE), today
+        ).exclude(
+            category=F("expected_category"),
+            current_production_status=F("expected_production_status"),
+        )
+
+    @staticmethod
+    def _multiple_open_lactations(today):
+        other_open_lactations = Lactation.objects.filter(
+            cow=OuterRef("cow"), end_date__isnull=True
+        ).exclude(pk=OuterRef("pk"))
+        return Lactation.objects.filter(end_date__isnull=True).filter(Exists(other_open_lactations))
+
+    @staticmethod
+    def _overlapping_lactations(today):
+        # Open lactations are treated as running indefinitely
+        open_ended = date.max
+        overlapping_lactations = (
+            Lactation.objects.annotate(last_date=Coalesce("end_date", open_ended))
+            .filter(
+                cow=OuterRef("cow"),
+                start_date__lte=OuterRef("last_date"),
+                last_date__gte=OuterRef("start_date"),
+            )
+            .exclude(pk=OuterRef("pk"))
+        )
+        return Lactation.objects.annotate(last_date=Coalesce("end_date", open_ended)).filter(
+            Exists(overlapping_lactations)
+        )
+
+    @staticmethod
+    def _milk_without_lactation(today):
+        return Milk.objects.filter(lactation__isnull=True)
+
+    @staticmethod
+    def _milk_outside_lactation(today):
+        return Milk.objects.filter(lactation__isnull=False).filter(
+            Q(milking_date__date__lt=F("lactation__start_date"))
+            | Q(milking_date__date__gt=F("lactation__end_date"))
+        )
+
+    @staticmethod
+    def _milk_from_male_cows(today):
+        return Milk.objects.filter(cow__gender=SexChoices.MALE)
+
+    @staticmethod
+    def _calvings_before_pregnancy(today):
+        return Pregnancy.objects.filter(date_of_calving__lt=F("start_date"))
+
+    @classmethod
+    def checks(cls):
+        return {
+            "male_cows_with_pregnancy_status": (
+                "Male cows with a pregnancy status other than 'Unavailable'.",
+                cls._male_cows_with_pregnancy_status,
+            ),
+            "young_cows_with_pregnancy_status": (
+                "Cows under 12 months with a pregnancy status other than 'Unavailable'.",
+                cls._young_cows_with_pregnancy_status,
+            ),
+            "dead_cows_with_pregnancy_status": (
+                "Dead cows with a pregnancy status other than 'Unavailable'.",
+                cls._dead_cows_with_pregnancy_status,
+            ),
+            "dead_cows_without_date_of_death": (
+                "Dead cows without a date of death.",
+                cls._dead_cows_without_date_of_death,
+            ),
+            "living_cows_with_date_of_death": (
+                "Living cows with a date of death.",
+                cls._living_cows_with_date_of_death,
+            ),
+            "milking_cows_without_calf_records": (
+                "Milking cows born in the farm without calves or pregnancies.",
+                cls._milking_cows_without_calf_records,
+            ),
+            "outdated_lifecycle": (
+                "Living cows whose category or production status does not match their age.",
+                cls._outdated_lifecycle,
+            ),
+            "multiple_open_lactations": (
+                "Lactations left open while the cow has another open lactation.",
+                cls._multiple_open_lactations,
+            ),
+            "overlapping_lactations": (
+                "Lactations overlapping another lactation of the same cow.",
+                cls._overlapping_lactations,
+            ),
+            "milk_without_lactation": (
+                "Milk records not linked to a lactation.",
+                cls._milk_without_lactation,
+            ),
+            "milk_outside_lactation": (
+                "Milk records dated outside the lactation they are linked to.",
+                cls._milk_outside_lactation,
+            ),
+            "milk_from_male_cows": (
+                "Milk records of male cows.",
+                cls._milk_from_male_cows,
+            ),
+            "calvings_before_pregnancy": (
+                "Pregnancies with a date of calving before their start date.",
+                cls._calvings_before_pregnancy,
+            ),
+        }
+
+    @classmethod
+    def run(cls, names=None, limit=DEFAULT_SAMPLE_SIZE, today=None):
+        today = today or timezone.localdate()
+        checks = cls.checks()
+        report = []
+        for name in names or checks:
+            description, build_queryset = checks[name]
+            queryset = build_queryset(today)
+            report.append(
+                {
+                    "check": name,
+                    "description": description,
+                    "model": queryset.model.__name__,
+                    "number_of_violations": queryset.count(),
+                    "sample_ids": list(queryset.order_by("pk").values_list("pk", flat=True)[:limit]),
+                }
+            )
+        return report
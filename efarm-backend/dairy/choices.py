@@ -183,3 +183,28 @@ class CowPenCategoriesChoices(models.TextChoices):
 class SemenSourceChoices(models.TextChoices):
     KALRO = "Kenya Agricultural and Livestock Research Organization"
     KAGRIC = "Kenya Agricultural and Livestock Research Institute"
+
+
+class HealthProtocolTypeChoices(models.TextChoices):
+    """
+    Choices for the type of health work due on a cow.
+
+    - `Vaccination`: A vaccine, or its booster, is due.
+    - `Treatment`: A scheduled or ongoing treatment is due.
+    """
+
+    VACCINATION = "Vaccination"
+    TREATMENT = "Treatment"
+
+
+class SearchResultTypeChoices(models.TextChoices):
+    """
+    Choices for the type of record a search result refers to.
+    """
+
+    COW = "Cow"
+    INSEMINATOR = "Inseminator"
+    PREGNANCY = "Pregnancy"
+    TREATMENT = "Treatment"
+    DISEASE = "Disease"
+    SYMPTOM = "Symptom"
@@ -1,6 +1,20 @@
 from django_filters import rest_framework as filters
 
 from dairy.models import *
+from efarm.filters import (
+    ChoiceContainsFilter,
+    DateFromFilter,
+    DateRangeFilterSet,
+    DateToFilter,
+    NormalizedFilter,
+    PrefixFilter,
+)
+from efarm.lookups import normalize_text
+
+
+def normalize_tag_number(value):
+    # Tag numbers are stored with the upper case letters of the breed, such as "FR-2020-12"
+    return value.strip().upper()
 
 
 class CowBreedFilterSet(filters.FilterSet):
@@ -20,7 +34,7 @@ class CaseInsensitiveBooleanFilter(filters.BooleanFilter):
         return super().filter(qs, value)
 
 
-class CowFilterSet(filters.FilterSet):
+class CowFilterSet(DateRangeFilterSet):
     breed = filters.CharFilter(field_name="breed__name", lookup_expr="icontains")
     is_bought = CaseInsensitiveBooleanFilter(field_name="is_bought")
     gender = filters.CharFilter(field_name="gender", lookup_expr="exact")
@@ -37,18 +51,26 @@ class CowFilterSet(filters.FilterSet):
         field_name="date_of_birth__day", lookup_expr="exact"
     )
     date_of_birth = filters.DateFilter(field_name="date_of_birth", lookup_expr="exact")
-    availability_status = filters.CharFilter(
-        field_name="availability_status", lookup_expr="icontains"
-    )
-    current_pregnancy_status = filters.CharFilter(
-        field_name="current_pregnancy_status", lookup_expr="icontains"
-    )
-    category = filters.CharFilter(field_name="category", lookup_expr="icontains")
-    current_production_status = filters.CharFilter(
-        field_name="current_production_status", lookup_expr="icontains"
-    )
-    tag_number = filters.CharFilter(field_name="tag_number", lookup_expr="icontains")
+    date_of_birth_from = DateFromFilter(field_name="date_of_birth")
+    date_of_birth_to = DateToFilter(field_name="date_of_birth")
+    availability_status = ChoiceContainsFilter(field_name="availability_status")
+    current_pregnancy_status = ChoiceContainsFilter(field_name="current_pregnancy_status")
+    category = ChoiceContainsFilter(field_name="category")
+    current_production_status = ChoiceContainsFilter(field_name="current_production_status")
+    tag_number = NormalizedFilter(field_name="tag_number", normalize=normalize_tag_number)
+    tag_number_prefix = PrefixFilter(field_name="tag_number", normalize=normalize_tag_number)
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
+    current_pen = filters.NumberFilter(field_name="current_pen", lookup_expr="exact")
+    current_barn = filters.NumberFilter(field_name="current_barn", lookup_expr="exact")
+
+    date_part_filters = {
+        "date_of_birth": {
+            "year": "year_of_birth",
+            "month": "month_of_birth",
+            "week": "week_of_birth",
+            "day": "day_of_birth",
+        }
+    }
 
     class Meta:
         model = Cow
@@ -61,12 +83,17 @@ class CowFilterSet(filters.FilterSet):
             "week_of_birth",
             "day_of_birth",
             "date_of_birth",
+            "date_of_birth_from",
+            "date_of_birth_to",
             "availability_status",
             "current_pregnancy_status",
             "category",
             "current_production_status",
             "tag_number",
+            "tag_number_prefix",
             "name",
+            "current_pen",
+            "current_barn",
         ]
 
 
@@ -74,25 +101,33 @@ class HeatFilterSet(filters.FilterSet):
     observation_time = filters.DateTimeFilter(
         field_name="observation_time", lookup_expr="exact"
     )
+    observation_time_from = DateFromFilter(field_name="observation_time")
+    observation_time_to = DateToFilter(field_name="observation_time")
 
     class Meta:
         model = Heat
-        fields = ["observation_time"]
+        fields = ["observation_time", "observation_time_from", "observation_time_to"]
 
 
 class InseminatorFilterSet(filters.FilterSet):
-    first_name = filters.CharFilter(field_name="first_name", lookup_expr="icontains")
-    last_name = filters.CharFilter(field_name="last_name", lookup_expr="icontains")
+    first_name = NormalizedFilter(field_name="normalized_first_name", normalize=normalize_text)
+    last_name = NormalizedFilter(field_name="normalized_last_name", normalize=normalize_text)
+    first_name_prefix = PrefixFilter(field_name="normalized_first_name", normalize=normalize_text)
+    last_name_prefix = PrefixFilter(field_name="normalized_last_name", normalize=normalize_text)
 
     class Meta:
         model = Inseminator
-        fields = ["first_name", "last_name"]
+        fields = ["first_name", "last_name", "first_name_prefix", "last_name_prefix"]
 
 
-class InseminationFilterSet(filters.FilterSet):
-    cow = filters.CharFilter(field_name="cow__tag_number", lookup_expr="icontains")
-    inseminator = filters.CharFilter(
-        field_name="inseminator__first_name", lookup_expr="icontains"
+class InseminationFilterSet(DateRangeFilterSet):
+    cow = NormalizedFilter(field_name="cow__tag_number", normalize=normalize_tag_number)
+    cow_prefix = PrefixFilter(field_name="cow__tag_number", normalize=normalize_tag_number)
+    inseminator = NormalizedFilter(
+        field_name="inseminator__normalized_first_name", normalize=normalize_text
+    )
+    inseminator_prefix = PrefixFilter(
+        field_name="inseminator__normalized_first_name", normalize=normalize_text
     )
     success = CaseInsensitiveBooleanFilter(field_name="success")
     date_of_insemination = filters.DateTimeFilter(
@@ -110,48 +145,69 @@ class InseminationFilterSet(filters.FilterSet):
     day_of_insemination = filters.NumberFilter(
         field_name="date_of_insemination__day", lookup_expr="exact"
     )
+    date_of_insemination_from = DateFromFilter(field_name="date_of_insemination")
+    date_of_insemination_to = DateToFilter(field_name="date_of_insemination")
+
+    date_part_filters = {
+        "date_of_insemination": {
+            "year": "year_of_insemination",
+            "month": "month_of_insemination",
+            "week": "week_of_insemination",
+            "day": "day_of_insemination",
+        }
+    }
 
     class Meta:
         model = Insemination
-        fields = ["cow", "success", "inseminator", "year_of_insemination", "month_of_insemination",
-                  "week_of_insemination", "day_of_insemination"]
+        fields = ["cow", "cow_prefix", "success", "inseminator", "inseminator_prefix",
+                  "year_of_insemination", "month_of_insemination", "week_of_insemination",
+                  "day_of_insemination", "date_of_insemination_from", "date_of_insemination_to"]
 
 
-class PregnancyFilterSet(filters.FilterSet):
-    cow = filters.CharFilter(field_name="cow__tag_number", lookup_expr="icontains")
+class PregnancyFilterSet(DateRangeFilterSet):
+    cow = NormalizedFilter(field_name="cow__tag_number", normalize=normalize_tag_number)
+    cow_prefix = PrefixFilter(field_name="cow__tag_number", normalize=normalize_tag_number)
     start_date = filters.DateFilter(field_name="start_date")
     year = filters.NumberFilter(field_name="start_date__year", lookup_expr="exact")
     month = filters.NumberFilter(field_name="start_date__month", lookup_expr="exact")
+    start_date_from = DateFromFilter(field_name="start_date")
+    start_date_to = DateToFilter(field_name="start_date")
     pregnancy_failed_date = filters.DateFilter(field_name="pregnancy_failed_date")
-    pregnancy_outcome = filters.CharFilter(
-        field_name="pregnancy_outcome", lookup_expr="icontains"
-    )
-    pregnancy_status = filters.CharFilter(
-        field_name="pregnancy_status", lookup_expr="icontains"
-    )
+    pregnancy_outcome = ChoiceContainsFilter(field_name="pregnancy_outcome")
+    pregnancy_status = ChoiceContainsFilter(field_name="pregnancy_status")
+
+    date_part_filters = {"start_date": {"year": "year", "month": "month"}}
 
     class Meta:
         model = Pregnancy
-        fields = ["cow", "start_date", "year", "month", "pregnancy_failed_date", "pregnancy_outcome",
-                  "pregnancy_status"]
+        fields = ["cow", "cow_prefix", "start_date", "year", "month", "start_date_from",
+                  "start_date_to", "pregnancy_failed_date", "pregnancy_outcome", "pregnancy_status"]
 
 
-class LactationFilterSet(filters.FilterSet):
+class LactationFilterSet(DateRangeFilterSet):
     start_date = filters.DateFilter(field_name="start_date")
     year = filters.NumberFilter(field_name="start_date__year", lookup_expr="exact")
     month = filters.NumberFilter(field_name="start_date__month", lookup_expr="exact")
+    start_date_from = DateFromFilter(field_name="start_date")
+    start_date_to = DateToFilter(field_name="start_date")
     lactation_number = filters.NumberFilter(
         field_name="lactation_number", lookup_expr="exact"
     )
 
+    date_part_filters = {"start_date": {"year": "year", "month": "month"}}
+
     class Meta:
         model = Lactation
-        fields = ["start_date", "year", "month", "lactation_number"]
+        fields = ["start_date", "year", "month", "start_date_from", "start_date_to",
+                  "lactation_number"]
 
 
-class MilkFilterSet(filters.FilterSet):
-    cow = filters.CharFilter(field_name="cow__tag_number", lookup_expr="icontains")
+class MilkFilterSet(DateRangeFilterSet):
+    cow = NormalizedFilter(field_name="cow__tag_number", normalize=normalize_tag_number)
+    cow_prefix = PrefixFilter(field_name="cow__tag_number", normalize=normalize_tag_number)
     milking_date = filters.DateTimeFilter(field_name="milking_date")
+    milking_date_from = DateFromFilter(field_name="milking_date")
+    milking_date_to = DateToFilter(field_name="milking_date")
     day_of_milking = filters.NumberFilter(
         field_name="milking_date__day", lookup_expr="exact"
     )
@@ -165,14 +221,24 @@ class MilkFilterSet(filters.FilterSet):
         field_name="milking_date__year", lookup_expr="exact"
     )
 
+    date_part_filters = {
+        "milking_date": {
+            "year": "year_of_milking",
+            "month": "month_of_milking",
+            "week": "week_of_milking",
+            "day": "day_of_milking",
+        }
+    }
+
     class Meta:
         model = Milk
-        fields = ["cow", "milking_date", "day_of_milking", "week_of_milking", "month_of_milking",
-                  "year_of_milking"]
+        fields = ["cow", "cow_prefix", "milking_date", "milking_date_from", "milking_date_to",
+                  "day_of_milking", "week_of_milking", "month_of_milking", "year_of_milking"]
 
 
-class WeightRecordFilterSet(filters.FilterSet):
-    cow = filters.CharFilter(field_name="cow__tag_number", lookup_expr="icontains")
+class WeightRecordFilterSet(DateRangeFilterSet):
+    cow = NormalizedFilter(field_name="cow__tag_number", normalize=normalize_tag_number)
+    cow_prefix = PrefixFilter(field_name="cow__tag_number", normalize=normalize_tag_number)
     day_of_weighing = filters.NumberFilter(field_name="date__day", lookup_expr="exact")
     month_of_weighing = filters.NumberFilter(
         field_name="date__month", lookup_expr="exact"
@@ -180,27 +246,62 @@ class WeightRecordFilterSet(filters.FilterSet):
     year_of_weighing = filters.NumberFilter(
         field_name="date__year", lookup_expr="exact"
     )
+    date_from = DateFromFilter(field_name="date")
+    date_to = DateToFilter(field_name="date")
+
+    date_part_filters = {
+        "date": {"year": "year_of_weighing", "month": "month_of_weighing", "day": "day_of_weighing"}
+    }
 
     class Meta:
         model = WeightRecord
-        fields = ["cow", "day_of_weighing", "month_of_weighing", "year_of_weighing"]
+        fields = ["cow", "cow_prefix", "day_of_weighing", "month_of_weighing", "year_of_weighing",
+                  "date_from", "date_to"]
 
 
-class CullingRecordFilterSet(filters.FilterSet):
+class CullingRecordFilterSet(DateRangeFilterSet):
     day_of_culling = filters.NumberFilter(field_name="date__day", lookup_expr="exact")
     month_of_culling = filters.NumberFilter(
         field_name="date__month", lookup_expr="exact"
     )
     year_of_culling = filters.NumberFilter(field_name="date__year", lookup_expr="exact")
+    date_from = DateFromFilter(field_name="date")
+    date_to = DateToFilter(field_name="date")
+
+    date_part_filters = {
+        "date": {"year": "year_of_culling", "month": "month_of_culling", "day": "day_of_culling"}
+    }
 
     class Meta:
         model = CullingRecord
-        fields = ["day_of_culling", "month_of_culling", "year_of_culling"]
+        fields = ["day_of_culling", "month_of_culling", "year_of_culling", "date_from", "date_to"]
 
 
 class QuarantineRecordFilterSet(filters.FilterSet):
     reason = filters.CharFilter(lookup_expr="icontains")
+    start_date_from = DateFromFilter(field_name="start_date")
+    start_date_to = DateToFilter(field_name="start_date")
 
     class Meta:
         model = QuarantineRecord
-        fields = ["reason"]
+        fields = ["reason", "start_date_from", "start_date_to"]
+
+
+class CowFertilityRecordFilterSet(filters.FilterSet):
+    cow = filters.NumberFilter(field_name="cow", lookup_expr="exact")
+    min_days_open = filters.NumberFilter(field_name="days_open", lookup_expr="gte")
+
+    class Meta:
+        model = CowFertilityRecord
+        fields = ["cow", "min_days_open"]
+
+
+class MilkYieldAlertFilterSet(filters.FilterSet):
+    cow = filters.NumberFilter(field_name="cow", lookup_expr="exact")
+    is_acknowledged = filters.BooleanFilter(field_name="is_acknowledged")
+    milking_date_from = DateFromFilter(field_name="milking_date")
+    milking_date_to = DateToFilter(field_name="milking_date")
+
+    class Meta:
+        model = MilkYieldAlert
+        fields = ["cow", "is_acknowledged", "milking_date_from", "milking_date_to"]
@@ -0,0 +1,136 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from dairy.models import Cow
+
+
+class HerdPedigree:
+    """
+    Integer-indexed pedigree of the herd used to compute additive relationships and inbreeding.
+
+    Cows are numbered so that parents always come before their offspring and the sire and dam of
+    each cow are kept as indices into two flat lists. Additive relationships are then computed
+    with the tabular method, each coefficient being derived from the coefficients of the parents
+    of the younger cow and memoized for the duration of the call, so a relationship is never
+    computed twice within it, such as for the ancestors shared by the bulls ranked for a cow.
+
+    The pedigree is built from a single query and shared, unchanged, by every request and thread
+    of the process until the herd changes: adding or deleting a cow bumps a version stored in the cache, which makes
+    the next call to `current()` rebuild the pedigree. It holds the cows of every farm, cows being
+    looked up by id.
+
+    Methods:
+    - `current()`: Returns the pedigree of the current herd, rebuilding it if the herd changed.
+    - `invalidate()`: Marks the cached pedigree as outdated.
+    - `additive_relationship(cow_id, other_cow_id)`: Returns the additive relationship of two cows.
+    - `inbreeding_coefficient(cow_id)`: Returns the inbreeding coefficient of a cow.
+    - `prospective_inbreeding_coefficient(sire_id, dam_id)`: Returns the inbreeding coefficient of their calf.
+    - `rank_sires(dam_id, sire_ids)`: Orders sires by the inbreeding coefficient of their calf with the dam.
+
+    """
+
+    UNKNOWN = -1
+    VERSION_CACHE_KEY = "dairy:herd-pedigree-version"
+
+    _current = None
+
+    def __init__(self, cows, version=None):
+        """
+        Builds the pedigree from (`id`, `sire_id`, `dam_id`) tuples.
+        """
+        self.version = version
+        parents = {cow_id: (sire_id, dam_id) for cow_id, sire_id, dam_id in cows}
+        self.indices = {}
+        self.sires = []
+        self.dams = []
+
+        for cow_id in parents:
+            # Number the unnumbered ancestors of the cow first, parents before offspring
+            stack = [cow_id]
+            visiting = set()
+            while stack:
+                current_id = stack[-1]
+                if current_id in self.indices:
+                    stack.pop()
+                    continue
+                visiting.add(current_id)
+                # Parents already being numbered would only be reached through a corrupt, cyclic pedigree
+                pending_parents = [
+                    parent_id
+                    for parent_id in parents[current_id]
+                    if parent_id in parents
+                    and parent_id not in self.indices
+                    and parent_id not in visiting
+                ]
+                if pending_parents:
+                    stack.extend(pending_parents)
+                    continue
+                stack.pop()
+                visiting.discard(current_id)
+                sire_id, dam_id = parents[current_id]
+                self.indices[current_id] = len(self.sires)
+                self.sires.append(self.indices.get(sire_id, self.UNKNOWN))
+                self.dams.append(self.indices.get(dam_id, self.UNKNOWN))
+
+    @classmethod
+    def current(cls):
+        version = cache.get(cls.VERSION_CACHE_KEY)
+        if version is None:
+            version = uuid4().hex
+            cache.set(cls.VERSION_CACHE_KEY, version, timeout=None)
+
+        if cls._current is None or cls._current.version != version:
+            cows = Cow.objects.all_farms().values_list("id", "sire_id", "dam_id")
+            cls._current = cls(cows, version=version)
+        return cls._current
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete(cls.VERSION_CACHE_KEY)
+
+    def _relationship(self, index, other_index, relationships):
+        if index == self.UNKNOWN or other_index == self.UNKNOWN:
+            return 0.0
+        # The younger cow is numbered last and can not be an ancestor of the other cow
+        if index > other_index:
+            index, other_index = other_index, index
+
+        key = (index, other_index)
+        if key not in relationships:
+            sire, dam = self.sires[other_index], self.dams[other_index]
+            if index == other_index:
+                relationship = 1 + 0.5 * self._relationship(sire, dam, relationships)
+            else:
+                relationship = 0.5 * (
+                    self._relationship(index, sire, relationships)
+                    + self._relationship(index, dam, relationships)
+                )
+            relationships[key] = relationship
+        return relationships[key]
+
+    def additive_relationship(self, cow_id, other_cow_id, relationships=None):
+        return self._relationship(
+            self.indices.get(cow_id, self.UNKNOWN),
+            self.indices.get(other_cow_id, self.UNKNOWN),
+            {} if relationships is None else relationships,
+        )
+
+    def inbreeding_coefficient(self, cow_id):
+        index = self.indices.get(cow_id, self.UNKNOWN)
+        if index == self.UNKNOWN:
+            return 0.0
+        return 0.5 * self._relationship(self.sires[index], self.dams[index], {})
+
+    def prospective_inbreeding_coefficient(self, sire_id, dam_id, relationships=None):
+        return 0.5 * self.additive_relationship(sire_id, dam_id, relationships)
+
+    def rank_sires(self, dam_id, sire_ids):
+        # The relationships of the dam to the ancestors of the sires are shared by the sires
+        relationships = {}
+        coefficients = [
+            (self.prospective_inbreeding_coefficient(sire_id, dam_id, relationships), sire_id)
+            for sire_id in sire_ids
+        ]
+        return sorted(coefficients)
+
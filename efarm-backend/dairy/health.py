@@ -0,0 +1,175 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from dairy.choices import CowAvailabilityChoices, HealthProtocolTypeChoices
+from dairy.models import HealthDueItem, Treatment, Vaccination, VaccinationProtocol
+
+
+class HealthSchedule:
+    """
+    Maintains `HealthDueItem`, the next date each vaccination and treatment protocol is due on
+    each cow, and reads the daily worklist of the vet team from it.
+
+    Items are updated as vaccinations, treatments and vaccination protocols are saved, so the
+    worklist of a day is a single range query on the indexed `next_due_date`, joined with the
+    current barn stored on the cow.
+
+    Methods:
+    - `treatment_protocol(treatment)`: Returns the protocol name of a treatment.
+    - `record_vaccination(vaccination)`: Schedules the next dose of the vaccine given.
+    - `remove_vaccination(vaccination)`: Unschedules the next dose of a deleted vaccination.
+    - `record_treatment(treatment)`: Schedules a pending treatment, or unschedules a finished one.
+    - `refresh_vaccination_protocol(vaccine_name)`: Reschedules every cow given the vaccine.
+    - `rebuild()`: Recomputes every item from the vaccinations and treatments, returning their number.
+    - `worklist(date)`: Returns the work due on or before the date, grouped by barn.
+
+    """
+
+    # Treatments still to be given, any other status takes the treatment off the worklist
+    DUE_TREATMENT_STATUSES = ["Scheduled", "In progress", "Postponed"]
+
+    @staticmethod
+    def treatment_protocol(treatment):
+        return f"{treatment.disease.name}: {treatment.treatment_method}"[:255]
+
+    @staticmethod
+    def _vaccination_items(vaccinations):
+        intervals = dict(VaccinationProtocol.objects.values_list("vaccine_name", "interval_in_days"))
+        return [
+            HealthDueItem(
+                cow_id=vaccination["cow"],
+                protocol_type=HealthProtocolTypeChoices.VACCINATION,
+                protocol=vaccination["vaccine_name"],
+                last_done_date=vaccination["date_given"],
+                next_due_date=vaccination["date_given"]
+                + timedelta(days=intervals[vaccination["vaccine_name"]]),
+            )
+            for vaccination in vaccinations.filter(vaccine_name__in=intervals).values(
+                "cow", "vaccine_name", "date_given"
+            )
+        ]
+
+    @staticmethod
+    def _upsert(items):
+        HealthDueItem.objects.bulk_create(
+            items,
+            update_conflicts=True,
+            unique_fields=["cow", "protocol_type", "protocol"],
+            update_fields=["treatment", "last_done_date", "next_due_date"],
+        )
+
+    @classmethod
+    def record_vaccination(cls, vaccination):
+        items = cls._vaccination_items(Vaccination.objects.filter(pk=vaccination.pk))
+        if items:
+            cls._upsert(items)
+        else:
+            cls.remove_vaccination(vaccination)
+
+    @staticmethod
+    def remove_vaccination(vaccination):
+        HealthDueItem.objects.filter(
+            cow=vaccination.cow_id,
+            protocol_type=HealthProtocolTypeChoices.VACCINATION,
+            protocol=vaccination.vaccine_name,
+        ).delete()
+
+    @classmethod
+    def record_treatment(cls, treatment):
+        items = HealthDueItem.objects.filter(treatment=treatment)
+        if treatment.treatment_status not in cls.DUE_TREATMENT_STATUSES:
+            items.delete()
+            return
+        item = cls._treatment_item(treatment)
+        # The protocol changes when the method of the treatment is edited
+        items.exclude(protocol=item.protocol).delete()
+        cls._upsert([item])
+
+    @classmethod
+    def _treatment_item(cls, treatment):
+        return HealthDueItem(
+            cow_id=treatment.cow_id,
+            protocol_type=HealthProtocolTypeChoices.TREATMENT,
+            protocol=cls.treatment_protocol(treatment),
+            treatment=treatment,
+            next_due_date=timezone.localdate(treatment.date_of_treatment),
+        )
+
+    @classmethod
+    def refresh_vaccination_protocol(cls, vaccine_name):
+        with transaction.atomic():
+            HealthDueItem.objects.filter(
+                protocol_type=HealthProtocolTypeChoices.VACCINATION, protocol=vaccine_name
+            ).delete()
+            cls._upsert(cls._vaccination_items(Vaccination.objects.filter(vaccine_name=vaccine_name)))
+
+    @classmethod
+    def rebuild(cls):
+        items = cls._vaccination_items(Vaccination.objects.all())
+        # Ordered so the latest pending treatment of a protocol wins
+        treatments = (
+            Treatment.objects.filter(treatment_status__in=cls.DUE_TREATMENT_STATUSES)
+            .select_related("disease")
+            .order_by("date_of_treatment", "id")
+        )
+        treatment_items = {}
+        for treatment in treatments:
+            item = cls._treatment_item(treatment)
+            treatment_items[(item.cow_id, item.protocol)] = item
+        items.extend(treatment_items.values())
+
+        with transaction.atomic():
+            HealthDueItem.objects.all().delete()
+            HealthDueItem.objects.bulk_create(items)
+        return len(items)
+
+    @staticmethod
+    def worklist(date=None):
+        date = date or timezone.localdate()
+        items = (
+            HealthDueItem.objects.filter(
+                next_due_date__lte=date, cow__availability_status=CowAvailabilityChoices.ALIVE
+            )
+            .values(
+                "id",
+                "cow",
+                "cow__name",
+                "cow__current_barn",
+                "cow__current_barn__name",
+                "cow__current_pen",
+                "protocol_type",
+                "protocol",
+                "treatment",
+                "last_done_date",
+                "next_due_date",
+            )
+            .order_by("cow__current_barn__name", "cow__current_barn", "next_due_date", "cow__name")
+        )
+
+        barns = {}
+        for item in items:
+            barn = barns.setdefault(
+                item["cow__current_barn"],
+                {
+                    "barn": item["cow__current_barn"],
+                    "barn_name": item["cow__current_barn__name"],
+                    "items": [],
+                },
+            )
+            barn["items"].append(
+                {
+                    "id": item["id"],
+                    "cow": item["cow"],
+                    "cow_name": item["cow__name"],
+                    "pen": item["cow__current_pen"],
+                    "protocol_type": item["protocol_type"],
+                    "protocol": item["protocol"],
+                    "treatment": item["treatment"],
+                    "last_done_date": item["last_done_date"],
+                    "next_due_date": item["next_due_date"],
+                    "days_overdue": (date - item["next_due_date"]).days,
+                }
+            )
+        return list(barns.values())
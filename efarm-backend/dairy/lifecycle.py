@@ -0,0 +1,191 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, CharField, Exists, F, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from dairy.choices import (
+    CowAvailabilityChoices,
+    CowCategoryChoices,
+    CowProductionStatusChoices,
+    SexChoices,
+)
+from dairy.models import Cow, Pregnancy
+
+logger = logging.getLogger(__name__)
+
+
+class HerdLifecycle:
+    """
+    Recomputes the category and production status every living cow is expected to have at its
+    current age, following the rules enforced by `CowValidator`.
+
+    The expected values are computed by the database for the whole herd in one query: ages are
+    compared against date of birth cutoffs and calf records are detected with `EXISTS`
+    subqueries, so only the cows whose values changed are ever loaded. They are then written with
+    `bulk_update` in batches, bypassing `Cow.save()` and the signals it triggers, and the cow
+    inventory is refreshed once at the end.
+
+    Production statuses recorded by reproductive events (open, pregnant, lactating, dry) are kept
+    as long as they remain valid for the category of the cow, and culled or quarantined cows keep
+    their status.
+
+    Methods:
+    - `annotate_expected(queryset, today)`: Annotates `expected_category` and `expected_production_status`.
+    - `pending_transitions(today)`: Returns the living cows whose category or production status is outdated.
+    - `apply_transitions(batch_size, dry_run, today)`: Applies the pending transitions, returning them.
+
+    """
+
+    DEFAULT_BATCH_SIZE = 500
+
+    # Statuses set by the farm rather than by the age of the cow
+    PRESERVED_PRODUCTION_STATUSES = [
+        CowProductionStatusChoices.CULLED,
+        CowProductionStatusChoices.QUARANTINED,
+    ]
+
+    # Production statuses allowed for adult females, per (category, is_bought)
+    ADULT_FEMALE_PRODUCTION_STATUSES = {
+        (CowCategoryChoices.HEIFER, True): [
+            CowProductionStatusChoices.OPEN,
+            CowProductionStatusChoices.PREGNANT_NOT_LACTATING,
+        ],
+        (CowCategoryChoices.HEIFER, False): [
+            CowProductionStatusChoices.OPEN,
+            CowProductionStatusChoices.PREGNANT_NOT_LACTATING,
+        ],
+        (CowCategoryChoices.MILKING_COW, True): [
+            CowProductionStatusChoices.OPEN,
+            CowProductionStatusChoices.PREGNANT_AND_LACTATING,
+            CowProductionStatusChoices.DRY,
+        ],
+        (CowCategoryChoices.MILKING_COW, False): [
+            CowProductionStatusChoices.OPEN,
+            CowProductionStatusChoices.DRY,
+            CowProductionStatusChoices.PREGNANT_NOT_LACTATING,
+            CowProductionStatusChoices.PREGNANT_AND_LACTATING,
+        ],
+    }
+
+    @classmethod
+    def annotate_expected(cls, queryset, today=None):
+        today = today or timezone.localdate()
+        # Cows born after a cutoff are younger than the number of days it is named after
+        born_after = {days: today - timedelta(days=days) for days in (90, 180, 365, 730)}
+        female = Q(gender=SexChoices.FEMALE)
+
+        has_calf_records = Exists(Cow.objects.filter(dam=OuterRef("pk"))) | Exists(
+            Pregnancy.objects.filter(cow=OuterRef("pk"))
+        )
+
+        expected_category = Case(
+            When(date_of_birth__gt=born_after[90], then=Value(CowCategoryChoices.CALF)),
+            When(date_of_birth__gte=born_after[180], then=Value(CowCategoryChoices.WEANER)),
+            When(~female, then=Value(CowCategoryChoices.BULL)),
+            When(
+                is_bought=True,
+                category__in=[CowCategoryChoices.HEIFER, CowCategoryChoices.MILKING_COW],
+                then=F("category"),
+            ),
+            When(is_bought=True, then=Value(CowCategoryChoices.HEIFER)),
+            When(has_calf_records, then=Value(CowCategoryChoices.MILKING_COW)),
+            default=Value(CowCategoryChoices.HEIFER),
+            output_field=CharField(),
+        )
+
+        adult_female_statuses = [
+            When(
+                expected_category=category,
+                is_bought=is_bought,
+                current_production_status__in=statuses,
+                then=F("current_production_status"),
+            )
+            for (category, is_bought), statuses in cls.ADULT_FEMALE_PRODUCTION_STATUSES.items()
+        ]
+        expected_production_status = Case(
+            When(date_of_birth__gte=born_after[90], then=Value(CowProductionStatusChoices.CALF)),
+            When(date_of_birth__gte=born_after[180], then=Value(CowProductionStatusChoices.WEANER)),
+            When(
+                date_of_birth__gte=born_after[365],
+                then=Case(
+                    When(female, then=Value(CowProductionStatusChoices.YOUNG_HEIFER)),
+                    default=Value(CowProductionStatusChoices.YOUNG_BULL),
+                ),
+            ),
+            When(
+                current_production_status__in=cls.PRESERVED_PRODUCTION_STATUSES,
+                then=F("current_production_status"),
+            ),
+            When(
+                ~female & Q(date_of_birth__gte=born_after[730]),
+                then=Value(CowProductionStatusChoices.BULL),
+            ),
+            When(~female, then=Value(CowProductionStatusChoices.MATURE_BULL)),
+            *adult_female_statuses,
+            default=Value(CowProductionStatusChoices.OPEN),
+            output_field=CharField(),
+        )
+
+        return queryset.annotate(expected_category=expected_category).annotate(
+            expected_production_status=expected_production_status
+        )
+
+    @classmethod
+    def pending_transitions(cls, today=None):
+        queryset = cls.annotate_expected(
+            Cow.objects.filter(availability_status=CowAvailabilityChoices.ALIVE), today
+        )
+        return (
+            queryset.exclude(
+                category=F("expected_category"),
+                current_production_status=F("expected_production_status"),
+            )
+            .values(
+                "id",
+                "name",
+                "farm",
+                "category",
+                "current_production_status",
+                "expected_category",
+                "expected_production_status",
+            )
+            .order_by("id")
+        )
+
+    @classmethod
+    def apply_transitions(cls, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, today=None):
+        from dairy_inventory.models import CowInventory
+
+        transitions = list(cls.pending_transitions(today))
+        for transition in transitions:
+            logger.info(
+                "Cow %s (%s): category %s -> %s, production status %s -> %s",
+                transition["id"],
+                transition["name"],
+                transition["category"],
+                transition["expected_category"],
+                transition["current_production_status"],
+                transition["expected_production_status"],
+            )
+
+        if dry_run or not transitions:
+            return transitions
+
+        with transaction.atomic():
+            for start in range(0, len(transitions), batch_size):
+                cows = [
+                    Cow(
+                        pk=transition["id"],
+                        category=transition["expected_category"],
+                        current_production_status=transition["expected_production_status"],
+                    )
+                    for transition in transitions[start : start + batch_size]
+                ]
+                Cow.objects.bulk_update(
+                    cows, ["category", "current_production_status"], batch_size=batch_size
+                )
+            for farm_id in {transition["farm"] for transition in transitions}:
+                CowInventory.refresh(farm_id)
+        return transitions
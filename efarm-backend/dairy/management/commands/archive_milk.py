@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dairy.archiving import MilkArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the milk records of lactations closed before the archive horizon to the milk "
+        "archive, keeping their daily totals. Run daily or at the end of each season."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            help="Archive lactations closed more than this many days ago, "
+            "MILK_ARCHIVE_HORIZON_DAYS by default.",
+        )
+
+    def handle(self, *args, **options):
+        if options["horizon_days"] is not None and options["horizon_days"] < 0:
+            raise CommandError("The horizon must be a positive number of days.")
+
+        number_of_lactations, number_of_records = MilkArchive.archive(
+            MilkArchive.horizon(options["horizon_days"])
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {number_of_records} milk record(s) of {number_of_lactations} lactation(s)."
+            )
+        )
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dairy.audit import HerdAudit
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the records of the herd breaking the invariants enforced by the model validators, "
+        "such as male cows with a pregnancy status or milk recorded without a lactation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="append",
+            dest="checks",
+            choices=list(HerdAudit.checks()),
+            help="Run only this check, may be repeated.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=HerdAudit.DEFAULT_SAMPLE_SIZE,
+            help="Maximum number of offending ids listed per check.",
+        )
+        parser.add_argument(
+            "--fail-on-violations",
+            action="store_true",
+            help="Exit with an error when any violation is found.",
+        )
+
+    def handle(self, *args, **options):
+        report = HerdAudit.run(options["checks"], limit=options["limit"])
+        number_of_violations = 0
+        for result in report:
+            number_of_violations += result["number_of_violations"]
+            if not result["number_of_violations"]:
+                self.stdout.write(f"{result['check']}: OK")
+                continue
+            ids = ", ".join(str(pk) for pk in result["sample_ids"])
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{result['check']}: {result['number_of_violations']} {result['model']} record(s). "
+                    f"{result['description']} Ids: {ids}"
+                )
+            )
+
+        if number_of_violations and options["fail_on_violations"]:
+            raise CommandError(f"Found {number_of_violations} violation(s).")
+        self.stdout.write(self.style.SUCCESS(f"Found {number_of_violations} violation(s)."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from dairy.analytics import FertilityAnalytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the fertility indicators of every female cow. Records are refreshed as "
+        "reproductive events are saved; run nightly so days open stay current, and after bulk imports."
+    )
+
+    def handle(self, *args, **options):
+        number_of_cows = FertilityAnalytics.refresh_fertility_records()
+        self.stdout.write(
+            self.style.SUCCESS(f"Computed fertility records for {number_of_cows} cow(s).")
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from dairy.health import HealthSchedule
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the health due list from every vaccination and pending treatment. Items are "
+        "maintained as records are saved; run after bulk imports or direct database edits."
+    )
+
+    def handle(self, *args, **options):
+        number_of_items = HealthSchedule.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Scheduled {number_of_items} health due item(s)."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from dairy.monitoring import MilkYieldMonitor
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays the milk history to recompute the rolling yield statistics and yield alerts of "
+        "every cow. Statistics are updated as milk is recorded; run after bulk imports only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cow",
+            action="append",
+            type=int,
+            dest="cow_ids",
+            help="Only rebuild the statistics of this cow, may be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        number_of_cows = MilkYieldMonitor.rebuild(options["cow_ids"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the milk yield statistics of {number_of_cows} cow(s).")
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from dairy.search import SearchIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the full-text search index of the cows, inseminators, pregnancies, treatments, "
+        "diseases and symptoms. Run after migrating, or after records were bulk loaded."
+    )
+
+    def handle(self, *args, **options):
+        number_of_documents = SearchIndex.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {number_of_documents} record(s)."))
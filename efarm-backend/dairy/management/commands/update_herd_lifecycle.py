@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from dairy.lifecycle import HerdLifecycle
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves every living cow to the category and production status expected at its age, "
+        "e.g. calves to weaners and young bulls to bulls, then refreshes the cow inventory. "
+        "Schedule it nightly, for instance from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=HerdLifecycle.DEFAULT_BATCH_SIZE,
+            help="Number of cows written per bulk update.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the transitions without applying them.",
+        )
+
+    def handle(self, *args, **options):
+        transitions = HerdLifecycle.apply_transitions(
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        for transition in transitions:
+            self.stdout.write(
+                f"{transition['name']}: {transition['category']} -> {transition['expected_category']}, "
+                f"{transition['current_production_status']} -> {transition['expected_production_status']}"
+            )
+
+        verb = "Would update" if options["dry_run"] else "Updated"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(transitions)} cow(s)."))
@@ -3,11 +3,12 @@ from datetime import timedelta
 from django.db import models
 from .choices import *
 from dairy.utils import *
+from efarm.tenancy import UNSCOPED, FarmScopedManager, current_farm
 
 
-class CowManager(models.Manager):
+class CowManager(FarmScopedManager):
     """
-    Custom manager for the Cow model.
+    Custom manager for the Cow model, returning the cows of the current farm like `Cow.objects`.
 
     Methods:
     - `get_tag_number(cow)`: Generates and returns the tag number for a cow.
@@ -17,12 +18,48 @@ class CowManager(models.Manager):
     - `get_pregnant_cows()`: Returns a queryset of pregnant cows.
     - `get_male_cows()`: Returns a queryset of available (alive) male cows.
     - `get_female_cows()`: Returns a queryset of available (alive) female cows.
+    - `get_open_cows()`: Returns a queryset of available (alive) female cows that are not pregnant.
     - `get_sold_cows()`: Returns a queryset of sold cows.
     - `get_dead_cows()`: Returns a queryset of dead cows.
-    - `get_calf_records(cow)`: Returns a list of calf records associated with the cow.
+    - `get_calf_records(cow, generations)`: Returns a list of calf records associated with the cow.
+    - `get_ancestors(cow, generations)`: Returns the sires and dams of the cow up to `generations` back.
+    - `get_descendants(cow, generations)`: Returns the offspring of the cow up to `generations` down.
+    - `get_pedigree(cow, generations)`: Returns the ancestors of the cow as a nested tree.
+    - `get_progeny(cow, generations)`: Returns the descendants of the cow as a nested tree.
 
     """
 
+    # Each recursive step joins the cows of the previous generation to their parents (ancestors)
+    # or to their children (descendants), so a whole tree is resolved in a single query. The
+    # relatives joined are restricted to the current farm, raw queries not being scoped.
+    PEDIGREE_QUERIES = {
+        "ancestors": """
+            WITH RECURSIVE pedigree (cow_id, relative_id, relation, generation) AS (
+                SELECT id, NULL, NULL, 0 FROM {cow_table} WHERE id = %s
+                UNION ALL
+                SELECT parent.id, child.id,
+                       CASE WHEN parent.id = child.sire_id THEN 'sire' ELSE 'dam' END,
+                       pedigree.generation + 1
+                FROM pedigree
+                INNER JOIN {cow_table} child ON child.id = pedigree.cow_id
+                INNER JOIN {cow_table} parent
+                    ON parent.id = child.sire_id OR parent.id = child.dam_id
+                WHERE pedigree.generation < %s{farm_condition}
+            )
+        """,
+        "descendants": """
+            WITH RECURSIVE pedigree (cow_id, relative_id, relation, generation) AS (
+                SELECT id, NULL, NULL, 0 FROM {cow_table} WHERE id = %s
+                UNION ALL
+                SELECT child.id, pedigree.cow_id, 'offspring', pedigree.generation + 1
+                FROM pedigree
+                INNER JOIN {cow_table} child
+                    ON child.sire_id = pedigree.cow_id OR child.dam_id = pedigree.cow_id
+                WHERE pedigree.generation < %s{farm_condition}
+            )
+        """,
+    }
+
     @staticmethod
     def get_tag_number(cow):
         """
@@ -70,23 +107,118 @@ class CowManager(models.Manager):
         age_in_days = (todays_date - cow.date_introduced_in_farm).days
         return age_in_days
 
-    def get_calf_records(self, cow):
+    def get_calf_records(self, cow, generations=1):
         """
         Returns a list of calf records associated with the cow.
 
         Args:
         - `cow`: The cow object.
+        - `generations`: How many generations of descendants to include, only the direct calves by default.
 
         Returns:
         - A list of calf records associated with the cow.
 
         """
+        if generations > 1:
+            return [
+                descendant
+                for descendant in self.get_descendants(cow, generations)
+                if descendant.generation > 0
+            ]
         if cow.gender == SexChoices.FEMALE:
             calf_records = self.filter(dam=cow)
         else:
             calf_records = self.filter(sire=cow)
         return list(calf_records)
 
+    @staticmethod
+    def _farm_condition(direction):
+        relative = "parent" if direction == "ancestors" else "child"
+        farm_id = current_farm()
+        if farm_id is UNSCOPED:
+            return "", []
+        if farm_id is None:
+            return f" AND {relative}.farm_id IS NULL", []
+        return f" AND {relative}.farm_id = %s", [farm_id]
+
+    def _get_relatives(self, cow, generations, direction):
+        cow_table = self.model._meta.db_table
+        breed_table = self.model._meta.get_field("breed").related_model._meta.db_table
+        farm_condition, farm_params = self._farm_condition(direction)
+        query = self.PEDIGREE_QUERIES[direction].format(
+            cow_table=cow_table, farm_condition=farm_condition
+        ) + f"""
+            SELECT {cow_table}.*, {breed_table}.name AS breed_name,
+                   pedigree.relative_id, pedigree.relation, pedigree.generation
+            FROM pedigree
+            INNER JOIN {cow_table} ON {cow_table}.id = pedigree.cow_id
+            INNER JOIN {breed_table} ON {breed_table}.id = {cow_table}.breed_id
+            ORDER BY pedigree.generation, {cow_table}.id
+        """
+        return list(self.raw(query, [cow.pk, generations, *farm_params]))
+
+    def get_ancestors(self, cow, generations=3):
+        """
+        Returns the cow and its sires and dams up to `generations` generations back.
+
+        Each returned cow carries the `generation` it belongs to, the `relation` (sire or dam) it has
+        to the cow of the previous generation and that cow's id as `relative_id`.
+
+        """
+        return self._get_relatives(cow, generations, "ancestors")
+
+    def get_descendants(self, cow, generations=3):
+        """
+        Returns the cow and its offspring up to `generations` generations down.
+
+        Each returned cow carries the `generation` it belongs to and the id of its parent in the
+        previous generation as `relative_id`.
+
+        """
+        return self._get_relatives(cow, generations, "descendants")
+
+    @staticmethod
+    def _pedigree_node(relative):
+        return {
+            "id": relative.id,
+            "name": relative.name,
+            "tag_number": f"{relative.breed_name[:2].upper()}-{relative.date_of_birth:%Y}-{relative.id}",
+            "gender": relative.gender,
+            "date_of_birth": relative.date_of_birth,
+        }
+
+    def get_pedigree(self, cow, generations=3):
+        """
+        Returns the ancestors of the cow as a nested tree of `sire` and `dam` nodes.
+        """
+        nodes = {}
+        root = None
+        for relative in self.get_ancestors(cow, generations):
+            node = nodes.setdefault(
+                relative.id, {**self._pedigree_node(relative), "sire": None, "dam": None}
+            )
+            if relative.generation == 0:
+                root = node
+            else:
+                nodes[relative.relative_id][relative.relation] = node
+        return root
+
+    def get_progeny(self, cow, generations=3):
+        """
+        Returns the descendants of the cow as a nested tree of `offspring` nodes.
+        """
+        nodes = {}
+        root = None
+        for relative in self.get_descendants(cow, generations):
+            node = nodes.setdefault(
+                relative.id, {**self._pedigree_node(relative), "offspring": []}
+            )
+            if relative.generation == 0:
+                root = node
+            else:
+                nodes[relative.relative_id]["offspring"].append(node)
+        return root
+
     @staticmethod
     def calculate_parity(cow):
         """
@@ -148,6 +280,20 @@ class CowManager(models.Manager):
             availability_status=CowAvailabilityChoices.ALIVE, gender=SexChoices.FEMALE
         )
 
+    def get_open_cows(self):
+        """
+        Returns a queryset of available (alive) female cows that are not pregnant.
+
+        Returns:
+        - A queryset of available (alive) open female cows.
+
+        """
+        return self.filter(
+            availability_status=CowAvailabilityChoices.ALIVE,
+            gender=SexChoices.FEMALE,
+            current_pregnancy_status=CowPregnancyChoices.OPEN,
+        )
+
     def get_sold_cows(self):
         """
         Returns a queryset of sold cows.
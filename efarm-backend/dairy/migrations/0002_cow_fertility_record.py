@@ -0,0 +1,33 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CowFertilityRecord",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("latest_date_of_calving", models.DateField(null=True)),
+                ("calving_interval", models.PositiveIntegerField(null=True)),
+                ("days_open", models.PositiveIntegerField(null=True)),
+                ("number_of_services", models.PositiveIntegerField(default=0)),
+                ("number_of_conceptions", models.PositiveIntegerField(default=0)),
+                ("services_per_conception", models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ("number_of_first_services", models.PositiveIntegerField(default=0)),
+                ("number_of_first_service_conceptions", models.PositiveIntegerField(default=0)),
+                ("first_service_conception_rate", models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ("number_of_heats_detected", models.PositiveIntegerField(default=0)),
+                ("number_of_expected_heats", models.PositiveIntegerField(default=0)),
+                ("heat_detection_rate", models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ("computed_at", models.DateTimeField()),
+                ("cow", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="fertility_record", to="dairy.cow")),
+            ],
+        ),
+    ]
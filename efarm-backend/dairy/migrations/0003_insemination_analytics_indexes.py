@@ -0,0 +1,20 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0002_cow_fertility_record"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="insemination",
+            index=models.Index(fields=["inseminator", "date_of_insemination"], name="insemination_inseminator_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="insemination",
+            index=models.Index(fields=["semen", "success"], name="insemination_semen_idx"),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def set_current_locations(apps, schema_editor):
+    Cow = apps.get_model("dairy", "Cow")
+    CowInPenMovement = apps.get_model("dairy", "CowInPenMovement")
+    CowInBarnMovement = apps.get_model("dairy", "CowInBarnMovement")
+
+    locations = {}
+    # Replay the movements in order so that the latest pen and barn of every cow wins
+    pen_movements = CowInPenMovement.objects.values_list(
+        "cow", "timestamp", "new_pen", "new_pen__barn"
+    )
+    barn_movements = CowInBarnMovement.objects.values_list("cow", "timestamp", "new_barn")
+    movements = [(cow, timestamp, pen, barn) for cow, timestamp, pen, barn in pen_movements]
+    movements += [(cow, timestamp, None, barn) for cow, timestamp, barn in barn_movements]
+
+    for cow, timestamp, pen, barn in sorted(movements, key=lambda movement: movement[1]):
+        current_pen, current_pen_barn, current_barn = locations.get(cow, (None, None, None))
+        if pen:
+            locations[cow] = (pen, barn, barn)
+        elif current_pen_barn == barn:
+            locations[cow] = (current_pen, current_pen_barn, barn)
+        else:
+            locations[cow] = (None, None, barn)
+
+    for cow, (pen, _, barn) in locations.items():
+        Cow.objects.filter(pk=cow).update(current_pen=pen, current_barn=barn)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0003_insemination_analytics_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cow",
+            name="current_barn",
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="current_cows", to="dairy.barn"),
+        ),
+        migrations.AddField(
+            model_name="cow",
+            name="current_pen",
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="current_cows", to="dairy.cowpen"),
+        ),
+        migrations.RunPython(set_current_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0004_cow_current_location"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="disease",
+            index=models.Index(fields=["occurrence_date"], name="disease_occurrence_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="disease",
+            index=models.Index(fields=["recovered_date"], name="disease_recovered_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="treatment",
+            index=models.Index(fields=["date_of_treatment"], name="treatment_date_idx"),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:39
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0005_disease_date_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VaccinationProtocol",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("vaccine_name", models.CharField(max_length=100, unique=True)),
+                ("interval_in_days", models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+            ],
+        ),
+        migrations.CreateModel(
+            name="HealthDueItem",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("protocol_type", models.CharField(choices=[("Vaccination", "Vaccination"), ("Treatment", "Treatment")], max_length=11)),
+                ("protocol", models.CharField(max_length=255)),
+                ("last_done_date", models.DateField(null=True)),
+                ("next_due_date", models.DateField()),
+                ("cow", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="health_due_items", to="dairy.cow")),
+                ("treatment", models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to="dairy.treatment")),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="healthdueitem",
+            index=models.Index(fields=["next_due_date"], name="health_due_date_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="healthdueitem",
+            constraint=models.UniqueConstraint(fields=("cow", "protocol_type", "protocol"), name="unique_cow_health_protocol"),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0006_health_due_items"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="weightrecord",
+            index=models.Index(fields=["cow", "date"], name="weight_record_cow_date_idx"),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0007_weight_record_cow_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MilkYieldStatistics",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("mean_yield", models.FloatField(default=0.0)),
+                ("yield_variance", models.FloatField(default=0.0)),
+                ("number_of_milkings", models.PositiveIntegerField(default=0)),
+                ("last_milking_date", models.DateTimeField(null=True)),
+                ("cow", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="milk_yield_statistics", to="dairy.cow")),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MilkYieldAlert",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("milking_date", models.DateTimeField()),
+                ("amount_in_kgs", models.DecimalField(decimal_places=2, max_digits=4)),
+                ("expected_amount_in_kgs", models.DecimalField(decimal_places=2, max_digits=4)),
+                ("z_score", models.DecimalField(decimal_places=2, max_digits=6)),
+                ("is_acknowledged", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("cow", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="milk_yield_alerts", to="dairy.cow")),
+                ("milk", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="yield_alert", to="dairy.milk")),
+            ],
+            options={
+                "ordering": ["-milking_date"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="milkyieldalert",
+            index=models.Index(fields=["cow", "milking_date"], name="milk_yield_alert_cow_date_idx"),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0008_milk_yield_monitoring"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="heat",
+            index=models.Index(fields=["cow", "observation_time"], name="heat_cow_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="insemination",
+            index=models.Index(fields=["cow", "date_of_insemination"], name="insemination_cow_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lactation",
+            index=models.Index(fields=["cow", "start_date"], name="lactation_cow_start_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lactation",
+            index=models.Index(condition=models.Q(("end_date__isnull", True)), fields=["cow"], name="lactation_open_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="milk",
+            index=models.Index(fields=["cow", "milking_date"], name="milk_cow_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="pregnancy",
+            index=models.Index(fields=["cow", "date_of_calving"], name="pregnancy_cow_calving_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="pregnancy",
+            index=models.Index(condition=models.Q(("date_of_calving__isnull", True)), fields=["cow", "start_date"], name="pregnancy_ongoing_idx"),
+        ),
+        # Replaced by the composite indexes leading with the same column, dropped once they exist
+        migrations.AlterField(
+            model_name="heat",
+            name="cow",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="heat_records", to="dairy.cow"),
+        ),
+        migrations.AlterField(
+            model_name="insemination",
+            name="cow",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name="inseminations", to="dairy.cow"),
+        ),
+        migrations.AlterField(
+            model_name="lactation",
+            name="cow",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="lactations", to="dairy.cow"),
+        ),
+        migrations.AlterField(
+            model_name="milk",
+            name="cow",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="milk_records", to="dairy.cow"),
+        ),
+        migrations.AlterField(
+            model_name="pregnancy",
+            name="cow",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name="pregnancies", to="dairy.cow"),
+        ),
+        migrations.AlterField(
+            model_name="weightrecord",
+            name="cow",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to="dairy.cow"),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.1.7 on 2026-10-19 11:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0009_hot_table_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="milkyieldalert",
+            name="milk",
+            field=models.OneToOneField(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="yield_alert", to="dairy.milk"),
+        ),
+        migrations.CreateModel(
+            name="MilkRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("number_of_milkings", models.PositiveIntegerField()),
+                ("total_amount_in_kgs", models.DecimalField(decimal_places=2, max_digits=8)),
+                ("cow", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="milk_rollups", to="dairy.cow")),
+                ("lactation", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="milk_rollups", to="dairy.lactation")),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedMilk",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("milking_date", models.DateTimeField()),
+                ("amount_in_kgs", models.DecimalField(decimal_places=2, max_digits=4)),
+                ("cow", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="archived_milk_records", to="dairy.cow")),
+                ("lactation", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="archived_milk_records", to="dairy.lactation")),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="milkrollup",
+            index=models.Index(fields=["cow", "date"], name="milk_rollup_cow_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="milkrollup",
+            index=models.Index(fields=["date"], name="milk_rollup_date_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="milkrollup",
+            constraint=models.UniqueConstraint(fields=("lactation", "date"), name="unique_milk_rollup_lactation_date"),
+        ),
+        migrations.AddIndex(
+            model_name="archivedmilk",
+            index=models.Index(fields=["cow", "milking_date"], name="archived_milk_cow_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="archivedmilk",
+            index=models.Index(fields=["milking_date"], name="archived_milk_date_idx"),
+        ),
+    ]
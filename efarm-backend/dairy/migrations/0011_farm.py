@@ -0,0 +1,74 @@
+# Generated by Django 4.1.7 on 2026-10-19 11:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_farm"),
+        ("dairy", "0010_milk_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="barn",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="barns", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="cow",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="cows", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="disease",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="diseases", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="milk",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="semen",
+            name="farm",
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="semen", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="symptoms",
+            name="farm",
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="symptoms", to="users.farm"),
+        ),
+        migrations.AlterField(
+            model_name="disease",
+            name="name",
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name="barn",
+            index=models.Index(fields=["farm", "name"], name="barn_farm_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="cow",
+            index=models.Index(fields=["farm", "availability_status", "gender"], name="cow_farm_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="cow",
+            index=models.Index(fields=["farm", "date_of_birth"], name="cow_farm_birth_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="disease",
+            index=models.Index(fields=["farm", "occurrence_date"], name="disease_farm_occurrence_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="milk",
+            index=models.Index(fields=["farm", "milking_date"], name="milk_farm_date_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="disease",
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce("farm", models.Value(0)), models.F("name"), name="unique_disease_farm_name"),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.1.7 on 2026-10-19 12:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# SQLite drops the triggers of a table it rebuilds to alter a column, altering the fields of
+# `SearchDocument` requires recreating them
+SQLITE_FULL_TEXT_INDEX = [
+    # External content table indexing the title and body of the documents, with prefix indexes
+    # for the partial words of the searches
+    """
+    CREATE VIRTUAL TABLE dairy_searchdocument_fts USING fts5(
+        title, body, content='dairy_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER dairy_searchdocument_fts_insert AFTER INSERT ON dairy_searchdocument BEGIN
+        INSERT INTO dairy_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER dairy_searchdocument_fts_delete AFTER DELETE ON dairy_searchdocument BEGIN
+        INSERT INTO dairy_searchdocument_fts(dairy_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER dairy_searchdocument_fts_update AFTER UPDATE ON dairy_searchdocument BEGIN
+        INSERT INTO dairy_searchdocument_fts(dairy_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO dairy_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+POSTGRESQL_FULL_TEXT_INDEX = [
+    """
+    ALTER TABLE dairy_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX search_document_vector_idx ON dairy_searchdocument USING gin (search_vector)",
+]
+
+
+def create_full_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        statements = POSTGRESQL_FULL_TEXT_INDEX
+    else:
+        statements = SQLITE_FULL_TEXT_INDEX
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_full_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("ALTER TABLE dairy_searchdocument DROP COLUMN search_vector")
+    else:
+        for action in ["insert", "delete", "update"]:
+            schema_editor.execute(f"DROP TRIGGER dairy_searchdocument_fts_{action}")
+        schema_editor.execute("DROP TABLE dairy_searchdocument_fts")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_farm"),
+        ("dairy", "0011_farm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("type", models.CharField(choices=[("Cow", "Cow"), ("Inseminator", "Inseminator"), ("Pregnancy", "Pregnancy"), ("Treatment", "Treatment"), ("Disease", "Disease"), ("Symptom", "Symptom")], max_length=11)),
+                ("object_id", models.PositiveIntegerField()),
+                ("title", models.CharField(max_length=255)),
+                ("body", models.TextField(blank=True)),
+                ("farm", models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="users.farm")),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="searchdocument",
+            constraint=models.UniqueConstraint(fields=("type", "object_id"), name="unique_search_document"),
+        ),
+        migrations.RunPython(create_full_text_index, drop_full_text_index),
+    ]
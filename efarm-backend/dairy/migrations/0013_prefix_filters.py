@@ -0,0 +1,88 @@
+# Generated by Django 4.1.7 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+from efarm.lookups import normalize_text
+
+BATCH_SIZE = 1000
+
+# Trigram indexes of the searchable columns, answering the substring searches of PostgreSQL which
+# the B-tree indexes of the prefix filters cannot
+POSTGRESQL_TRIGRAM_INDEXES = {
+    "cow_tag_number_trgm_idx": ("dairy_cow", "tag_number"),
+    "inseminator_first_name_trgm_idx": ("dairy_inseminator", "normalized_first_name"),
+    "inseminator_last_name_trgm_idx": ("dairy_inseminator", "normalized_last_name"),
+}
+
+
+def set_searchable_columns(apps, schema_editor):
+    Cow = apps.get_model("dairy", "Cow")
+    Inseminator = apps.get_model("dairy", "Inseminator")
+
+    cows = []
+    for cow in Cow.objects.select_related("breed").iterator(chunk_size=BATCH_SIZE):
+        # As computed by `CowManager.get_tag_number`
+        cow.tag_number = f"{cow.breed.name[:2].upper()}-{cow.date_of_birth.year}-{cow.id}"
+        cows.append(cow)
+    Cow.objects.bulk_update(cows, ["tag_number"], batch_size=BATCH_SIZE)
+
+    inseminators = []
+    for inseminator in Inseminator.objects.iterator(chunk_size=BATCH_SIZE):
+        inseminator.normalized_first_name = normalize_text(inseminator.first_name)
+        inseminator.normalized_last_name = normalize_text(inseminator.last_name)
+        inseminators.append(inseminator)
+    Inseminator.objects.bulk_update(
+        inseminators, ["normalized_first_name", "normalized_last_name"], batch_size=BATCH_SIZE
+    )
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, (table, column) in POSTGRESQL_TRIGRAM_INDEXES.items():
+        schema_editor.execute(f"CREATE INDEX {name} ON {table} USING gin ({column} gin_trgm_ops)")
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in POSTGRESQL_TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0012_search_document"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cow",
+            name="tag_number",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=25),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="inseminator",
+            name="normalized_first_name",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=60),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="inseminator",
+            name="normalized_last_name",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=60),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="pregnancy",
+            index=models.Index(fields=["pregnancy_status"], name="pregnancy_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="pregnancy",
+            index=models.Index(fields=["pregnancy_outcome"], name="pregnancy_outcome_idx"),
+        ),
+        migrations.RunPython(set_searchable_columns, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
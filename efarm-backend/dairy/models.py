@@ -1,11 +1,16 @@
 from datetime import date, datetime, timedelta
 
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
 from dairy.managers import *
 from dairy.validators import *
+from efarm.lookups import normalize_text
+from efarm.tenancy import FarmScopedManager
 
 
 class CowBreed(models.Model):
@@ -60,8 +65,22 @@ class Cow(models.Model):
     - `date_introduced_in_farm` (date): The date the cow was introduced to the farm.
     - `is_bought` (bool): Indicates whether the cow was bought or not.
     - `date_of_death` (date or None): The date of death of the cow, if applicable.
+    - `current_pen` (CowPen or None): The pen the cow was last moved to, maintained by `CowInPenMovement`.
+    - `current_barn` (Barn or None): The barn the cow was last moved to, maintained by the movement records.
+    - `farm` (Farm or None): The farm the cow belongs to.
+    - `tag_number` (str): The tag number of the cow, stored so cows can be filtered by it through an index.
+      It is written by `save()`, so `bulk_create()` and `update()` of the breed or date of birth
+      must set it themselves, as `CowManager.get_tag_number` computes it.
     """
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["farm", "availability_status", "gender"], name="cow_farm_status_idx"
+            ),
+            models.Index(fields=["farm", "date_of_birth"], name="cow_farm_birth_idx"),
+        ]
+
     name = models.CharField(max_length=35)
     breed = models.ForeignKey(
         CowBreed, on_delete=models.PROTECT, db_index=True, related_name="cows"
@@ -97,17 +116,35 @@ class Cow(models.Model):
     date_introduced_in_farm = models.DateField(auto_now_add=True)
     is_bought = models.BooleanField(default=False)
     date_of_death = models.DateField(null=True)
+    current_pen = models.ForeignKey(
+        "CowPen",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="current_cows",
+    )
+    current_barn = models.ForeignKey(
+        "Barn",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="current_cows",
+    )
+    farm = models.ForeignKey(
+        "users.Farm",
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        db_index=False,
+        related_name="cows",
+    )
+    tag_number = models.CharField(max_length=25, editable=False, db_index=True)
 
-    objects = models.Manager()
+    objects = FarmScopedManager("farm")
     manager = CowManager()
 
-    @property
-    def tag_number(self):
-        """
-        Returns the tag number of the cow.
-        """
-        return Cow.manager.get_tag_number(self)
-
     @property
     def parity(self):
         """
@@ -159,7 +196,13 @@ class Cow(models.Model):
         Overrides the save method to ensure validation before saving.
         """
         self.clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # The tag number holds the id of the cow, only known once it is inserted
+            tag_number = Cow.manager.get_tag_number(self)
+            if tag_number != self.tag_number:
+                self.tag_number = tag_number
+                Cow.objects.all_farms().filter(pk=self.pk).update(tag_number=tag_number)
         CowValidator.validate_introduction_date(self.date_introduced_in_farm)
         CowValidator.validate_age_category(
             self.age,
@@ -198,6 +241,8 @@ class Inseminator(models.Model):
     - `sex` (str): The sex of the inseminator.
     - `company` (str): The company associated with the inseminator (optional).
     - `license_number` (str): The unique license number of the inseminator.
+    - `normalized_first_name` (str): The first name without accents and case, filtered by prefix.
+    - `normalized_last_name` (str): The last name without accents and case, filtered by prefix.
     """
 
     first_name = models.CharField(max_length=20)
@@ -206,6 +251,8 @@ class Inseminator(models.Model):
     sex = models.CharField(choices=SexChoices.choices, max_length=6)
     company = models.CharField(max_length=50, blank=True, null=True)
     license_number = models.CharField(max_length=25, unique=True)
+    normalized_first_name = models.CharField(max_length=60, editable=False, db_index=True)
+    normalized_last_name = models.CharField(max_length=60, editable=False, db_index=True)
 
     def __str__(self):
         """
@@ -213,6 +260,14 @@ class Inseminator(models.Model):
         """
         return f"{self.first_name} {self.last_name}"
 
+    def save(self, *args, **kwargs):
+        """
+        Overrides the save method to store the normalized names.
+        """
+        self.normalized_first_name = normalize_text(self.first_name)
+        self.normalized_last_name = normalize_text(self.last_name)
+        super().save(*args, **kwargs)
+
 
 class Heat(models.Model):
     """
@@ -223,8 +278,17 @@ class Heat(models.Model):
     - `cow` (Cow): The cow associated with the heat observation.
     """
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["cow", "observation_time"], name="heat_cow_time_idx"),
+        ]
+
     observation_time = models.DateTimeField()
-    cow = models.ForeignKey(Cow, on_delete=models.CASCADE, related_name="heat_records")
+    cow = models.ForeignKey(
+        Cow, on_delete=models.CASCADE, related_name="heat_records", db_index=False
+    )
+
+    objects = FarmScopedManager("cow__farm")
 
     def __str__(self):
         """
@@ -278,7 +342,22 @@ class Pregnancy(models.Model):
 
     Note: The terms "calving" and "scan" are related to cattle reproduction."""
 
-    cow = models.ForeignKey(Cow, on_delete=models.PROTECT, related_name="pregnancies")
+    class Meta:
+        indexes = [
+            models.Index(fields=["cow", "date_of_calving"], name="pregnancy_cow_calving_idx"),
+            # Pregnancies still awaiting calving, looked up for every new insemination and lactation
+            models.Index(
+                fields=["cow", "start_date"],
+                name="pregnancy_ongoing_idx",
+                condition=models.Q(date_of_calving__isnull=True),
+            ),
+            models.Index(fields=["pregnancy_status"], name="pregnancy_status_idx"),
+            models.Index(fields=["pregnancy_outcome"], name="pregnancy_outcome_idx"),
+        ]
+
+    cow = models.ForeignKey(
+        Cow, on_delete=models.PROTECT, related_name="pregnancies", db_index=False
+    )
     start_date = models.DateField()
     date_of_calving = models.DateField(null=True, blank=True)
     pregnancy_status = models.CharField(
@@ -294,7 +373,7 @@ class Pregnancy(models.Model):
         max_length=11, choices=PregnancyOutcomeChoices.choices, blank=True, null=True
     )
 
-    objects = models.Manager()
+    objects = FarmScopedManager("cow__farm")
     manager = PregnancyManager()
 
     @property
@@ -361,9 +440,21 @@ class Insemination(models.Model):
 
     class Meta:
         ordering = ["-date_of_insemination"]
+        indexes = [
+            models.Index(
+                fields=["inseminator", "date_of_insemination"],
+                name="insemination_inseminator_idx",
+            ),
+            models.Index(fields=["semen", "success"], name="insemination_semen_idx"),
+            models.Index(
+                fields=["cow", "date_of_insemination"], name="insemination_cow_date_idx"
+            ),
+        ]
 
     date_of_insemination = models.DateTimeField(auto_now_add=True)
-    cow = models.ForeignKey(Cow, on_delete=models.PROTECT, related_name="inseminations")
+    cow = models.ForeignKey(
+        Cow, on_delete=models.PROTECT, related_name="inseminations", db_index=False
+    )
     pregnancy = models.OneToOneField(
         Pregnancy, on_delete=models.PROTECT, editable=False, blank=True, null=True
     )
@@ -374,7 +465,7 @@ class Insemination(models.Model):
     )
     semen = models.ForeignKey("Semen", on_delete=models.PROTECT, blank=True, null=True)
 
-    objects = models.Manager()
+    objects = FarmScopedManager("cow__farm")
     manager = InseminationManager()
 
     @property
@@ -423,14 +514,24 @@ class Lactation(models.Model):
 
     class Meta:
         get_latest_by = "-start_date"
+        indexes = [
+            models.Index(fields=["cow", "start_date"], name="lactation_cow_start_idx"),
+            models.Index(
+                fields=["cow"],
+                name="lactation_open_idx",
+                condition=models.Q(end_date__isnull=True),
+            ),
+        ]
 
     start_date = models.DateField()
     end_date = models.DateField(null=True)
-    cow = models.ForeignKey(Cow, on_delete=models.CASCADE, related_name="lactations")
+    cow = models.ForeignKey(
+        Cow, on_delete=models.CASCADE, related_name="lactations", db_index=False
+    )
     lactation_number = models.PositiveSmallIntegerField(default=1)
     pregnancy = models.OneToOneField(Pregnancy, on_delete=models.CASCADE, null=True)
 
-    objects = models.Manager()
+    objects = FarmScopedManager("cow__farm")
     manager = LactationManager()
 
     @property
@@ -495,6 +596,57 @@ class Lactation(models.Model):
         super().save(*args, **kwargs)
 
 
+class CowFertilityRecord(models.Model):
+    """
+    Represents the precomputed fertility indicators of a cow.
+
+    Attributes:
+    - `cow` (Cow): The cow the indicators belong to.
+    - `latest_date_of_calving` (date or None): The date of the most recent calving.
+    - `calving_interval` (int or None): The number of days between the two most recent calvings.
+    - `days_open` (int or None): The number of days from the most recent calving to conception, or to today.
+    - `number_of_services` (int): The number of inseminations the cow has received.
+    - `number_of_conceptions` (int): The number of successful inseminations.
+    - `services_per_conception` (Decimal or None): The inseminations needed per successful insemination.
+    - `number_of_first_services` (int): The number of first inseminations of a breeding cycle.
+    - `number_of_first_service_conceptions` (int): The number of successful first inseminations.
+    - `first_service_conception_rate` (Decimal or None): Successful first inseminations as a percentage.
+    - `number_of_heats_detected` (int): The number of heats observed since the most recent calving.
+    - `number_of_expected_heats` (int): The number of 21-day heat cycles elapsed while the cow was open.
+    - `heat_detection_rate` (Decimal or None): Detected heats as a percentage of the expected heats.
+    - `computed_at` (datetime): The date and time the indicators were last computed.
+    """
+
+    cow = models.OneToOneField(
+        Cow, on_delete=models.CASCADE, related_name="fertility_record"
+    )
+    latest_date_of_calving = models.DateField(null=True)
+    calving_interval = models.PositiveIntegerField(null=True)
+    days_open = models.PositiveIntegerField(null=True)
+    number_of_services = models.PositiveIntegerField(default=0)
+    number_of_conceptions = models.PositiveIntegerField(default=0)
+    services_per_conception = models.DecimalField(
+        max_digits=5, decimal_places=2, null=True
+    )
+    number_of_first_services = models.PositiveIntegerField(default=0)
+    number_of_first_service_conceptions = models.PositiveIntegerField(default=0)
+    first_service_conception_rate = models.DecimalField(
+        max_digits=5, decimal_places=2, null=True
+    )
+    number_of_heats_detected = models.PositiveIntegerField(default=0)
+    number_of_expected_heats = models.PositiveIntegerField(default=0)
+    heat_detection_rate = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    computed_at = models.DateTimeField()
+
+    objects = FarmScopedManager("cow__farm")
+
+    def __str__(self):
+        """
+        Returns a string representation of the fertility record.
+        """
+        return f"Fertility record for {self.cow}"
+
+
 class Milk(models.Model):
     """
     Represents a milk record for a cow.
@@ -504,19 +656,37 @@ class Milk(models.Model):
     - `cow` (Cow): The cow associated with the milk record.
     - `amount_in_kgs` (Decimal): The amount of milk produced in kilograms.
     - `lactation` (Lactation or None): The associated lactation record, if applicable.
+    - `farm` (Farm or None): The farm of the cow, copied so the milk of a farm is read by date
+      from the (`farm`, `milking_date`) index.
     """
 
     class Meta:
         get_latest_by = "-milking_date"
+        indexes = [
+            models.Index(fields=["cow", "milking_date"], name="milk_cow_date_idx"),
+            models.Index(fields=["farm", "milking_date"], name="milk_farm_date_idx"),
+        ]
 
     milking_date = models.DateTimeField(auto_now_add=True)
-    cow = models.ForeignKey(Cow, on_delete=models.CASCADE, related_name="milk_records")
+    cow = models.ForeignKey(
+        Cow, on_delete=models.CASCADE, related_name="milk_records", db_index=False
+    )
     amount_in_kgs = models.DecimalField(
         verbose_name="Amount (kgs)", default=0.00, max_digits=4, decimal_places=2
     )
     lactation = models.ForeignKey(
         Lactation, on_delete=models.CASCADE, null=True, editable=False
     )
+    farm = models.ForeignKey(
+        "users.Farm",
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        db_index=False,
+        related_name="+",
+    )
+
+    objects = FarmScopedManager("farm")
 
     def __str__(self):
         """
@@ -539,14 +709,155 @@ class Milk(models.Model):
         Overrides the save method to ensure validation before saving.
         """
         self.clean()
+        self.farm_id = self.cow.farm_id
         super().save(*args, **kwargs)
 
 
+class MilkYieldStatistics(models.Model):
+    """
+    Represents the rolling milk yield statistics of a cow, updated as each milking is recorded.
+
+    Attributes:
+    - `cow` (Cow): The cow the statistics belong to.
+    - `mean_yield` (float): The exponentially weighted moving average of the yield, in kilograms.
+    - `yield_variance` (float): The exponentially weighted moving variance of the yield.
+    - `number_of_milkings` (int): The number of milkings the statistics were computed from.
+    - `last_milking_date` (datetime): The date and time of the latest milking.
+    """
+
+    cow = models.OneToOneField(
+        Cow, on_delete=models.CASCADE, related_name="milk_yield_statistics"
+    )
+    mean_yield = models.FloatField(default=0.0)
+    yield_variance = models.FloatField(default=0.0)
+    number_of_milkings = models.PositiveIntegerField(default=0)
+    last_milking_date = models.DateTimeField(null=True)
+
+    objects = FarmScopedManager("cow__farm")
+
+
+class MilkYieldAlert(models.Model):
+    """
+    Represents a milking whose yield deviates from the recent yield of the cow.
+
+    Attributes:
+    - `cow` (Cow): The cow the milking belongs to.
+    - `milk` (Milk): The deviating milking.
+    - `milking_date` (datetime): The date and time of the milking.
+    - `amount_in_kgs` (Decimal): The amount of milk produced.
+    - `expected_amount_in_kgs` (Decimal): The average yield of the cow before the milking.
+    - `z_score` (Decimal): The deviation in standard deviations, negative for a drop.
+    - `is_acknowledged` (bool): Whether the alert was reviewed.
+    - `created_at` (datetime): The date and time the alert was raised.
+    """
+
+    class Meta:
+        ordering = ["-milking_date"]
+        indexes = [
+            models.Index(fields=["cow", "milking_date"], name="milk_yield_alert_cow_date_idx"),
+        ]
+
+    cow = models.ForeignKey(Cow, on_delete=models.CASCADE, related_name="milk_yield_alerts")
+    # Cleared when the milking is archived, the alert keeps the yield of the milking
+    milk = models.OneToOneField(
+        Milk, on_delete=models.SET_NULL, null=True, related_name="yield_alert"
+    )
+    milking_date = models.DateTimeField()
+    amount_in_kgs = models.DecimalField(max_digits=4, decimal_places=2)
+    expected_amount_in_kgs = models.DecimalField(max_digits=4, decimal_places=2)
+    z_score = models.DecimalField(max_digits=6, decimal_places=2)
+    is_acknowledged = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = FarmScopedManager("cow__farm")
+
+    def __str__(self):
+        return f"Yield alert of cow {self.cow.name} on {self.milking_date.strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+class ArchivedMilk(models.Model):
+    """
+    Represents a milk record moved out of `Milk` once its lactation closed before the archive
+    horizon, keeping the id of the original record.
+
+    Attributes:
+    - `milking_date` (datetime): The date and time of the milking.
+    - `cow` (Cow): The cow associated with the milk record.
+    - `amount_in_kgs` (Decimal): The amount of milk produced in kilograms.
+    - `lactation` (Lactation): The closed lactation of the milk record.
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["cow", "milking_date"], name="archived_milk_cow_date_idx"),
+            models.Index(fields=["milking_date"], name="archived_milk_date_idx"),
+        ]
+
+    id = models.BigIntegerField(primary_key=True)
+    milking_date = models.DateTimeField()
+    cow = models.ForeignKey(
+        Cow, on_delete=models.CASCADE, related_name="archived_milk_records", db_index=False
+    )
+    amount_in_kgs = models.DecimalField(max_digits=4, decimal_places=2)
+    lactation = models.ForeignKey(
+        Lactation, on_delete=models.CASCADE, related_name="archived_milk_records"
+    )
+
+    objects = FarmScopedManager("cow__farm")
+
+    def __str__(self):
+        return f"Archived milk record of cow {self.cow.name} on {self.milking_date.strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+class MilkRollup(models.Model):
+    """
+    Represents the milk produced by a cow on a day of an archived lactation, so totals over
+    archived milk are summed from one row per cow and day.
+
+    Attributes:
+    - `cow` (Cow): The milked cow.
+    - `lactation` (Lactation): The archived lactation.
+    - `date` (date): The day of the milkings, in the local time zone.
+    - `number_of_milkings` (int): The number of milkings of the cow on the day.
+    - `total_amount_in_kgs` (Decimal): The milk produced by the cow on the day.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lactation", "date"], name="unique_milk_rollup_lactation_date"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["cow", "date"], name="milk_rollup_cow_date_idx"),
+            models.Index(fields=["date"], name="milk_rollup_date_idx"),
+        ]
+
+    cow = models.ForeignKey(
+        Cow, on_delete=models.CASCADE, related_name="milk_rollups", db_index=False
+    )
+    lactation = models.ForeignKey(
+        Lactation, on_delete=models.CASCADE, related_name="milk_rollups", db_index=False
+    )
+    date = models.DateField()
+    number_of_milkings = models.PositiveIntegerField()
+    total_amount_in_kgs = models.DecimalField(max_digits=8, decimal_places=2)
+
+    objects = FarmScopedManager("cow__farm")
+
+
 class WeightRecord(models.Model):
-    cow = models.ForeignKey(Cow, on_delete=models.CASCADE)
+    class Meta:
+        indexes = [
+            models.Index(fields=["cow", "date"], name="weight_record_cow_date_idx"),
+        ]
+
+    cow = models.ForeignKey(Cow, on_delete=models.CASCADE, db_index=False)
     date = models.DateField(auto_now_add=True)
     weight_in_kgs = models.DecimalField(max_digits=6, decimal_places=2)
 
+    objects = FarmScopedManager("cow__farm")
+
     def __str__(self):
         return f"{self.cow} - Weight: {self.weight_in_kgs} kgs - Date: {self.date}"
 
@@ -568,6 +879,8 @@ class CullingRecord(models.Model):
     date = models.DateField(auto_now_add=True)
     notes = models.TextField(null=True, max_length=100)
 
+    objects = FarmScopedManager("cow__farm")
+
     def __str__(self):
         return f"Culling of {self.cow.tag_number} on {self.date}"
 
@@ -591,6 +904,8 @@ class QuarantineRecord(models.Model):
     end_date = models.DateField(null=True)
     notes = models.TextField(null=True, max_length=100)
 
+    objects = FarmScopedManager("cow__farm")
+
     def __str__(self):
         if self.end_date:
             return f"Quarantine Record of {self.cow.tag_number} from {self.start_date} to {self.end_date}"
@@ -622,6 +937,11 @@ class Semen(models.Model):
         },
     )
     notes = models.TextField(blank=True)
+    farm = models.ForeignKey(
+        "users.Farm", on_delete=models.CASCADE, null=True, editable=False, related_name="semen"
+    )
+
+    objects = FarmScopedManager("farm")
 
     def __str__(self):
         """Returns a string representation of the model instance."""
@@ -640,6 +960,7 @@ class Symptoms(models.Model):
     - `date_observed` - a `DateField` representing the date when the symptom was observed (cannot be in the future)
     - `severity` - a `CharField` representing the severity of the symptom (choices: Mild, Moderate, Severe)
     - `location` - a `CharField` representing the location of the symptom (choices: Head, Neck, Chest, Abdomen, Back, Legs, Tail, Whole body, Other)
+    - `farm` - a `ForeignKey` to the `Farm` model representing the farm the symptom was observed in
 
     ### Meta
 
@@ -692,6 +1013,11 @@ class Symptoms(models.Model):
     )
     severity = models.CharField(max_length=20, choices=SEVERITY_CHOICES)
     location = models.CharField(max_length=20, choices=LOCATION_CHOICES)
+    farm = models.ForeignKey(
+        "users.Farm", on_delete=models.CASCADE, null=True, editable=False, related_name="symptoms"
+    )
+
+    objects = FarmScopedManager("farm")
 
     def __str__(self):
         return self.name
@@ -801,6 +1127,9 @@ class Treatment(models.Model):
     class Meta:
         verbose_name = "Treatment \U0001F48E"
         verbose_name_plural = "Treatments \U0001F48E"
+        indexes = [
+            models.Index(fields=["date_of_treatment"], name="treatment_date_idx"),
+        ]
 
     TREATMENT_STATUS_CHOICES = (
         ("Scheduled", "Scheduled"),
@@ -822,6 +1151,8 @@ class Treatment(models.Model):
     )
     cost = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
 
+    objects = FarmScopedManager("cow__farm")
+
     def clean(self):
         if self.cost and self.cost < 0:
             raise ValidationError("The cost should be zero or more")
@@ -864,7 +1195,7 @@ class Disease(models.Model):
 
     ### Fields
 
-    - `name` - a `CharField` representing the name of the disease (unique)
+    - `name` - a `CharField` representing the name of the disease (unique within the farm)
     - `pathogen` - a `ForeignKey` to the `Pathogen` model representing the pathogen that causes the disease (optional)
     - `categories` - a `ForeignKey` to the `DiseaseCategory` model representing the category the disease belongs to
     - `occurrence_date` - a `DateField` representing the date the disease was first discovered
@@ -875,6 +1206,7 @@ class Disease(models.Model):
     - `date_created` - a `DateTimeField` representing the date the disease was recorded
     - `symptoms` - a `ManyToManyField` to the `Symptoms` model representing the symptoms of the disease
     - `treatments` - a `ManyToManyField` to the `Treatment` model representing the treatments for the disease (optional)
+    - `farm` - a `ForeignKey` to the `Farm` model representing the farm the disease was recorded in
 
     ### Meta
 
@@ -893,7 +1225,7 @@ class Disease(models.Model):
     - If the `recovered_date` field is provided, it must be after the `occurrence_date` field.
     """
 
-    name = models.CharField(max_length=50, unique=True)
+    name = models.CharField(max_length=50)
     pathogen = models.ForeignKey(Pathogen, on_delete=models.CASCADE, null=True)
     categories = models.ForeignKey(
         DiseaseCategory, on_delete=models.PROTECT, related_name="diseases"
@@ -906,10 +1238,31 @@ class Disease(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     symptoms = models.ManyToManyField(Symptoms, related_name="diseases")
     treatments = models.ManyToManyField(Treatment, related_name="diseases", blank=True)
+    farm = models.ForeignKey(
+        "users.Farm",
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        db_index=False,
+        related_name="diseases",
+    )
+
+    objects = FarmScopedManager("farm")
 
     class Meta:
         verbose_name = "Disease \U0001F48A"
         verbose_name_plural = "Diseases \U0001F48A"
+        constraints = [
+            # Records without a farm are compared as farm 0, NULLs being distinct in unique indexes
+            models.UniqueConstraint(
+                Coalesce("farm", Value(0)), "name", name="unique_disease_farm_name"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["occurrence_date"], name="disease_occurrence_date_idx"),
+            models.Index(fields=["recovered_date"], name="disease_recovered_date_idx"),
+            models.Index(fields=["farm", "occurrence_date"], name="disease_farm_occurrence_idx"),
+        ]
 
     def __str__(self):
         return "{} ({}) occurred on {}".format(
@@ -965,10 +1318,68 @@ class Vaccination(models.Model):
     )
     dose_unit = models.CharField(max_length=3, choices=DOSE_UNIT_CHOICES, default="ml")
 
+    objects = FarmScopedManager("cow__farm")
+
     def __str__(self):
         return f"{self.cow.name} - {self.vaccine_name}"
 
 
+class VaccinationProtocol(models.Model):
+    """
+    Represents how often a vaccine has to be given again.
+
+    Attributes:
+    - `vaccine_name` (str): The name of the vaccine, as recorded on vaccinations.
+    - `interval_in_days` (int): The number of days after a vaccination the next dose is due.
+    """
+
+    vaccine_name = models.CharField(max_length=100, unique=True)
+    interval_in_days = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+
+    def __str__(self):
+        return f"{self.vaccine_name} every {self.interval_in_days} days"
+
+
+class HealthDueItem(models.Model):
+    """
+    Represents the next date a health protocol is due on a cow.
+
+    Items are maintained as vaccinations and treatments are recorded, so the work due on a day is
+    read from this table alone: a vaccination makes the next dose of its `VaccinationProtocol` due,
+    and a scheduled, postponed or ongoing treatment is due until it is completed or cancelled.
+
+    Attributes:
+    - `cow` (Cow): The cow the work is due on.
+    - `protocol_type` (str): Whether a vaccination or a treatment is due.
+    - `protocol` (str): The vaccine name, or the disease and method of the treatment.
+    - `treatment` (Treatment or None): The latest treatment of the protocol, for treatments.
+    - `last_done_date` (date or None): The date the protocol was last given.
+    - `next_due_date` (date): The date the protocol is next due.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cow", "protocol_type", "protocol"], name="unique_cow_health_protocol"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["next_due_date"], name="health_due_date_idx"),
+        ]
+
+    cow = models.ForeignKey(Cow, on_delete=models.CASCADE, related_name="health_due_items")
+    protocol_type = models.CharField(max_length=11, choices=HealthProtocolTypeChoices.choices)
+    protocol = models.CharField(max_length=255)
+    treatment = models.ForeignKey(Treatment, on_delete=models.CASCADE, null=True)
+    last_done_date = models.DateField(null=True)
+    next_due_date = models.DateField()
+
+    objects = FarmScopedManager("cow__farm")
+
+    def __str__(self):
+        return f"{self.protocol} due on {self.cow.name} on {self.next_due_date}"
+
+
 class Barn(models.Model):
     """
     The `Barn` model represents a barn in a dairy farm.
@@ -976,6 +1387,7 @@ class Barn(models.Model):
     Fields:
     - `name`: A character field for the name of the barn.
     - `capacity`: An integer field for the maximum number of cows the barn can hold.
+    - `farm`: A foreign key to the `Farm` model, representing the farm the barn belongs to.
 
     Meta options:
     - `verbose_name`: The singular name of the model in the Django admin.
@@ -984,10 +1396,23 @@ class Barn(models.Model):
 
     name = models.CharField(max_length=32)
     capacity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    farm = models.ForeignKey(
+        "users.Farm",
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        db_index=False,
+        related_name="barns",
+    )
 
     class Meta:
         verbose_name = "Barn"
         verbose_name_plural = "Barns"
+        indexes = [
+            models.Index(fields=["farm", "name"], name="barn_farm_name_idx"),
+        ]
+
+    objects = FarmScopedManager("farm")
 
     def __str__(self):
         return self.name
@@ -1013,6 +1438,8 @@ class CowPen(models.Model):
     category = models.CharField(max_length=15, choices=CowPenCategoriesChoices.choices)
     capacity = models.PositiveIntegerField(validators=[MinValueValidator(1)], default=1)
 
+    objects = FarmScopedManager("barn__farm")
+
     def clean(self):
         super().clean()
         if self.type == CowPenTypeChoices.Fixed and self.pk:
@@ -1050,12 +1477,27 @@ class CowInPenMovement(models.Model):
     )
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    objects = FarmScopedManager("cow__farm")
+
     def __str__(self):
         if self.previous_pen:
             return f"Cow {self.cow.id} - From {self.previous_pen} to {self.new_pen}"
         else:
             return f"Cow {self.cow.id} - Newly introduced to {self.new_pen}"
 
+    def save(self, *args, **kwargs):
+        """
+        Saves the movement and moves the cow to the new pen, and its barn, in the same transaction.
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not CowInPenMovement.objects.filter(
+                cow=self.cow_id, timestamp__gt=self.timestamp
+            ).exists():
+                Cow.objects.filter(pk=self.cow_id).update(
+                    current_pen=self.new_pen, current_barn=self.new_pen.barn_id
+                )
+
 
 class CowInBarnMovement(models.Model):
     """
@@ -1079,8 +1521,57 @@ class CowInBarnMovement(models.Model):
     )
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    objects = FarmScopedManager("cow__farm")
+
     def __str__(self):
         if self.previous_barn:
             return f"Cow {self.cow.id} - From {self.previous_barn} to {self.new_barn}"
         else:
             return f"Cow {self.cow.id} - Newly introduced to {self.new_barn}"
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the movement and moves the cow to the new barn in the same transaction.
+
+        The current pen of the cow is cleared unless it belongs to the new barn.
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not CowInBarnMovement.objects.filter(
+                cow=self.cow_id, timestamp__gt=self.timestamp
+            ).exists():
+                cows = Cow.objects.filter(pk=self.cow_id)
+                cows.update(current_barn=self.new_barn)
+                cows.exclude(current_pen__barn=self.new_barn).update(current_pen=None)
+
+
+class SearchDocument(models.Model):
+    """
+    Represents the searchable text of a cow, an inseminator, a pregnancy, a treatment, a disease or
+    a symptom, kept in sync with the record on write by `dairy.search.SearchIndex`.
+
+    The documents are indexed for full-text search by the database, through an FTS5 table on
+    SQLite and a weighted `tsvector` column on PostgreSQL, both created by the migration adding
+    this model.
+
+    Attributes:
+    - `type` (str): The type of the record, see `SearchResultTypeChoices`.
+    - `object_id` (int): The id of the record.
+    - `farm` (Farm or None): The farm of the record, None for the inseminators shared by every
+      farm.
+    - `title` (str): The name of the record, ranked above the body.
+    - `body` (str): The notes, description or company of the record.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["type", "object_id"], name="unique_search_document"),
+        ]
+
+    type = models.CharField(max_length=11, choices=SearchResultTypeChoices.choices)
+    object_id = models.PositiveIntegerField()
+    farm = models.ForeignKey(
+        "users.Farm", on_delete=models.CASCADE, null=True, db_index=False, related_name="+"
+    )
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
@@ -0,0 +1,132 @@
+from decimal import Decimal
+from math import sqrt
+
+from django.db import transaction
+
+from dairy.models import Milk, MilkYieldAlert, MilkYieldStatistics
+
+
+class MilkYieldMonitor:
+    """
+    Flags milkings whose yield deviates from the recent yield of the cow, the earliest sign of
+    mastitis being a sudden drop.
+
+    The recent yield of each cow is summarised by an exponentially weighted moving average and
+    variance stored in `MilkYieldStatistics`. Recording a milking compares it with the statistics
+    of the cow, raises a `MilkYieldAlert` when it lies too many standard deviations away and folds
+    it into the statistics, reading and writing a single row whatever the history of the cow.
+    Replaying the history with `rebuild()` is only needed when milk is imported in bulk.
+
+    Methods:
+    - `record_milking(milk)`: Updates the statistics of the cow with a new milking, returning the alert raised.
+    - `rebuild(cow_ids)`: Recomputes the statistics and alerts from the milk history, returning the number of cows.
+
+    """
+
+    # Weight of the latest milking in the moving statistics, about the last 20 milkings matter
+    SMOOTHING_FACTOR = 0.1
+    # Number of standard deviations from the mean yield raising an alert
+    THRESHOLD = 3.0
+    # Milkings needed before the statistics of a cow are trusted to raise alerts
+    WARM_UP_MILKINGS = 10
+    # Lower bound of the standard deviation, so cows with a steady yield do not alert on small changes
+    MIN_STANDARD_DEVIATION = 0.5
+
+    @classmethod
+    def _observe(cls, statistics, milking_date, amount_in_kgs):
+        """
+        Folds a milking into the statistics, returning its z-score against the previous statistics
+        when they are trusted to raise alerts.
+        """
+        amount_in_kgs = float(amount_in_kgs)
+        z_score = None
+        if statistics.number_of_milkings >= cls.WARM_UP_MILKINGS:
+            standard_deviation = max(sqrt(statistics.yield_variance), cls.MIN_STANDARD_DEVIATION)
+            z_score = (amount_in_kgs - statistics.mean_yield) / standard_deviation
+
+        if statistics.number_of_milkings == 0:
+            statistics.mean_yield = amount_in_kgs
+            statistics.yield_variance = 0.0
+        else:
+            difference = amount_in_kgs - statistics.mean_yield
+            increment = cls.SMOOTHING_FACTOR * difference
+            statistics.mean_yield += increment
+            statistics.yield_variance = (1 - cls.SMOOTHING_FACTOR) * (
+                statistics.yield_variance + difference * increment
+            )
+        statistics.number_of_milkings += 1
+        statistics.last_milking_date = milking_date
+        return z_score
+
+    @classmethod
+    def _build_alert(cls, milk_id, cow_id, milking_date, amount_in_kgs, expected_amount, z_score):
+        if z_score is None or abs(z_score) < cls.THRESHOLD:
+            return None
+        return MilkYieldAlert(
+            cow_id=cow_id,
+            milk_id=milk_id,
+            milking_date=milking_date,
+            amount_in_kgs=amount_in_kgs,
+            expected_amount_in_kgs=Decimal(expected_amount).quantize(Decimal("0.00")),
+            z_score=Decimal(z_score).quantize(Decimal("0.00")),
+        )
+
+    @classmethod
+    def record_milking(cls, milk):
+        with transaction.atomic():
+            statistics, created = MilkYieldStatistics.objects.select_for_update().get_or_create(
+                cow_id=milk.cow_id
+            )
+            expected_amount = statistics.mean_yield
+            z_score = cls._observe(statistics, milk.milking_date, milk.amount_in_kgs)
+            statistics.save()
+
+            alert = cls._build_alert(
+                milk.pk, milk.cow_id, milk.milking_date, milk.amount_in_kgs, expected_amount, z_score
+            )
+            if alert:
+                alert.save()
+            return alert
+
+    @classmethod
+    def rebuild(cls, cow_ids=None):
+        milk_records = Milk.objects.order_by("cow", "milking_date", "id")
+        # Alerts of archived milk are kept, the replay only covers the milk left in `Milk`
+        alerts = MilkYieldAlert.objects.filter(milk__isnull=False)
+        if cow_ids:
+            milk_records = milk_records.filter(cow__in=cow_ids)
+            alerts = alerts.filter(cow__in=cow_ids)
+
+        acknowledged_milk_ids = set(
+            alerts.filter(is_acknowledged=True).values_list("milk", flat=True)
+        )
+        statistics = {}
+        new_alerts = []
+        for milk_id, cow_id, milking_date, amount_in_kgs in milk_records.values_list(
+            "id", "cow", "milking_date", "amount_in_kgs"
+        ).iterator():
+            cow_statistics = statistics.setdefault(cow_id, MilkYieldStatistics(cow_id=cow_id))
+            expected_amount = cow_statistics.mean_yield
+            z_score = cls._observe(cow_statistics, milking_date, amount_in_kgs)
+            alert = cls._build_alert(
+                milk_id, cow_id, milking_date, amount_in_kgs, expected_amount, z_score
+            )
+            if alert:
+                alert.is_acknowledged = milk_id in acknowledged_milk_ids
+                new_alerts.append(alert)
+
+        with transaction.atomic():
+            alerts.delete()
+            MilkYieldAlert.objects.bulk_create(new_alerts)
+            MilkYieldStatistics.objects.bulk_create(
+                statistics.values(),
+                update_conflicts=True,
+                unique_fields=["cow"],
+                update_fields=[
+                    "mean_yield",
+                    "yield_variance",
+                    "number_of_milkings",
+                    "last_milking_date",
+                ],
+            )
+        return len(statistics)
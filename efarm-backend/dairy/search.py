@@ -0,0 +1,199 @@
+import re
+
+from django.db import connections, router, transaction
+
+from dairy.choices import SearchResultTypeChoices
+from dairy.models import Cow, Disease, Inseminator, Pregnancy, SearchDocument, Symptoms, Treatment
+from efarm.tenancy import UNSCOPED, current_farm
+
+
+class SearchIndex:
+    """
+    Full-text index over the names and notes of the herd, answering searches from an index of the
+    database instead of scanning the records with `icontains` filters.
+
+    Every cow, inseminator, disease and symptom, and every pregnancy and treatment with notes, has
+    a `SearchDocument` holding its title and body, written by the signals saving or deleting the
+    record. The documents are indexed by an FTS5 table on SQLite and a `tsvector` column with a GIN
+    index on PostgreSQL, and matches are ranked with `bm25` and `ts_rank` respectively, titles
+    weighing more than bodies.
+
+    Every word of the query must match, the last letters of words being optional so partial names
+    are found. Searches within the scoped views return the records of the farm of the user and the
+    inseminators, which are shared by every farm.
+
+    Methods:
+    - `document(instance)`: Returns the fields of the document of a record, None without text to index.
+    - `index(instance)`: Writes the document of a record, or deletes it if it has nothing to index.
+    - `remove(instance)`: Deletes the document of a record.
+    - `rebuild()`: Rewrites every document, returning the number of documents.
+    - `search(query, types, limit)`: Returns the best matches of a query.
+
+    """
+
+    TYPES = {
+        Cow: SearchResultTypeChoices.COW,
+        Inseminator: SearchResultTypeChoices.INSEMINATOR,
+        Pregnancy: SearchResultTypeChoices.PREGNANCY,
+        Treatment: SearchResultTypeChoices.TREATMENT,
+        Disease: SearchResultTypeChoices.DISEASE,
+        Symptoms: SearchResultTypeChoices.SYMPTOM,
+    }
+    SHARED_TYPES = [SearchResultTypeChoices.INSEMINATOR]
+    # Weights of the title and of the body in the rank of a match
+    TITLE_WEIGHT = 10.0
+    BODY_WEIGHT = 1.0
+    MAX_TERMS = 8
+    BATCH_SIZE = 1000
+
+    @classmethod
+    def document(cls, instance):
+        if isinstance(instance, Cow):
+            return {"farm_id": instance.farm_id, "title": instance.name, "body": ""}
+        if isinstance(instance, Inseminator):
+            return {
+                "farm_id": None,
+                "title": f"{instance.first_name} {instance.last_name}",
+                "body": instance.company or "",
+            }
+        if isinstance(instance, Pregnancy):
+            notes = "\n".join(
+                note for note in [instance.pregnancy_notes, instance.calving_notes] if note
+            )
+            if not notes:
+                return None
+            return {
+                "farm_id": instance.cow.farm_id,
+                "title": f"Pregnancy of {instance.cow.name} started on {instance.start_date}",
+                "body": notes,
+            }
+        if isinstance(instance, Treatment):
+            if not instance.notes:
+                return None
+            return {
+                "farm_id": instance.cow.farm_id,
+                "title": f"Treatment of {instance.cow.name} for {instance.disease.name}",
+                "body": instance.notes,
+            }
+        if isinstance(instance, Disease):
+            return {"farm_id": instance.farm_id, "title": instance.name, "body": instance.notes}
+        return {"farm_id": instance.farm_id, "title": instance.name, "body": instance.description}
+
+    @classmethod
+    def index(cls, instance):
+        document = cls.document(instance)
+        if document is None:
+            cls.remove(instance)
+            return
+        documents = SearchDocument.objects.filter(
+            type=cls.TYPES[type(instance)], object_id=instance.pk
+        )
+        renamed = documents.exclude(title=document["title"]).exists()
+        SearchDocument.objects.update_or_create(
+            type=cls.TYPES[type(instance)], object_id=instance.pk, defaults=document
+        )
+
+        if renamed and isinstance(instance, Cow):
+            # The titles of the pregnancies and treatments of a renamed cow hold its former name
+            for record in (
+                Pregnancy.objects.all_farms()
+                .filter(cow=instance)
+                .exclude(pregnancy_notes="", calving_notes="")
+                .select_related("cow")
+            ):
+                cls.index(record)
+            for record in (
+                Treatment.objects.all_farms()
+                .filter(cow=instance)
+                .exclude(notes="")
+                .select_related("cow", "disease")
+            ):
+                cls.index(record)
+
+    @classmethod
+    def remove(cls, instance):
+        SearchDocument.objects.filter(
+            type=cls.TYPES[type(instance)], object_id=instance.pk
+        ).delete()
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls):
+        SearchDocument.objects.all().delete()
+        querysets = {
+            Cow: Cow.objects.all_farms(),
+            Inseminator: Inseminator.objects.all(),
+            Pregnancy: Pregnancy.objects.all_farms().select_related("cow"),
+            Treatment: Treatment.objects.all_farms().select_related("cow", "disease"),
+            Disease: Disease.objects.all_farms(),
+            Symptoms: Symptoms.objects.all_farms(),
+        }
+        number_of_documents = 0
+        for model, queryset in querysets.items():
+            documents = []
+            for instance in queryset.iterator(chunk_size=cls.BATCH_SIZE):
+                document = cls.document(instance)
+                if document is not None:
+                    documents.append(
+                        SearchDocument(type=cls.TYPES[model], object_id=instance.pk, **document)
+                    )
+            SearchDocument.objects.bulk_create(documents, batch_size=cls.BATCH_SIZE)
+            number_of_documents += len(documents)
+        return number_of_documents
+
+    @classmethod
+    def _farm_condition(cls):
+        # The documents of the current farm and the shared documents, every document when unscoped
+        farm_id = current_farm()
+        if farm_id is UNSCOPED:
+            return "", []
+        shared_types = ", ".join(["%s"] * len(cls.SHARED_TYPES))
+        if farm_id is None:
+            return f" AND (d.farm_id IS NULL OR d.type IN ({shared_types}))", [*cls.SHARED_TYPES]
+        return f" AND (d.farm_id = %s OR d.type IN ({shared_types}))", [farm_id, *cls.SHARED_TYPES]
+
+    @classmethod
+    def search(cls, query, types=None, limit=20):
+        """
+        Returns the `type`, `id`, `title` and `rank` of the best matches of `query`, best first,
+        limited to the `types` given.
+        """
+        terms = re.findall(r"\w+", query.lower())[: cls.MAX_TERMS]
+        if not terms:
+            return []
+
+        if connections[router.db_for_read(SearchDocument)].vendor == "postgresql":
+            params = [" & ".join(f"{term}:*" for term in terms)]
+            sql = (
+                "SELECT d.id, d.type, d.object_id, d.title, "
+                "ts_rank(d.search_vector, query) AS rank "
+                "FROM dairy_searchdocument d, to_tsquery('simple', %s) query "
+                "WHERE d.search_vector @@ query"
+            )
+        else:
+            params = [" ".join(f'"{term}"*' for term in terms)]
+            sql = (
+                "SELECT d.id, d.type, d.object_id, d.title, "
+                f"-bm25(dairy_searchdocument_fts, {cls.TITLE_WEIGHT}, {cls.BODY_WEIGHT}) AS rank "
+                "FROM dairy_searchdocument_fts "
+                "JOIN dairy_searchdocument d ON d.id = dairy_searchdocument_fts.rowid "
+                "WHERE dairy_searchdocument_fts MATCH %s"
+            )
+
+        farm_condition, farm_params = cls._farm_condition()
+        sql += farm_condition
+        params.extend(farm_params)
+        if types:
+            sql += f" AND d.type IN ({', '.join(['%s'] * len(types))})"
+            params.extend(types)
+        sql += " ORDER BY rank DESC, d.id LIMIT %s"
+        params.append(limit)
+        return [
+            {
+                "type": document.type,
+                "id": document.object_id,
+                "title": document.title,
+                "rank": round(document.rank, 6),
+            }
+            for document in SearchDocument.objects.raw(sql, params)
+        ]
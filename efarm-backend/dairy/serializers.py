@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from .analytics import DiseaseAnalytics, InseminationAnalytics, OccupancyAnalytics
 from .models import *
 
 
@@ -52,7 +53,7 @@ class InseminatorSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Inseminator
-        fields = "__all__"
+        exclude = ["normalized_first_name", "normalized_last_name"]
 
 
 class InseminationSerializer(serializers.ModelSerializer):
@@ -112,7 +113,7 @@ class MilkSerializer(serializers.ModelSerializer):
 
 
 class WeightRecordSerializer(serializers.ModelSerializer):
-    cow = serializers.PrimaryKeyRelatedField(queryset=Cow.objects.all())
+    cow = serializers.PrimaryKeyRelatedField(queryset=Cow.objects)
 
     class Meta:
         model = WeightRecord
@@ -120,7 +121,7 @@ class WeightRecordSerializer(serializers.ModelSerializer):
 
 
 class CullingRecordSerializer(serializers.ModelSerializer):
-    cow = serializers.PrimaryKeyRelatedField(queryset=Cow.objects.all())
+    cow = serializers.PrimaryKeyRelatedField(queryset=Cow.objects)
 
     class Meta:
         model = CullingRecord
@@ -128,7 +129,7 @@ class CullingRecordSerializer(serializers.ModelSerializer):
 
 
 class QuarantineRecordSerializer(serializers.ModelSerializer):
-    cow = serializers.PrimaryKeyRelatedField(queryset=Cow.objects.all())
+    cow = serializers.PrimaryKeyRelatedField(queryset=Cow.objects)
 
     class Meta:
         model = QuarantineRecord
@@ -203,3 +204,133 @@ class CowPenSerializer(serializers.ModelSerializer):
     class Meta:
         model = CowPen
         fields = "__all__"
+
+
+class CowFertilityRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CowFertilityRecord
+        fields = "__all__"
+
+
+class MilkYieldAlertSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MilkYieldAlert
+        fields = "__all__"
+        read_only_fields = [
+            "cow",
+            "milk",
+            "milking_date",
+            "amount_in_kgs",
+            "expected_amount_in_kgs",
+            "z_score",
+            "created_at",
+        ]
+
+
+class BreedingCalendarQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, max_value=365, default=7)
+
+
+class InseminationAnalyticsQuerySerializer(serializers.Serializer):
+    group_by = serializers.ChoiceField(
+        choices=list(InseminationAnalytics.GROUPINGS), default="inseminator"
+    )
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start_date = attrs.get("start_date")
+        end_date = attrs.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("The start date must not be after the end date.")
+        return attrs
+
+
+class PedigreeQuerySerializer(serializers.Serializer):
+    generations = serializers.IntegerField(min_value=1, max_value=10, default=3)
+    direction = serializers.ChoiceField(
+        choices=["ancestors", "descendants"], default="ancestors"
+    )
+
+
+class MatingRankingQuerySerializer(serializers.Serializer):
+    dam = serializers.IntegerField(min_value=1, required=False)
+
+
+class OccupancyQuerySerializer(serializers.Serializer):
+    scope = serializers.ChoiceField(choices=OccupancyAnalytics.SCOPES, default=OccupancyAnalytics.BARN)
+    interval = serializers.ChoiceField(
+        choices=list(OccupancyAnalytics.INTERVALS), default=OccupancyAnalytics.DAY
+    )
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        end_date = attrs.get("end_date") or timezone.localdate()
+        start_date = attrs.get("start_date") or end_date - timedelta(days=29)
+        if start_date > end_date:
+            raise serializers.ValidationError("The start date must not be after the end date.")
+        number_of_buckets = OccupancyAnalytics.number_of_buckets(
+            attrs["interval"], start_date, end_date
+        )
+        if number_of_buckets > OccupancyAnalytics.MAX_BUCKETS:
+            raise serializers.ValidationError(
+                f"The period is too long for the interval, it would contain more than "
+                f"{OccupancyAnalytics.MAX_BUCKETS} buckets."
+            )
+        return attrs
+
+
+class HealthDueQuerySerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+
+
+class WeightGainQuerySerializer(serializers.Serializer):
+    cow = serializers.PrimaryKeyRelatedField(queryset=Cow.objects, required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start_date, end_date = attrs.get("start_date"), attrs.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("The start date must not be after the end date.")
+        return attrs
+
+
+class MilkProductionQuerySerializer(serializers.Serializer):
+    cow = serializers.PrimaryKeyRelatedField(queryset=Cow.objects, required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start_date, end_date = attrs.get("start_date"), attrs.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("The start date must not be after the end date.")
+        return attrs
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    type = serializers.MultipleChoiceField(choices=SearchResultTypeChoices.choices, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class DiseaseAnalyticsQuerySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(
+        choices=list(DiseaseAnalytics.PERIODS), default=DiseaseAnalytics.MONTH
+    )
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        end_date = attrs.get("end_date") or timezone.localdate()
+        start_date = attrs.get("start_date") or end_date - timedelta(days=364)
+        if start_date > end_date:
+            raise serializers.ValidationError("The start date must not be after the end date.")
+        number_of_periods = DiseaseAnalytics.number_of_periods(attrs["period"], start_date, end_date)
+        if number_of_periods > DiseaseAnalytics.MAX_PERIODS:
+            raise serializers.ValidationError(
+                f"The range is too long for the period, it would contain more than "
+                f"{DiseaseAnalytics.MAX_PERIODS} periods."
+            )
+        return attrs
@@ -1,6 +1,11 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from datetime import timedelta
+from dairy.analytics import BreedingCalendar, FertilityAnalytics
+from dairy.genetics import HerdPedigree
+from dairy.health import HealthSchedule
+from dairy.monitoring import MilkYieldMonitor
+from dairy.search import SearchIndex
 from dairy.models import *
 
 
@@ -70,3 +75,91 @@ def set_cow_production_status_to_quarantined(sender, instance, **kwargs):
     if instance.start_date and instance.end_date is None:
         cow.current_production_status == CowProductionStatusChoices.QUARANTINED
         cow.save()
+
+
+@receiver(post_save, sender=Heat)
+@receiver(post_save, sender=Insemination)
+@receiver(post_save, sender=Pregnancy)
+def refresh_cow_fertility_record(sender, instance, **kwargs):
+    # Only the fertility indicators of the cow the reproductive event belongs to can change
+    if instance.cow.gender == SexChoices.FEMALE:
+        FertilityAnalytics.refresh_fertility_records(cow_ids=[instance.cow_id])
+
+
+@receiver(post_delete, sender=Heat)
+@receiver(post_delete, sender=Insemination)
+@receiver(post_delete, sender=Pregnancy)
+def refresh_cow_fertility_record_on_delete(sender, instance, origin=None, **kwargs):
+    # When the cow itself is deleted, its fertility record is deleted along with it
+    if isinstance(origin, Cow):
+        return
+    refresh_cow_fertility_record(sender, instance)
+
+
+@receiver(post_save, sender=Heat)
+@receiver(post_save, sender=Insemination)
+@receiver(post_save, sender=Pregnancy)
+@receiver(post_delete, sender=Heat)
+@receiver(post_delete, sender=Insemination)
+@receiver(post_delete, sender=Pregnancy)
+def invalidate_breeding_calendar(sender, instance, **kwargs):
+    BreedingCalendar.invalidate()
+
+
+@receiver(post_save, sender=Cow)
+@receiver(post_delete, sender=Cow)
+def invalidate_herd_pedigree(sender, instance, created=True, **kwargs):
+    # The sire and dam of a cow can not be changed once it is added to the herd
+    if created:
+        HerdPedigree.invalidate()
+
+
+@receiver(post_save, sender=Vaccination)
+def schedule_next_vaccination(sender, instance, **kwargs):
+    HealthSchedule.record_vaccination(instance)
+
+
+@receiver(post_delete, sender=Vaccination)
+def unschedule_next_vaccination(sender, instance, origin=None, **kwargs):
+    # The due items of a deleted cow are deleted along with it
+    if isinstance(origin, Cow):
+        return
+    HealthSchedule.remove_vaccination(instance)
+
+
+@receiver(post_save, sender=Treatment)
+def schedule_treatment(sender, instance, **kwargs):
+    HealthSchedule.record_treatment(instance)
+
+
+@receiver(post_save, sender=VaccinationProtocol)
+@receiver(post_delete, sender=VaccinationProtocol)
+def reschedule_vaccinations(sender, instance, **kwargs):
+    HealthSchedule.refresh_vaccination_protocol(instance.vaccine_name)
+
+
+@receiver(post_save, sender=Milk)
+def monitor_milk_yield(sender, instance, created, **kwargs):
+    if created:
+        MilkYieldMonitor.record_milking(instance)
+
+
+@receiver(post_save, sender=Cow)
+@receiver(post_save, sender=Inseminator)
+@receiver(post_save, sender=Pregnancy)
+@receiver(post_save, sender=Treatment)
+@receiver(post_save, sender=Disease)
+@receiver(post_save, sender=Symptoms)
+def index_search_document(sender, instance, raw=False, **kwargs):
+    if not raw:
+        SearchIndex.index(instance)
+
+
+@receiver(post_delete, sender=Cow)
+@receiver(post_delete, sender=Inseminator)
+@receiver(post_delete, sender=Pregnancy)
+@receiver(post_delete, sender=Treatment)
+@receiver(post_delete, sender=Disease)
+@receiver(post_delete, sender=Symptoms)
+def remove_search_document(sender, instance, **kwargs):
+    SearchIndex.remove(instance)
@@ -21,6 +21,8 @@ router.register(r'barns', BarnViewSet, basename='barn')
 router.register(r'cow-pens', CowPenViewSet, basename='cow-pen')
 router.register(r'cow-in-pen-movements', CowInPenMovementViewSet, basename='cow-in-pen-movement')
 router.register(r'cow-in-barn-movements', CowInBarnMovementViewSet, basename='cow-in-barn-movement')
+router.register(r'fertility-records', CowFertilityRecordViewSet, basename='fertility-records')
+router.register(r'milk-yield-alerts', MilkYieldAlertViewSet, basename='milk-yield-alerts')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -32,4 +34,15 @@ urlpatterns = [
     path('admin/dashboard/weekly-milk-chart-data', MilkProductionWeeklyView.as_view()),
     path('admin/dashboard/pregnant-cows', PregnantCowsView.as_view()),
     path('admin/dashboard/lactating-cows', LactatingCowsView.as_view()),
+    path('fertility/herd/', HerdFertilityView.as_view(), name='herd-fertility'),
+    path('breeding-calendar/', BreedingCalendarView.as_view(), name='breeding-calendar'),
+    path('insemination-analytics/', InseminationAnalyticsView.as_view(), name='insemination-analytics'),
+    path('genetics/mating-ranking/', MatingRankingView.as_view(), name='mating-ranking'),
+    path('occupancy/', OccupancyAnalyticsView.as_view(), name='occupancy-analytics'),
+    path('health/diseases/', DiseaseAnalyticsView.as_view(), name='disease-analytics'),
+    path('health/due/', HealthDueListView.as_view(), name='health-due-list'),
+    path('weight-gain/', WeightGainView.as_view(), name='weight-gain'),
+    path('weight-gain/cohorts/', WeightGainCohortView.as_view(), name='weight-gain-cohorts'),
+    path('milk-production/', MilkProductionView.as_view(), name='milk-production'),
+    path('search/', SearchView.as_view(), name='search'),
 ]
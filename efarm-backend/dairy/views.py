@@ -4,19 +4,34 @@ from django.conf import settings
 from django.db.models import Sum
 from django.http import FileResponse, Http404
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins
 from rest_framework import status
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from dairy.analytics import (
+    BreedingCalendar,
+    DiseaseAnalytics,
+    FertilityAnalytics,
+    InseminationAnalytics,
+    OccupancyAnalytics,
+    WeightGainAnalytics,
+)
+from dairy.archiving import MilkArchive
 from dairy.filters import *
+from dairy.genetics import HerdPedigree
+from dairy.health import HealthSchedule
 from dairy.permissions import *
+from dairy.search import SearchIndex
 from dairy.serializers import *
+from efarm.mixins import FarmScopeMixin, ReplicaReadMixin
 
 
-class CowBreedViewSet(viewsets.ModelViewSet):
+class CowBreedViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = CowBreed.objects.all()
     serializer_class = CowBreedSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -65,7 +80,7 @@ class CowBreedViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CowViewSet(viewsets.ModelViewSet):
+class CowViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Cow.objects.all()
     serializer_class = CowSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -107,8 +122,40 @@ class CowViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["get"])
+    def pedigree(self, request, pk=None):
+        """
+        Returns the ancestors (default) or the descendants of the cow as a nested tree.
+
+        Query parameters:
+        - `generations`: How many generations to resolve, 3 by default.
+        - `direction`: `ancestors` for the sires and dams, `descendants` for the offspring.
+        """
+        cow = self.get_object()
+        serializer = PedigreeQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        if params["direction"] == "descendants":
+            pedigree = Cow.manager.get_progeny(cow, params["generations"])
+        else:
+            pedigree = Cow.manager.get_pedigree(cow, params["generations"])
+        return Response(pedigree, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"])
+    def inbreeding(self, request, pk=None):
+        """
+        Returns the inbreeding coefficient of the cow.
+        """
+        cow = self.get_object()
+        inbreeding_coefficient = HerdPedigree.current().inbreeding_coefficient(cow.id)
+        return Response(
+            {"cow": cow.id, "inbreeding_coefficient": round(inbreeding_coefficient, 4)},
+            status=status.HTTP_200_OK,
+        )
+
 
-class HeatViewSet(viewsets.ModelViewSet):
+class HeatViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Heat.objects.all()
     serializer_class = HeatSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -146,7 +193,7 @@ class HeatViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class InseminatorViewset(viewsets.ModelViewSet):
+class InseminatorViewset(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Inseminator.objects.all()
     serializer_class = InseminatorSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -176,7 +223,7 @@ class InseminatorViewset(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class InseminationViewset(viewsets.ModelViewSet):
+class InseminationViewset(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Insemination.objects.all()
     serializer_class = InseminationSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -229,7 +276,7 @@ class InseminationViewset(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class PregnancyViewSet(viewsets.ModelViewSet):
+class PregnancyViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Pregnancy.objects.all()
     serializer_class = PregnancySerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -268,7 +315,7 @@ class PregnancyViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class LactationViewSet(viewsets.ModelViewSet):
+class LactationViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = LactationSerializer
     queryset = Lactation.objects.all()
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -322,7 +369,7 @@ class LactationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class MilkViewSet(viewsets.ModelViewSet):
+class MilkViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = MilkSerializer
     queryset = Milk.objects.all()
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -370,7 +417,7 @@ class MilkViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class WeightRecordViewSet(viewsets.ModelViewSet):
+class WeightRecordViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = WeightRecordSerializer
     queryset = WeightRecord.objects.all()
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -399,7 +446,7 @@ class WeightRecordViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CullingRecordViewSet(viewsets.ModelViewSet):
+class CullingRecordViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = CullingRecordSerializer
     queryset = CullingRecord.objects.all()
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -434,7 +481,7 @@ class CullingRecordViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class QuarantineRecordViewSet(viewsets.ModelViewSet):
+class QuarantineRecordViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = QuarantineRecordSerializer
     queryset = QuarantineRecord.objects.all()
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -464,7 +511,7 @@ class QuarantineRecordViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CowInBarnMovementViewSet(viewsets.ReadOnlyModelViewSet):
+class CowInBarnMovementViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for the CowInBarnMovement model.
 
@@ -478,7 +525,7 @@ class CowInBarnMovementViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = CowInBarnMovement.objects.all()
 
 
-class CowInPenMovementViewSet(viewsets.ModelViewSet):
+class CowInPenMovementViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for the CowInPenMovement model.
 
@@ -496,7 +543,7 @@ class CowInPenMovementViewSet(viewsets.ModelViewSet):
     queryset = CowInPenMovement.objects.all()
 
 
-class CowPenViewSet(viewsets.ModelViewSet):
+class CowPenViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for the CowPen model.
 
@@ -514,7 +561,7 @@ class CowPenViewSet(viewsets.ModelViewSet):
     queryset = CowPen.objects.all()
 
 
-class BarnViewSet(viewsets.ModelViewSet):
+class BarnViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for the Barn model.
 
@@ -532,7 +579,345 @@ class BarnViewSet(viewsets.ModelViewSet):
     queryset = Barn.objects.all()
 
 
-class MilkTodayView(APIView):
+class CowFertilityRecordViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for retrieving the precomputed CowFertilityRecord instances.
+
+    Provides the following actions:
+    - `list`: Retrieves the fertility indicators of all female cows.
+    - `retrieve`: Retrieves the fertility indicators of a specific cow by the record ID.
+
+    """
+
+    queryset = CowFertilityRecord.objects.all()
+    serializer_class = CowFertilityRecordSerializer
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = CowFertilityRecordFilterSet
+    ordering_fields = ["days_open", "calving_interval", "services_per_conception"]
+    permission_classes = [CanViewCow]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if not queryset.exists():
+            if request.query_params:
+                return Response(
+                    {"detail": "No fertility records found matching the provided filters."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            else:
+                return Response(
+                    {"detail": "No fertility records computed yet."},
+                    status=status.HTTP_200_OK,
+                )
+
+        serializer = self.get_serializer(queryset, many=True)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class MilkYieldAlertViewSet(
+    FarmScopeMixin, ReplicaReadMixin, mixins.UpdateModelMixin, viewsets.ReadOnlyModelViewSet
+):
+    """
+    ViewSet for the MilkYieldAlert instances raised as milk records are added.
+
+    Provides the following actions:
+    - `list`: Retrieves the alerts, latest milking first.
+    - `retrieve`: Retrieves a specific alert by its ID.
+    - `partial_update`: Acknowledges an alert after review.
+
+    """
+
+    queryset = MilkYieldAlert.objects.all()
+    serializer_class = MilkYieldAlertSerializer
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = MilkYieldAlertFilterSet
+    ordering_fields = ["milking_date", "z_score"]
+
+    def get_permissions(self):
+        if self.action == "partial_update":
+            permission_classes = [CanUpdateMilk]
+        else:
+            permission_classes = [CanViewMilk]
+        return [permission() for permission in permission_classes]
+
+    def update(self, request, *args, **kwargs):
+        if not kwargs.get("partial"):
+            raise MethodNotAllowed("PUT")
+        return super().update(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if not queryset.exists():
+            if request.query_params:
+                return Response(
+                    {"detail": "No milk yield alerts found matching the provided filters."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            else:
+                return Response(
+                    {"detail": "No milk yield alerts raised."},
+                    status=status.HTTP_200_OK,
+                )
+
+        serializer = self.get_serializer(queryset, many=True)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class HerdFertilityView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    permission_classes = [CanViewCow]
+
+    def get(self, request, format=None):
+        return Response(FertilityAnalytics.herd_fertility())
+
+
+class BreedingCalendarView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning the breeding events of the herd expected within the next `days` days (7 by default).
+
+    Events that are already overdue, such as a missed pregnancy scan, are included as well.
+    """
+
+    permission_classes = [CanViewCow]
+
+    def get(self, request, format=None):
+        serializer = BreedingCalendarQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        events = BreedingCalendar.upcoming_events(serializer.validated_data["days"])
+        return Response(events, status=status.HTTP_200_OK)
+
+
+class InseminationAnalyticsView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View comparing conception rates, services per pregnancy and days to pregnancy.
+
+    Query parameters:
+    - `group_by`: `inseminator` (default), `producer` or `semen_batch`.
+    - `start_date` / `end_date`: Optional inclusive insemination date range.
+    """
+
+    permission_classes = [CanActOnInseminationRecord]
+
+    def get(self, request, format=None):
+        serializer = InseminationAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        success_rates = InseminationAnalytics.success_rates(
+            group_by=params["group_by"],
+            start_date=params.get("start_date"),
+            end_date=params.get("end_date"),
+        )
+        return Response(success_rates, status=status.HTTP_200_OK)
+
+
+class MatingRankingView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View ranking the breeding bulls of the herd by the inbreeding coefficient of the prospective calf.
+
+    Ranks the bulls for the open cow given as the `dam` query parameter, or for every open cow.
+    """
+
+    permission_classes = [CanActOnInseminationRecord]
+
+    def get(self, request, format=None):
+        serializer = MatingRankingQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        dam_id = serializer.validated_data.get("dam")
+
+        dams = Cow.manager.get_open_cows()
+        if dam_id:
+            dams = dams.filter(pk=dam_id)
+        bulls = dict(Cow.manager.get_male_cows().values_list("id", "name"))
+        pedigree = HerdPedigree.current()
+
+        rankings = [
+            {
+                "dam": dam["id"],
+                "dam_name": dam["name"],
+                "sires": [
+                    {
+                        "sire": sire_id,
+                        "sire_name": bulls[sire_id],
+                        "inbreeding_coefficient": round(inbreeding_coefficient, 4),
+                    }
+                    for inbreeding_coefficient, sire_id in pedigree.rank_sires(dam["id"], bulls)
+                ],
+            }
+            for dam in dams.values("id", "name").order_by("id")
+        ]
+        return Response(rankings, status=status.HTTP_200_OK)
+
+
+class OccupancyAnalyticsView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning the occupancy of each barn or pen over time, with its peak utilization.
+
+    Query parameters:
+    - `scope`: `barn` (default) or `pen`.
+    - `interval`: `day` (default) or `hour`.
+    - `start_date` / `end_date`: Optional inclusive period, the last 30 days by default.
+    """
+
+    permission_classes = [CanViewCow]
+
+    def get(self, request, format=None):
+        serializer = OccupancyQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        occupancy = OccupancyAnalytics.occupancy(
+            scope=params["scope"],
+            interval=params["interval"],
+            start_date=params.get("start_date"),
+            end_date=params.get("end_date"),
+        )
+        return Response(occupancy, status=status.HTTP_200_OK)
+
+
+class DiseaseAnalyticsView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning disease incidence, prevalence, recovery time and treatment cost per disease
+    category and period.
+
+    Query parameters:
+    - `period`: `month` (default) or `week`.
+    - `start_date` / `end_date`: Optional inclusive range, the last year by default.
+    """
+
+    permission_classes = [CanViewCow]
+
+    def get(self, request, format=None):
+        serializer = DiseaseAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        statistics = DiseaseAnalytics.disease_statistics(
+            period=params["period"],
+            start_date=params.get("start_date"),
+            end_date=params.get("end_date"),
+        )
+        return Response(statistics, status=status.HTTP_200_OK)
+
+
+class HealthDueListView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning the vaccinations and treatments due on living cows, grouped by barn.
+
+    Query parameters:
+    - `date`: Optional day of the worklist, today by default. Overdue work is included.
+    """
+
+    permission_classes = [CanViewCow]
+
+    def get(self, request, format=None):
+        serializer = HealthDueQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        worklist = HealthSchedule.worklist(serializer.validated_data.get("date"))
+        return Response(worklist, status=status.HTTP_200_OK)
+
+
+class SearchView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning the cows, inseminators, pregnancies, treatments, diseases and symptoms matching
+    a full-text search, best matches first.
+
+    Query parameters:
+    - `q`: The words searched, partial words match the words they start.
+    - `type`: Optional types of the results, repeated for several types, every type by default.
+    - `limit`: Optional maximum number of results, 20 by default.
+    """
+
+    permission_classes = [CanViewCow]
+
+    def get(self, request, format=None):
+        serializer = SearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        results = SearchIndex.search(
+            params["q"], types=sorted(params.get("type", [])), limit=params["limit"]
+        )
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class WeightGainView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning the average daily gain of cows between consecutive weighings.
+
+    Query parameters:
+    - `cow`: Optional id of the cow, every cow by default.
+    - `start_date` / `end_date`: Optional inclusive range of the weighings.
+    """
+
+    permission_classes = [CanActOnWeightRecord]
+
+    def get(self, request, format=None):
+        serializer = WeightGainQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        cow = params.get("cow")
+        gains = WeightGainAnalytics.daily_gains(
+            cow_ids=[cow.id] if cow else None,
+            start_date=params.get("start_date"),
+            end_date=params.get("end_date"),
+        )
+        return Response(gains, status=status.HTTP_200_OK)
+
+
+class WeightGainCohortView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning the percentiles of the average daily gain per breed and age band.
+
+    Query parameters:
+    - `start_date` / `end_date`: Optional inclusive range of the weighings.
+    """
+
+    permission_classes = [CanActOnWeightRecord]
+
+    def get(self, request, format=None):
+        serializer = WeightGainQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        cohorts = WeightGainAnalytics.cohort_percentiles(
+            start_date=params.get("start_date"), end_date=params.get("end_date")
+        )
+        return Response(cohorts, status=status.HTTP_200_OK)
+
+
+class MilkProductionView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning the milk produced per day, over the hot and the archived milk records.
+
+    Query parameters:
+    - `cow`: Optional id of the cow, every cow by default.
+    - `start_date` / `end_date`: Optional inclusive range of the milking dates.
+    """
+
+    permission_classes = [CanViewMilk]
+
+    def get(self, request, format=None):
+        serializer = MilkProductionQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        cow = params.get("cow")
+        totals = MilkArchive.daily_totals(
+            start_date=params.get("start_date"),
+            end_date=params.get("end_date"),
+            cow_ids=[cow.id] if cow else None,
+        )
+        return Response(totals, status=status.HTTP_200_OK)
+
+
+class MilkTodayView(FarmScopeMixin, ReplicaReadMixin, APIView):
     def get(self, request, format=None):
         today = timezone.localdate()
         start_of_today = timezone.datetime.combine(today, timezone.datetime.min.time())
@@ -573,7 +958,7 @@ class MilkTodayView(APIView):
         )
 
 
-class TotalAliveCowsView(APIView):
+class TotalAliveCowsView(FarmScopeMixin, ReplicaReadMixin, APIView):
     def get(self, request, format=None):
         total_alive_cows = (
             Cow.objects.filter(availability_status="Alive")
@@ -584,7 +969,7 @@ class TotalAliveCowsView(APIView):
         return Response({"total_alive_cows": total_alive_cows})
 
 
-class TotalAliveFemaleCowsView(APIView):
+class TotalAliveFemaleCowsView(FarmScopeMixin, ReplicaReadMixin, APIView):
     def get(self, request, format=None):
         total_alive_female_cows = (
             Cow.objects.filter(availability_status="Alive", gender="Female")
@@ -595,7 +980,7 @@ class TotalAliveFemaleCowsView(APIView):
         return Response({"total_alive_female_cows": total_alive_female_cows})
 
 
-class TotalAliveMaleCowsView(APIView):
+class TotalAliveMaleCowsView(FarmScopeMixin, ReplicaReadMixin, APIView):
     def get(self, request, format=None):
         total_alive_male_cows = (
             Cow.objects.filter(availability_status="Alive", gender="Male")
@@ -606,7 +991,7 @@ class TotalAliveMaleCowsView(APIView):
         return Response({"total_alive_male_cows": total_alive_male_cows})
 
 
-class CowsMilkedTodayView(APIView):
+class CowsMilkedTodayView(FarmScopeMixin, ReplicaReadMixin, APIView):
     def get(self, request, format=None):
         today = timezone.localdate()
         start_of_day = timezone.datetime.combine(today, timezone.datetime.min.time())
@@ -639,7 +1024,7 @@ class CowsMilkedTodayView(APIView):
         )
 
 
-class MilkProductionWeeklyView(APIView):
+class MilkProductionWeeklyView(FarmScopeMixin, ReplicaReadMixin, APIView):
     def get(self, request, format=None):
         today = timezone.localdate()
         start_of_week = today - timezone.timedelta(days=today.weekday())
@@ -667,7 +1052,7 @@ class MilkProductionWeeklyView(APIView):
         return Response(milk_production_data)
 
 
-class PregnantCowsView(APIView):
+class PregnantCowsView(FarmScopeMixin, ReplicaReadMixin, APIView):
     def get(self, request, format=None):
         pregnancies_count = Pregnancy.objects.filter(
             pregnancy_status="Confirmed", date_of_calving__isnull=True
@@ -675,7 +1060,7 @@ class PregnantCowsView(APIView):
         return Response({"pregnancies_count": pregnancies_count})
 
 
-class LactatingCowsView(APIView):
+class LactatingCowsView(FarmScopeMixin, ReplicaReadMixin, APIView):
     def get(self, request, format=None):
         lactating_cows = Lactation.objects.filter(end_date__isnull=True).values_list(
             "cow__name", flat=True
@@ -0,0 +1,40 @@
+# Generated by Django 4.1.7 on 2026-10-19 11:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dairy", "0010_milk_archive"),
+        ("dairy_inventory", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="barninventoryhistory",
+            name="barn_inventory",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to="dairy_inventory.barninventory"),
+        ),
+        migrations.AlterField(
+            model_name="cowpenhistory",
+            name="pen",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to="dairy.cowpen"),
+        ),
+        migrations.AddIndex(
+            model_name="barninventoryhistory",
+            index=models.Index(fields=["barn_inventory", "timestamp"], name="barn_inv_history_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="cowinventoryupdatehistory",
+            index=models.Index(fields=["date"], name="cow_inv_history_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="cowpenhistory",
+            index=models.Index(fields=["pen", "timestamp"], name="cow_pen_history_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="milkinventoryupdatehistory",
+            index=models.Index(fields=["date"], name="milk_inv_history_date_idx"),
+        ),
+    ]
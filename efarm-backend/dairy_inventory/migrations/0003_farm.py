@@ -0,0 +1,59 @@
+# Generated by Django 4.1.7 on 2026-10-19 11:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_farm"),
+        ("dairy_inventory", "0002_inventory_history_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="cowinventoryupdatehistory",
+            name="cow_inv_history_date_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="milkinventoryupdatehistory",
+            name="milk_inv_history_date_idx",
+        ),
+        migrations.AddField(
+            model_name="cowinventory",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="cowinventoryupdatehistory",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="milkinventory",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="milkinventoryupdatehistory",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="users.farm"),
+        ),
+        migrations.AddIndex(
+            model_name="cowinventoryupdatehistory",
+            index=models.Index(fields=["farm", "date"], name="cow_inv_history_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="milkinventoryupdatehistory",
+            index=models.Index(fields=["farm", "date"], name="milk_inv_history_date_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="cowinventory",
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce("farm", models.Value(0)), name="unique_cow_inventory_farm"),
+        ),
+        migrations.AddConstraint(
+            model_name="milkinventory",
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce("farm", models.Value(0)), name="unique_milk_inventory_farm"),
+        ),
+    ]
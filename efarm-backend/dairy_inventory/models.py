@@ -1,4 +1,9 @@
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
 from dairy.models import *
+from efarm.history import record_history, register_history
+from efarm.tenancy import FarmScopedManager
 from .choices import *
 
 
@@ -10,6 +15,7 @@ class MilkInventory(models.Model):
 
     - `amount_in_kgs`: The amount of milk currently in stock, in kilograms.
     - `last_update`: The date and time when the dairy_inventory was last updated.
+    - `farm`: The farm the milk belongs to, each farm has its own inventory.
 
     ### Meta options
 
@@ -22,10 +28,18 @@ class MilkInventory(models.Model):
         verbose_name = "Milk Inventory"
         verbose_name_plural = "Milk Inventory"
         ordering = ['-last_update']
+        constraints = [
+            # Compared as farm 0 without a farm, NULLs being distinct in unique indexes
+            models.UniqueConstraint(Coalesce('farm', Value(0)), name='unique_milk_inventory_farm'),
+        ]
 
     total_amount_in_kgs = models.FloatField(verbose_name="Amount (kg)", default=0.00,
                                             validators=[MinValueValidator(0.00)], editable=False)
     last_update = models.DateTimeField(auto_now=True)
+    farm = models.ForeignKey('users.Farm', on_delete=models.CASCADE, null=True, editable=False, db_index=False,
+                             related_name='+')
+
+    objects = FarmScopedManager("farm")
 
     def __str__(self):
         return f"{self.total_amount_in_kgs} kg of milk in dairy_inventory (last updated " \
@@ -42,6 +56,7 @@ class MilkInventoryUpdateHistory(models.Model):
     - `update_type`: Whether the milk was added or removed from the dairy_inventory.
     - `date`: The date when the dairy_inventory was updated.
     - `total_amount_in_kgs`: The total amount of milk in dairy_inventory after the update.
+    - `farm`: The farm of the milk inventory.
     
     ### Meta options
     
@@ -50,9 +65,18 @@ class MilkInventoryUpdateHistory(models.Model):
     - `ordering`: A list of fields to use when ordering the model instances.
     """
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['farm', 'date'], name='milk_inv_history_date_idx'),
+        ]
+
     amount_in_kgs = models.DecimalField(verbose_name="Total Amount (kg)", default=0.00, max_digits=7, decimal_places=2,
                                         validators=[MinValueValidator(0.00)], editable=False)
     date = models.DateField(verbose_name='Date', auto_now_add=True)
+    farm = models.ForeignKey('users.Farm', on_delete=models.CASCADE, null=True, editable=False, db_index=False,
+                             related_name='+')
+
+    objects = FarmScopedManager("farm")
 
 
 class CowInventory(models.Model):
@@ -66,15 +90,47 @@ class CowInventory(models.Model):
     - `number_of_sold_cows`: Number of cows that have been sold.
     - `number_of_dead_cows`: Number of cows that have died.
     - `last_update`: Date and time of the last update to the inventory.
+    - `farm`: The farm of the cows, each farm has its own inventory.
 
     """
 
+    class Meta:
+        constraints = [
+            # Compared as farm 0 without a farm, NULLs being distinct in unique indexes
+            models.UniqueConstraint(Coalesce('farm', Value(0)), name='unique_cow_inventory_farm'),
+        ]
+
     total_number_of_cows = models.PositiveIntegerField(verbose_name="Total Number of Cows", default=0, editable=False)
     number_of_male_cows = models.PositiveIntegerField(verbose_name="Number of Male Cows", default=0, editable=False)
     number_of_female_cows = models.PositiveIntegerField(verbose_name="Number of Female Cows", default=0, editable=False)
     number_of_sold_cows = models.PositiveIntegerField(verbose_name="Number of Sold Cows", default=0, editable=False)
     number_of_dead_cows = models.PositiveIntegerField(verbose_name="Number of Dead Cows", default=0, editable=False)
     last_update = models.DateTimeField(auto_now=True)
+    farm = models.ForeignKey('users.Farm', on_delete=models.CASCADE, null=True, editable=False, db_index=False,
+                             related_name='+')
+
+    objects = FarmScopedManager("farm")
+
+    @classmethod
+    def refresh(cls, farm_id=None):
+        """
+        Recounts the cows of the farm `farm_id`, updating its inventory and recording a history entry
+        when the number of cows changed.
+        """
+        cow_inventory, created = cls.objects.all_farms().get_or_create(farm_id=farm_id)
+
+        cows = Cow.objects.all_farms().filter(farm_id=farm_id)
+        cow_inventory.total_number_of_cows = cows.filter(availability_status='Alive').count()
+        cow_inventory.number_of_male_cows = cows.filter(availability_status='Alive', gender='Male').count()
+        cow_inventory.number_of_female_cows = cows.filter(availability_status='Alive', gender='Female').count()
+        cow_inventory.number_of_sold_cows = cows.filter(availability_status='Sold').count()
+        cow_inventory.number_of_dead_cows = cows.filter(availability_status='Dead').count()
+        cow_inventory.save()
+
+        record_history(
+            CowInventoryUpdateHistory, farm_id=farm_id, number_of_cows=cow_inventory.total_number_of_cows
+        )
+        return cow_inventory
 
     def __str__(self):
         return f"{self.total_number_of_cows} cows in farm (last updated " \
@@ -88,11 +144,21 @@ class CowInventoryUpdateHistory(models.Model):
     Fields:
     - `number_of_cows`: Total number of cows in the inventory at the time of the update.
     - `date`: Date of the cow inventory update.
+    - `farm`: The farm of the cow inventory.
 
     """
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['farm', 'date'], name='cow_inv_history_date_idx'),
+        ]
+
     number_of_cows = models.PositiveIntegerField(verbose_name="Total number of cows", default=0, editable=False)
     date = models.DateField(verbose_name='Cow Inventory Update History Date', auto_now_add=True)
+    farm = models.ForeignKey('users.Farm', on_delete=models.CASCADE, null=True, editable=False, db_index=False,
+                             related_name='+')
+
+    objects = FarmScopedManager("farm")
 
 
 class BarnInventory(models.Model):
@@ -116,6 +182,8 @@ class BarnInventory(models.Model):
     number_of_pens = models.PositiveIntegerField(default=1)
     last_update = models.DateTimeField(auto_now=True)
 
+    objects = FarmScopedManager("barn__farm")
+
     def add_cow(self):
         """
         Adds a cow to the barn inventory if the barn's capacity has not been exceeded.
@@ -157,10 +225,17 @@ class BarnInventoryHistory(models.Model):
 
     """
 
-    barn_inventory = models.ForeignKey(BarnInventory, on_delete=models.CASCADE)
+    class Meta:
+        indexes = [
+            models.Index(fields=['barn_inventory', 'timestamp'], name='barn_inv_history_time_idx'),
+        ]
+
+    barn_inventory = models.ForeignKey(BarnInventory, on_delete=models.CASCADE, db_index=False)
     number_of_cows = models.PositiveIntegerField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    objects = FarmScopedManager("barn_inventory__barn__farm")
+
     def __str__(self):
         return f"{self.barn_inventory} - {self.timestamp}"
 
@@ -182,6 +257,8 @@ class CowPenInventory(models.Model):
     pen = models.OneToOneField(CowPen, on_delete=models.CASCADE)
     number_of_cows = models.PositiveIntegerField(default=0)
 
+    objects = FarmScopedManager("pen__barn__farm")
+
     def add_cow(self):
         """
         Adds a cow to the cow pen inventory if the pen's capacity has not been exceeded.
@@ -219,9 +296,22 @@ class CowPenHistory(models.Model):
 
     """
 
-    pen = models.ForeignKey(CowPen, on_delete=models.CASCADE)
+    class Meta:
+        indexes = [
+            models.Index(fields=['pen', 'timestamp'], name='cow_pen_history_time_idx'),
+        ]
+
+    pen = models.ForeignKey(CowPen, on_delete=models.CASCADE, db_index=False)
     barn = models.ForeignKey(Barn, on_delete=models.CASCADE)
     type = models.CharField(max_length=15, choices=CowPenTypeChoices.choices)
     number_of_cows = models.PositiveIntegerField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    objects = FarmScopedManager("pen__barn__farm")
+
+
+# Snapshots repeating the previous snapshot of their inventory are not recorded, see efarm/history.py
+register_history(MilkInventoryUpdateHistory, ['farm_id'], ['amount_in_kgs'], 'date')
+register_history(CowInventoryUpdateHistory, ['farm_id'], ['number_of_cows'], 'date')
+register_history(BarnInventoryHistory, ['barn_inventory'], ['number_of_cows'], 'timestamp')
+register_history(CowPenHistory, ['pen'], ['barn', 'type', 'number_of_cows'], 'timestamp')
@@ -1,39 +1,25 @@
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 
+from efarm.history import record_history
 from .models import *
 
 
 @receiver(pre_save, sender=Milk)
 def update_milk_inventory(sender, instance, **kwargs):
     # Update the milk inventory
-    milk_inventory, created = MilkInventory.objects.get_or_create(id=1)
+    milk_inventory, created = MilkInventory.objects.all_farms().get_or_create(farm_id=instance.farm_id)
     milk_inventory.total_amount_in_kgs += float(instance.amount_in_kgs)
     milk_inventory.save()
-    # Create a new milk inventory update history record
-    MilkInventoryUpdateHistory.objects.create(amount_in_kgs=milk_inventory.total_amount_in_kgs)
+    # Record a milk inventory update history entry when the total changed
+    record_history(
+        MilkInventoryUpdateHistory, farm_id=instance.farm_id, amount_in_kgs=milk_inventory.total_amount_in_kgs
+    )
 
 
 @receiver(post_save, sender=Cow)
 def create_and_update_cow_inventory(sender, instance, **kwargs):
-    # Retrieve the CowInventory instance, or create a new one if it doesn't exist
-    cow_inventory: CowInventory = CowInventory.objects.first()
-    if not cow_inventory:
-        cow_inventory = CowInventory.objects.create()
-
-    # Update the fields of the CowInventory instance based on the Cow objects
-    cow_inventory.total_number_of_cows = Cow.objects.filter(availability_status='Alive').count()
-    cow_inventory.number_of_male_cows = Cow.objects.filter(availability_status='Alive', gender='Male').count()
-    cow_inventory.number_of_female_cows = Cow.objects.filter(availability_status='Alive', gender='Female').count()
-    cow_inventory.number_of_sold_cows = Cow.objects.filter(availability_status='Sold').count()
-    cow_inventory.number_of_dead_cows = Cow.objects.filter(availability_status='Dead').count()
-
-    # Save the changes to the CowInventory instance
-    cow_inventory.save()
-    cow_inventory.refresh_from_db()
-
-    # Create a new history entry in CowInventoryUpdateHistory
-    CowInventoryUpdateHistory.objects.create(number_of_cows=cow_inventory.total_number_of_cows)
+    CowInventory.refresh(instance.farm_id)
 
 
 @receiver(post_save, sender=CowPen)
@@ -41,8 +27,9 @@ def create_cow_pen_inventory_and_history(sender, instance, **kwargs):
     # Retrieve or create the CowPenInventory instance associated with the CowPen
     pen_inventory, created = CowPenInventory.objects.get_or_create(pen=instance)
 
-    # Create a new CowPenHistory entry based on the CowPen and CowPenInventory data
-    CowPenHistory.objects.create(
+    # Record a CowPenHistory entry when the CowPen or CowPenInventory data changed
+    record_history(
+        CowPenHistory,
         pen=instance,
         barn=instance.barn,
         type=instance.type,
@@ -75,7 +62,8 @@ def update_cow_pen_inventory_and_barn_inventory(sender, instance, created, **kwa
                 old_barn_inventory = BarnInventory.objects.get(barn=instance.previous_pen.barn)
                 old_barn_inventory.remove_cow()
                 old_barn_inventory.refresh_from_db()
-                BarnInventoryHistory.objects.create(
+                record_history(
+                    BarnInventoryHistory,
                     barn_inventory=old_barn_inventory,
                     number_of_cows=old_barn_inventory.number_of_cows
                 )
@@ -88,7 +76,8 @@ def update_cow_pen_inventory_and_barn_inventory(sender, instance, created, **kwa
         new_barn_inventory: BarnInventory = BarnInventory.objects.get(barn=instance.new_pen.barn)
         new_barn_inventory.add_cow()
         new_barn_inventory.refresh_from_db()
-        BarnInventoryHistory.objects.create(
+        record_history(
+            BarnInventoryHistory,
             barn_inventory=new_barn_inventory,
             number_of_cows=new_barn_inventory.number_of_cows
         )
@@ -1,20 +1,22 @@
 from rest_framework import viewsets
 from rest_framework.exceptions import MethodNotAllowed
 
+from efarm.mixins import FarmScopeMixin, ReplicaReadMixin
+
 from .serializers import *
 
 
-class MilkInventoryViewSet(viewsets.ReadOnlyModelViewSet):
+class MilkInventoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = MilkInventory.objects.all()
     serializer_class = MilkInventorySerializer
 
 
-class MilkInventoryUpdateHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class MilkInventoryUpdateHistoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = MilkInventoryUpdateHistory.objects.all()
     serializer_class = MilkInventoryUpdateHistorySerializer
 
 
-class CowInventoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CowInventoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for the CowInventory model.
 
@@ -30,7 +32,7 @@ class CowInventoryViewSet(viewsets.ReadOnlyModelViewSet):
         raise MethodNotAllowed('GET')
 
 
-class CowInventoryUpdateHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CowInventoryUpdateHistoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for the CowInventoryUpdateHistory model.
 
@@ -44,7 +46,7 @@ class CowInventoryUpdateHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CowInventoryUpdateHistorySerializer
 
 
-class CowPenInventoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CowPenInventoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for the CowPenInventory model.
 
@@ -58,7 +60,7 @@ class CowPenInventoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CowPenInventorySerializer
 
 
-class CowPenHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CowPenHistoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for the CowPenHistory model.
 
@@ -72,7 +74,7 @@ class CowPenHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CowPenHistorySerializer
 
 
-class BarnInventoryViewSet(viewsets.ReadOnlyModelViewSet):
+class BarnInventoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for the BarnInventory model.
 
@@ -86,7 +88,7 @@ class BarnInventoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = BarnInventorySerializer
 
 
-class BarnInventoryHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class BarnInventoryHistoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for the BarnInventoryHistory model.
 
@@ -0,0 +1,106 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+DATABASE_ENGINES = {
+    # SQLite tuned for concurrent readers and writers, see efarm/backends/sqlite3/base.py
+    "sqlite": "efarm.backends.sqlite3",
+    "postgresql": "django.db.backends.postgresql",
+}
+
+# Seconds a PostgreSQL connection is kept open for reuse by the following requests
+DEFAULT_POSTGRESQL_CONN_MAX_AGE = 60
+
+
+def _flag(value):
+    return value.strip().lower() in ["true", "t", "1", "yes"]
+
+
+def database_settings(base_dir, environ=None):
+    """
+    Returns the default database settings described by the `EFARM_DB_*` environment variables.
+
+    Without any variable the project uses the `db.sqlite3` file in `base_dir`, so development
+    setups keep working unchanged.
+
+    Environment variables:
+    - `EFARM_DB_ENGINE`: `sqlite` (default) or `postgresql`.
+    - `EFARM_DB_NAME`: The path of the SQLite file, or the name of the PostgreSQL database (`efarm`).
+    - `EFARM_DB_USER`, `EFARM_DB_PASSWORD`: The PostgreSQL credentials.
+    - `EFARM_DB_HOST`, `EFARM_DB_PORT`: The PostgreSQL server, `localhost:5432` by default.
+    - `EFARM_DB_CONN_MAX_AGE`: Seconds connections are reused for, 0 closing them after each
+      request. Defaults to 60 on PostgreSQL, where opening a connection forks a server process.
+    - `EFARM_DB_TRANSACTION_POOLING`: Set when PostgreSQL is reached through a transaction
+      pooler such as PgBouncer, which cannot keep server-side cursors open across transactions.
+
+    """
+    environ = os.environ if environ is None else environ
+    engine = environ.get("EFARM_DB_ENGINE", "sqlite").strip().lower()
+    if engine not in DATABASE_ENGINES:
+        raise ImproperlyConfigured(
+            f"EFARM_DB_ENGINE must be one of {', '.join(DATABASE_ENGINES)}, not '{engine}'."
+        )
+
+    try:
+        conn_max_age = int(
+            environ.get(
+                "EFARM_DB_CONN_MAX_AGE",
+                DEFAULT_POSTGRESQL_CONN_MAX_AGE if engine == "postgresql" else 0,
+            )
+        )
+    except ValueError:
+        raise ImproperlyConfigured("EFARM_DB_CONN_MAX_AGE must be a number of seconds.")
+
+    if engine == "sqlite":
+        return {
+            "ENGINE": DATABASE_ENGINES[engine],
+            "NAME": environ.get("EFARM_DB_NAME") or base_dir / "db.sqlite3",
+            "CONN_MAX_AGE": conn_max_age,
+        }
+
+    return {
+        "ENGINE": DATABASE_ENGINES[engine],
+        "NAME": environ.get("EFARM_DB_NAME", "efarm"),
+        "USER": environ.get("EFARM_DB_USER", ""),
+        "PASSWORD": environ.get("EFARM_DB_PASSWORD", ""),
+        "HOST": environ.get("EFARM_DB_HOST", "localhost"),
+        "PORT": environ.get("EFARM_DB_PORT", "5432"),
+        "CONN_MAX_AGE": conn_max_age,
+        # Persistent connections dropped by the server are replaced instead of failing a request
+        "CONN_HEALTH_CHECKS": conn_max_age != 0,
+        "DISABLE_SERVER_SIDE_CURSORS": _flag(environ.get("EFARM_DB_TRANSACTION_POOLING", "")),
+        "OPTIONS": {"connect_timeout": 10},
+    }
+
+
+def replica_database_settings(default_settings, environ=None):
+    """
+    Returns the settings of the read replica of the default database described by the
+    `EFARM_DB_REPLICA_*` environment variables, or None when no replica is configured.
+
+    The replica shares the settings of the default database, overridden by `EFARM_DB_REPLICA_NAME`,
+    `EFARM_DB_REPLICA_HOST`, `EFARM_DB_REPLICA_PORT`, `EFARM_DB_REPLICA_USER` and
+    `EFARM_DB_REPLICA_PASSWORD`. Setting the name or the host configures it, for example a second
+    SQLite file or a second local PostgreSQL database. The test database mirrors the default one.
+
+    """
+    environ = os.environ if environ is None else environ
+    if not (environ.get("EFARM_DB_REPLICA_NAME") or environ.get("EFARM_DB_REPLICA_HOST")):
+        return None
+
+    replica_settings = dict(default_settings, TEST={"MIRROR": "default"})
+    for key in ["NAME", "HOST", "PORT", "USER", "PASSWORD"]:
+        if environ.get(f"EFARM_DB_REPLICA_{key}"):
+            replica_settings[key] = environ[f"EFARM_DB_REPLICA_{key}"]
+    return replica_settings
+
+
+def databases(base_dir, environ=None):
+    """
+    Returns the `DATABASES` setting, the default database and its read replica if configured.
+    """
+    default_settings = database_settings(base_dir, environ)
+    replica_settings = replica_database_settings(default_settings, environ)
+    if replica_settings is None:
+        return {"default": default_settings}
+    return {"default": default_settings, "replica": replica_settings}
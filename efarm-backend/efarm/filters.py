@@ -0,0 +1,205 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+
+from efarm.lookups import Prefix
+
+
+def range_boundary(model, field_name, day):
+    """
+    Returns the value a range over `field_name` starts at on `day`, midnight in the current time
+    zone for datetime fields.
+    """
+    if isinstance(model._meta.get_field(field_name), models.DateTimeField):
+        return timezone.make_aware(datetime.combine(day, time.min))
+    return day
+
+
+def _intersect(ranges, other_ranges):
+    intersection = []
+    for start, end in ranges:
+        for other_start, other_end in other_ranges:
+            if max(start, other_start) < min(end, other_end):
+                intersection.append((max(start, other_start), min(end, other_end)))
+    return intersection
+
+
+def _next_month(year, month):
+    return date(year + month // 12, month % 12 + 1, 1)
+
+
+def date_part_ranges(year, month=None, week=None, day=None):
+    """
+    Returns the half-open (start, end) date ranges holding the dates of `year` matching the
+    month, ISO week number and day of the month given, as the `__month`, `__week` and `__day`
+    lookups would.
+    """
+    try:
+        ranges = [(date(year, 1, 1), date(year + 1, 1, 1))]
+        if month is not None:
+            ranges = _intersect(ranges, [(date(year, month, 1), _next_month(year, month))])
+    except (ValueError, OverflowError):
+        return []
+
+    if day is not None:
+        days = []
+        for month_of_year in range(1, 13):
+            try:
+                start = date(year, month_of_year, day)
+            except ValueError:
+                continue
+            days.append((start, start + timedelta(days=1)))
+        ranges = _intersect(ranges, days)
+
+    if week is not None:
+        # The first and last days of a year may belong to a week of the previous or next ISO year
+        weeks = []
+        for iso_year in (year - 1, year, year + 1):
+            try:
+                start = date.fromisocalendar(iso_year, week, 1)
+                weeks.append((start, start + timedelta(days=7)))
+            except (ValueError, OverflowError):
+                continue
+        ranges = _intersect(ranges, weeks)
+    return ranges
+
+
+def _integer(value):
+    if value in EMPTY_VALUES:
+        return None
+    if value != int(value):
+        raise ValueError(f"{value} is not an integer.")
+    return int(value)
+
+
+class DateRangeFilterSet(filters.FilterSet):
+    """
+    FilterSet translating the year, month, week and day filters of a date into equivalent
+    half-open date ranges whenever a year is given.
+
+    Filtering on `__month`, `__week` or `__day` extracts the part from every row, so the database
+    cannot use an index on the date. Combined with a year they select a handful of contiguous
+    ranges instead, which are filtered with `>=` and `<` and scanned through the index. Parts given
+    without a year still use the extracting lookups.
+
+    Attributes:
+    - `date_part_filters` (dict): The filter names of the `year`, `month`, `week` and `day` parts,
+      by date field name.
+
+    """
+
+    date_part_filters = {}
+
+    def _date_ranges(self, parts):
+        try:
+            values = {part: _integer(self.form.cleaned_data.get(name)) for part, name in parts.items()}
+            return date_part_ranges(**values)
+        except (ValueError, OverflowError):
+            return []
+
+    def filter_queryset(self, queryset):
+        translated_filters = set()
+        for field_name, parts in self.date_part_filters.items():
+            if self.form.cleaned_data.get(parts["year"]) in EMPTY_VALUES:
+                continue
+            translated_filters.update(parts.values())
+            ranges = self._date_ranges(parts)
+            if not ranges:
+                return queryset.none()
+            query = Q()
+            for start, end in ranges:
+                query |= Q(
+                    **{
+                        f"{field_name}__gte": range_boundary(queryset.model, field_name, start),
+                        f"{field_name}__lt": range_boundary(queryset.model, field_name, end),
+                    }
+                )
+            queryset = queryset.filter(query)
+
+        for name, value in self.form.cleaned_data.items():
+            if name in translated_filters:
+                continue
+            queryset = self.filters[name].filter(queryset, value)
+        return queryset
+
+
+class DateFromFilter(filters.DateFilter):
+    """
+    Keeps the records dated on or after the date given.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        start = range_boundary(qs.model, self.field_name, value)
+        return self.get_method(qs)(**{f"{self.field_name}__gte": start})
+
+
+class DateToFilter(filters.DateFilter):
+    """
+    Keeps the records dated on or before the date given, filtering datetimes before the
+    following midnight.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES or value == date.max:
+            return qs
+        end = range_boundary(qs.model, self.field_name, value + timedelta(days=1))
+        return self.get_method(qs)(**{f"{self.field_name}__lt": end})
+
+
+class NormalizedFilter(filters.CharFilter):
+    """
+    Keeps the records whose field contains the value given, turned by `normalize` into the form
+    the field is stored in, such as `normalize_text` for the normalized columns of names.
+
+    The fields are stored case folded, so the case-sensitive `contains` lookup ignores case
+    without wrapping the column in `UPPER()`, and PostgreSQL answers it with the trigram index of
+    the column.
+    """
+
+    def __init__(self, *args, normalize=None, **kwargs):
+        kwargs.setdefault("lookup_expr", "contains")
+        super().__init__(*args, **kwargs)
+        self.normalize = normalize
+
+    def filter(self, qs, value):
+        if value not in EMPTY_VALUES and self.normalize is not None:
+            value = self.normalize(value)
+        return super().filter(qs, value)
+
+
+class PrefixFilter(NormalizedFilter):
+    """
+    Keeps the records whose field starts with the value given, through the `prefix` lookup so
+    the filter is answered by a B-tree index of the field.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("lookup_expr", Prefix.lookup_name)
+        super().__init__(*args, **kwargs)
+
+
+class ChoiceContainsFilter(filters.CharFilter):
+    """
+    Keeps the records whose choice field holds one of the choices containing the value given,
+    ignoring case.
+
+    The matching choices are found in the choices of the field rather than in the table, so the
+    records are filtered with `IN` on the stored values, which an index of the field answers.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        field = qs.model._meta.get_field(self.field_name)
+        values = [
+            choice for choice, _ in field.flatchoices if value.casefold() in str(choice).casefold()
+        ]
+        if not values:
+            return qs.none()
+        return self.get_method(qs)(**{f"{self.field_name}__in": values})
@@ -0,0 +1,138 @@
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+# Days of inventory history kept at full resolution by `compact_history` unless
+# `INVENTORY_HISTORY_FULL_RESOLUTION_DAYS` is set, older history is downsampled to the last
+# snapshot of each day
+DEFAULT_FULL_RESOLUTION_DAYS = 90
+
+DELETE_BATCH_SIZE = 1000
+
+HistoryTable = namedtuple(
+    "HistoryTable", ["model", "series_fields", "snapshot_fields", "timestamp_field"]
+)
+
+_history_tables = {}
+
+
+def register_history(model, series_fields, snapshot_fields, timestamp_field):
+    """
+    Registers a history table, a model storing snapshots of an inventory.
+
+    - `series_fields`: The fields identifying the inventory a snapshot belongs to, such as the pen
+      of a pen history. Empty when the table holds the history of a single inventory.
+    - `snapshot_fields`: The fields compared to tell whether the inventory changed.
+    - `timestamp_field`: The date or date and time field ordering the snapshots.
+
+    """
+    _history_tables[model] = HistoryTable(model, series_fields, snapshot_fields, timestamp_field)
+
+
+def history_tables():
+    return list(_history_tables.values())
+
+
+def _comparable(field, value):
+    if field.is_relation:
+        return value.pk if isinstance(value, models.Model) else value
+    return field.to_python(value)
+
+
+def record_history(model, **values):
+    """
+    Creates a snapshot in the registered history table `model`, unless the latest snapshot of the
+    same inventory holds the same values, returning the snapshot created or None.
+    """
+    table = _history_tables[model]
+    latest = (
+        model.objects.filter(**{name: values[name] for name in table.series_fields})
+        .order_by(f"-{table.timestamp_field}", "-pk")
+        .first()
+    )
+    if latest is not None and all(
+        getattr(latest, model._meta.get_field(name).attname)
+        == _comparable(model._meta.get_field(name), values[name])
+        for name in table.snapshot_fields
+    ):
+        return None
+    return model.objects.create(**values)
+
+
+def _day(value):
+    if isinstance(value, datetime):
+        return timezone.localdate(value)
+    return value
+
+
+def compact_history(model, full_resolution_days=None):
+    """
+    Compacts the registered history table `model`, returning the number of snapshots deleted.
+
+    Snapshots older than `full_resolution_days` are downsampled to the last snapshot of each day,
+    then every snapshot holding the same values as the previous snapshot of its inventory is
+    deleted, so only the snapshots where an inventory changed remain.
+    """
+    table = _history_tables[model]
+    if full_resolution_days is None:
+        full_resolution_days = getattr(
+            settings, "INVENTORY_HISTORY_FULL_RESOLUTION_DAYS", DEFAULT_FULL_RESOLUTION_DAYS
+        )
+    cutoff = timezone.localdate() - timedelta(days=full_resolution_days)
+    if isinstance(model._meta.get_field(table.timestamp_field), models.DateTimeField):
+        cutoff = timezone.make_aware(datetime.combine(cutoff, time.min))
+
+    number_of_series_fields = len(table.series_fields)
+    rows = (
+        model.objects.order_by(*table.series_fields, table.timestamp_field, "pk")
+        .values_list(
+            "pk",
+            *[model._meta.get_field(name).attname for name in table.series_fields],
+            *[model._meta.get_field(name).attname for name in table.snapshot_fields],
+            table.timestamp_field,
+        )
+        .iterator()
+    )
+
+    deleted_ids = []
+    series = previous_snapshot = pending = None
+
+    def keep(row):
+        # Deletes the snapshot when it repeats the previous snapshot of the inventory
+        nonlocal previous_snapshot
+        snapshot = row[1 + number_of_series_fields : -1]
+        if snapshot == previous_snapshot:
+            deleted_ids.append(row[0])
+        else:
+            previous_snapshot = snapshot
+
+    for row in rows:
+        row_series = row[1 : 1 + number_of_series_fields]
+        if row_series != series:
+            if pending:
+                keep(pending)
+            series, previous_snapshot, pending = row_series, None, None
+
+        if row[-1] < cutoff:
+            # Old snapshots are kept for the last one of their day
+            if pending and _day(pending[-1]) == _day(row[-1]):
+                deleted_ids.append(pending[0])
+            elif pending:
+                keep(pending)
+            pending = row
+            continue
+
+        if pending:
+            keep(pending)
+            pending = None
+        keep(row)
+    if pending:
+        keep(pending)
+
+    with transaction.atomic():
+        for start in range(0, len(deleted_ids), DELETE_BATCH_SIZE):
+            model.objects.filter(pk__in=deleted_ids[start : start + DELETE_BATCH_SIZE]).delete()
+    return len(deleted_ids)
@@ -0,0 +1,41 @@
+import re
+import unicodedata
+
+from django.db import models
+from django.db.models.lookups import StartsWith
+
+# Greatest code point, bounding the values starting with a prefix in `Prefix.as_sqlite`
+_MAX_CHARACTER = "\U0010ffff"
+
+
+def normalize_text(value):
+    """
+    Returns `value` as stored in the searchable columns of names, without accents, case folded
+    and with its whitespace collapsed, so "  José " and "jose" are stored alike.
+    """
+    if value is None:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(character for character in decomposed if not unicodedata.combining(character))
+    return re.sub(r"\s+", " ", stripped.casefold()).strip()
+
+
+@models.CharField.register_lookup
+class Prefix(StartsWith):
+    """
+    Case-sensitive `startswith` lookup answered by a B-tree index of the column.
+
+    PostgreSQL uses the `varchar_pattern_ops` index Django creates next to the index of a
+    `CharField` for `LIKE 'prefix%'`. SQLite only uses an index for `LIKE` when it is case
+    sensitive, so the prefix is compared as the range of the values between the prefix and the
+    prefix followed by the greatest character instead.
+    """
+
+    lookup_name = "prefix"
+
+    def as_sqlite(self, compiler, connection):
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        return (
+            f"({lhs_sql} >= %s AND {lhs_sql} < %s)",
+            [*lhs_params, self.rhs, *lhs_params, self.rhs + _MAX_CHARACTER],
+        )
@@ -0,0 +1,49 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from efarm.history import compact_history, history_tables
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the inventory history snapshots repeating the previous snapshot of their "
+        "inventory, and downsamples the history older than the full resolution period to one "
+        "snapshot a day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full-resolution-days",
+            type=int,
+            help="Days of history kept at full resolution, "
+            "INVENTORY_HISTORY_FULL_RESOLUTION_DAYS by default.",
+        )
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            help="Only compact this history table, as app_label.ModelName, may be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        full_resolution_days = options["full_resolution_days"]
+        if full_resolution_days is not None and full_resolution_days < 0:
+            raise CommandError("The full resolution period must be a positive number of days.")
+
+        models = [table.model for table in history_tables()]
+        if options["models"]:
+            try:
+                selected_models = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as error:
+                raise CommandError(error)
+            unregistered = [model._meta.label for model in selected_models if model not in models]
+            if unregistered:
+                raise CommandError(f"Not an inventory history table: {', '.join(unregistered)}.")
+            models = selected_models
+
+        for model in models:
+            number_of_snapshots = compact_history(model, full_resolution_days)
+            self.stdout.write(
+                f"Deleted {number_of_snapshots} snapshot(s) of {model._meta.label}."
+            )
+        self.stdout.write(self.style.SUCCESS("Compacted the inventory history."))
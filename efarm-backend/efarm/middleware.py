@@ -0,0 +1,27 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from efarm.routers import pin_to_primary
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins the reads of a user to the primary database after a successful write, so the replica
+    never serves them data older than their own changes.
+
+    The user is read after the response, once Django REST framework authenticated the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            pin_to_primary(user)
+        return response
@@ -0,0 +1,77 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from efarm.routers import (
+    REPLICA_DATABASE,
+    is_pinned_to_primary,
+    replica_available,
+    reset_read_database,
+    set_read_database,
+)
+from efarm.tenancy import (
+    UNSCOPED,
+    FarmScopedManager,
+    current_farm,
+    reset_current_farm,
+    set_current_farm,
+)
+
+
+class ReplicaReadMixin:
+    """
+    Routes the reads of the safe requests of a view to the replica database.
+
+    Requests are authenticated and authorized against the primary database first. Reads fall
+    back to the primary database when no replica is configured, when it is unavailable, or when
+    the user wrote recently and is pinned to the primary database by
+    `efarm.middleware.ReadYourWritesMiddleware`.
+    """
+
+    _read_database_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and not is_pinned_to_primary(request.user)
+            and replica_available()
+        ):
+            self._read_database_token = set_read_database(REPLICA_DATABASE)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._read_database_token is not None:
+            reset_read_database(self._read_database_token)
+            self._read_database_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class FarmScopeMixin:
+    """
+    Scopes the queries of a view to the farm of the authenticated user.
+
+    Within the request, the managers of the models belonging to a farm only return the records of
+    the farm and new records are assigned to it (see `efarm.tenancy`). Users without a farm work
+    on the records without a farm, those of a deployment hosting a single farm.
+
+    The `queryset` of the generic views is built when the view is declared, outside any request,
+    so `get_queryset()` scopes it to the farm too.
+    """
+
+    _current_farm_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._current_farm_token = set_current_farm(getattr(request.user, "farm_id", None))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        manager = queryset.model._default_manager
+        farm_id = current_farm()
+        if isinstance(manager, FarmScopedManager) and farm_id is not UNSCOPED:
+            queryset = queryset.filter(**{manager.farm_field: farm_id})
+        return queryset
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._current_farm_token is not None:
+            reset_current_farm(self._current_farm_token)
+            self._current_farm_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,105 @@
+import logging
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DATABASE = "replica"
+
+# Seconds reads of a user stay on the primary database after a write, so the user reads their
+# own writes while the replica catches up
+DEFAULT_REPLICA_STICKINESS_SECONDS = 10
+
+# Seconds reads stay on the primary database after the replica refused a connection, so the
+# requests do not each wait for the connection timeout while it is down
+DEFAULT_REPLICA_RETRY_SECONDS = 30
+
+_UNAVAILABLE_CACHE_KEY = "replica-router:replica-unavailable"
+
+# Database the reads of the current request are routed to, set by `ReplicaReadMixin`
+_read_database = ContextVar("read_database", default=None)
+
+
+def _pin_cache_key(user):
+    return f"replica-router:pinned-to-primary:{user.pk}"
+
+
+def pin_to_primary(user):
+    """
+    Routes the reads of the user to the primary database for the stickiness period.
+
+    The pin is kept in the default cache, which must be shared by the server processes, such as
+    Redis or Memcached, for a pin set by one process to be seen by the others.
+    """
+    cache.set(
+        _pin_cache_key(user),
+        True,
+        timeout=getattr(settings, "REPLICA_STICKINESS_SECONDS", DEFAULT_REPLICA_STICKINESS_SECONDS),
+    )
+
+
+def is_pinned_to_primary(user):
+    return bool(user and user.is_authenticated and cache.get(_pin_cache_key(user)))
+
+
+def replica_available():
+    """
+    Returns whether the replica is configured and accepts connections, logging when it does not
+    so reads fall back to the primary database.
+
+    A refused connection is remembered in the default cache for the retry period, during which
+    reads go to the primary database without trying the replica again.
+    """
+    if REPLICA_DATABASE not in connections or cache.get(_UNAVAILABLE_CACHE_KEY):
+        return False
+    try:
+        connections[REPLICA_DATABASE].ensure_connection()
+    except DatabaseError:
+        logger.warning("The replica database is unavailable, reading from the primary database.")
+        cache.set(
+            _UNAVAILABLE_CACHE_KEY,
+            True,
+            timeout=getattr(settings, "REPLICA_RETRY_SECONDS", DEFAULT_REPLICA_RETRY_SECONDS),
+        )
+        return False
+    return True
+
+
+def set_read_database(alias):
+    """
+    Routes the reads of the current context to `alias`, returning the token resetting it.
+    """
+    return _read_database.set(alias)
+
+
+def reset_read_database(token):
+    _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Routes the reads of read-only endpoints to the replica database and everything else to the
+    primary database.
+
+    Reads only go to the replica when `ReplicaReadMixin` marked the current request as
+    read-only, so the writes of a request and the reads validating them always hit the same
+    database. Migrations are allowed everywhere, a physical replica receives the schema
+    through replication while a local replica database can be migrated with
+    `migrate --database replica`.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds a copy of the primary database
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DATABASE}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
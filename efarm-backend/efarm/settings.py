@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 from pathlib import Path
 
+from efarm.database import databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -50,6 +52,8 @@ INSTALLED_APPS = [
     "poultry",
     "poultry_inventory",
     "users",
+    # Management commands shared by the apps, such as compact_inventory_history
+    "efarm",
 ]
 
 AUTH_USER_MODEL = "users.CustomUser"
@@ -64,6 +68,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "efarm.middleware.ReadYourWritesMiddleware",
 ]
 
 ROOT_URLCONF = "efarm.urls"
@@ -90,13 +95,24 @@ USERNAME_FIELD = "username"
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+# Configured with the EFARM_DB_* environment variables, see efarm/database.py
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+DATABASES = databases(BASE_DIR)
+
+# Read-only endpoints read from the replica, see efarm/routers.py
+DATABASE_ROUTERS = ["efarm.routers.ReplicaRouter"]
+
+# Seconds reads of a user stay on the primary database after they wrote
+REPLICA_STICKINESS_SECONDS = 10
+
+# Seconds reads stay on the primary database after the replica could not be reached
+REPLICA_RETRY_SECONDS = 30
+
+# Days after which the milk of a closed lactation is moved to the archive, see dairy/archiving.py
+MILK_ARCHIVE_HORIZON_DAYS = 365
+
+# Days of inventory history kept at full resolution, see efarm/history.py
+INVENTORY_HISTORY_FULL_RESOLUTION_DAYS = 90
 
 
 # REST FRAMEWORK
@@ -0,0 +1,75 @@
+from contextvars import ContextVar
+
+from django.db import models
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+# Value of `_current_farm` outside the views scoped by `FarmScopeMixin`, such as in management
+# commands, the admin and the shell, where every farm is visible
+UNSCOPED = object()
+
+# Id of the farm the queries of the current request are scoped to, None for the records of a
+# deployment hosting a single farm, which have no farm
+_current_farm = ContextVar("current_farm", default=UNSCOPED)
+
+
+def current_farm():
+    return _current_farm.get()
+
+
+def set_current_farm(farm_id):
+    """
+    Scopes the queries of the current context to the farm `farm_id`, returning the token resetting
+    it.
+    """
+    return _current_farm.set(farm_id)
+
+
+def reset_current_farm(token):
+    _current_farm.reset(token)
+
+
+class FarmScopedManager(models.Manager):
+    """
+    Manager of the models belonging to a farm, returning the records of the current farm only.
+
+    `farm_field` is the lookup from the model to its farm, `farm` for the models holding the farm
+    key and a path such as `cow__farm` for the records of a cow. Outside the scoped views every
+    record is returned, `all_farms()` returns them all within the scoped views too.
+
+    Relation fields of serializers must be given the manager rather than a queryset, such as
+    `queryset=Cow.objects`, for their choices to be scoped to the farm of each request.
+    """
+
+    def __init__(self, farm_field="farm"):
+        super().__init__()
+        self.farm_field = farm_field
+
+    def all_farms(self):
+        return super().get_queryset()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        farm_id = current_farm()
+        if farm_id is UNSCOPED:
+            return queryset
+        # Related managers are subclasses built without the arguments of the default manager
+        farm_field = self.model._default_manager.farm_field
+        return queryset.filter(**{farm_field: farm_id})
+
+
+@receiver(pre_save)
+def assign_current_farm(sender, instance, raw=False, **kwargs):
+    """
+    Assigns the records created within a scoped view to the farm of the request.
+    """
+    farm_id = current_farm()
+    if raw or farm_id is UNSCOPED or farm_id is None:
+        return
+    manager = sender._default_manager
+    if (
+        isinstance(manager, FarmScopedManager)
+        and manager.farm_field == "farm"
+        and instance.farm_id is None
+    ):
+        instance.farm_id = farm_id
@@ -0,0 +1,277 @@
+from collections import OrderedDict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import DateField, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from poultry.choices import ChickenTypeChoices
+from poultry.models import EggCollection, Flock, FlockBreedInformation, FlockInspectionRecord, FlockMortalityCurve
+
+
+def percentage(numerator, denominator):
+    """
+    Returns `numerator` as a percentage of `denominator`, rounded to two decimal places.
+    """
+    if not denominator:
+        return Decimal("0.00")
+    return (Decimal(numerator) * 100 / Decimal(denominator)).quantize(Decimal("0.00"))
+
+
+def ratio(numerator, denominator):
+    """
+    Returns `numerator` divided by `denominator`, rounded to three decimal places.
+    """
+    if not denominator:
+        return Decimal("0.000")
+    return (Decimal(numerator) / Decimal(denominator)).quantize(Decimal("0.000"))
+
+
+class EggProductionAnalytics:
+    """
+    Computes egg production indicators for one or many flocks.
+
+    Daily egg totals are aggregated in SQL and joined against the bird count recorded in
+    `FlockInventoryHistory` on (or most recently before) each collection date, so a whole
+    laying cycle for dozens of flocks is served by a single query.
+
+    Methods:
+    - `daily_production(flock_ids, start_date, end_date)`: Returns per flock, per day production rows.
+    - `weekly_production(flock_ids, start_date, end_date)`: Rolls the daily rows up into ISO weeks.
+    - `production_time_series(flock_ids, period, start_date, end_date)`: Dispatches to the daily or weekly series.
+
+    Each row contains:
+    - `flock`: The id of the flock.
+    - `date` / `week_start`: The day, or the Monday of the week, the row covers.
+    - `collected_eggs`: The number of eggs collected.
+    - `broken_eggs`: The number of broken eggs.
+    - `hen_days`: The number of live birds summed over the days covered.
+    - `hen_day_production`: Eggs collected per live bird per day, as a percentage.
+    - `broken_egg_ratio`: Broken eggs as a percentage of the collected eggs.
+    - `eggs_per_hen_housed`: Eggs collected per bird initially housed in the flock, per day.
+
+    """
+
+    DAY = "day"
+    WEEK = "week"
+    PERIODS = [DAY, WEEK]
+
+    @staticmethod
+    def _daily_totals(flock_ids=None, start_date=None, end_date=None):
+        from poultry_inventory.models import FlockInventoryHistory
+
+        birds_on_date = (
+            FlockInventoryHistory.objects.filter(
+                flock_inventory__flock=OuterRef("flock"), date__lte=OuterRef("date")
+            )
+            .order_by("-date", "-id")
+            .values("number_of_birds")[:1]
+        )
+
+        queryset = EggCollection.objects.all()
+        if flock_ids:
+            queryset = queryset.filter(flock__in=flock_ids)
+        if start_date:
+            queryset = queryset.filter(date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+
+        return (
+            queryset.values("flock", "date", "flock__initial_number_of_birds")
+            .annotate(
+                collected_eggs=Sum("collected_eggs"),
+                broken_eggs=Sum("broken_eggs"),
+                number_of_birds=Subquery(birds_on_date),
+            )
+            .order_by("flock", "date")
+        )
+
+    @staticmethod
+    def _build_row(row, collected_eggs, broken_eggs, hen_days, housed_days):
+        row.update(
+            {
+                "collected_eggs": collected_eggs,
+                "broken_eggs": broken_eggs,
+                "hen_days": hen_days,
+                "hen_day_production": percentage(collected_eggs, hen_days),
+                "broken_egg_ratio": percentage(broken_eggs, collected_eggs),
+                "eggs_per_hen_housed": ratio(collected_eggs, housed_days),
+            }
+        )
+        return row
+
+    @classmethod
+    def daily_production(cls, flock_ids=None, start_date=None, end_date=None):
+        return [
+            cls._build_row(
+                {"flock": total["flock"], "date": total["date"]},
+                total["collected_eggs"],
+                total["broken_eggs"],
+                total["number_of_birds"] or 0,
+                total["flock__initial_number_of_birds"],
+            )
+            for total in cls._daily_totals(flock_ids, start_date, end_date)
+        ]
+
+    @classmethod
+    def weekly_production(cls, flock_ids=None, start_date=None, end_date=None):
+        weeks = OrderedDict()
+        for total in cls._daily_totals(flock_ids, start_date, end_date):
+            week_start = total["date"] - timedelta(days=total["date"].weekday())
+            week = weeks.setdefault(
+                (total["flock"], week_start),
+                {"collected_eggs": 0, "broken_eggs": 0, "hen_days": 0, "housed_days": 0},
+            )
+            week["collected_eggs"] += total["collected_eggs"]
+            week["broken_eggs"] += total["broken_eggs"]
+            week["hen_days"] += total["number_of_birds"] or 0
+            week["housed_days"] += total["flock__initial_number_of_birds"]
+
+        return [
+            cls._build_row(
+                {"flock": flock_id, "week_start": week_start},
+                week["collected_eggs"],
+                week["broken_eggs"],
+                week["hen_days"],
+                week["housed_days"],
+            )
+            for (flock_id, week_start), week in weeks.items()
+        ]
+
+    @classmethod
+    def production_time_series(cls, flock_ids=None, period=DAY, start_date=None, end_date=None):
+        if period == cls.WEEK:
+            return cls.weekly_production(flock_ids, start_date, end_date)
+        return cls.daily_production(flock_ids, start_date, end_date)
+
+
+class FlockMortalityAnalytics:
+    """
+    Builds weekly and cumulative mortality curves per flock and benchmarks them against the
+    expected mortality of the breed and chicken type recorded in `FlockBreedInformation`.
+
+    Dead birds are summed per flock and week from `FlockInspectionRecord` in one grouped query,
+    and the resulting curves are stored in `FlockMortalityCurve` so readers never aggregate inspections.
+
+    Methods:
+    - `expected_weekly_mortality_rates()`: Returns the expected weekly mortality rate per (breed, chicken type).
+    - `build_mortality_curves(threshold)`: Computes unsaved `FlockMortalityCurve` instances for every flock.
+    - `refresh_mortality_curves(threshold)`: Computes and upserts the curves, returning the number of flocks.
+
+    """
+
+    DEFAULT_DEVIATION_THRESHOLD = Decimal("2.00")
+
+    # Expected percentage of birds lost per week when the breed information does not provide one
+    DEFAULT_WEEKLY_MORTALITY_RATES = {
+        ChickenTypeChoices.BROILER: Decimal("0.70"),
+        ChickenTypeChoices.LAYERS: Decimal("0.10"),
+        ChickenTypeChoices.MULTI_PURPOSE: Decimal("0.15"),
+    }
+
+    @staticmethod
+    def expected_weekly_mortality_rates():
+        rates = {}
+        # Ordered so the most recently added information for a breed and chicken type wins
+        breed_information = FlockBreedInformation.objects.filter(
+            expected_weekly_mortality_rate__isnull=False
+        ).order_by("date_added", "id")
+        for information in breed_information.values(
+            "breed", "chicken_type", "expected_weekly_mortality_rate"
+        ):
+            key = (information["breed"], information["chicken_type"])
+            rates[key] = information["expected_weekly_mortality_rate"]
+        return rates
+
+    @staticmethod
+    def _weekly_dead_birds():
+        weekly_dead_birds = {}
+        records = (
+            FlockInspectionRecord.objects.annotate(
+                week_start=TruncWeek("date_of_inspection", output_field=DateField())
+            )
+            .values("flock", "week_start")
+            .annotate(dead_birds=Sum("number_of_dead_birds"))
+            .order_by("flock", "week_start")
+        )
+        for record in records:
+            weekly_dead_birds.setdefault(record["flock"], []).append(
+                (record["week_start"], record["dead_birds"])
+            )
+        return weekly_dead_birds
+
+    @classmethod
+    def build_mortality_curves(cls, threshold=DEFAULT_DEVIATION_THRESHOLD):
+        expected_rates = cls.expected_weekly_mortality_rates()
+        weekly_dead_birds = cls._weekly_dead_birds()
+        computed_at = timezone.now()
+        today = timezone.localdate()
+        curves = []
+
+        flocks = Flock.objects.values(
+            "id", "breed", "chicken_type", "date_of_hatching", "date_established", "initial_number_of_birds"
+        )
+        for flock in flocks:
+            expected_weekly_rate = expected_rates.get(
+                (flock["breed"], flock["chicken_type"]),
+                cls.DEFAULT_WEEKLY_MORTALITY_RATES.get(flock["chicken_type"], Decimal("0.00")),
+            )
+            initial_number_of_birds = flock["initial_number_of_birds"]
+
+            weekly_mortality = []
+            cumulative_dead_birds = 0
+            for week_start, dead_birds in weekly_dead_birds.get(flock["id"], []):
+                birds_at_start_of_week = initial_number_of_birds - cumulative_dead_birds
+                cumulative_dead_birds += dead_birds
+                weeks_in_farm = max((week_start - flock["date_established"]).days // 7, 0) + 1
+                weekly_mortality.append(
+                    {
+                        "week_start": week_start.isoformat(),
+                        "age_in_weeks": (week_start - flock["date_of_hatching"]).days // 7,
+                        "dead_birds": dead_birds,
+                        "weekly_mortality_rate": str(percentage(dead_birds, birds_at_start_of_week)),
+                        "cumulative_mortality_rate": str(
+                            percentage(cumulative_dead_birds, initial_number_of_birds)
+                        ),
+                        "expected_cumulative_mortality_rate": str(
+                            min(expected_weekly_rate * weeks_in_farm, Decimal("100.00"))
+                        ),
+                    }
+                )
+
+            weeks_in_farm = max((today - flock["date_established"]).days // 7, 0) + 1
+            cumulative_mortality_rate = percentage(cumulative_dead_birds, initial_number_of_birds)
+            expected_mortality_rate = min(expected_weekly_rate * weeks_in_farm, Decimal("100.00"))
+            deviation = cumulative_mortality_rate - expected_mortality_rate
+
+            curves.append(
+                FlockMortalityCurve(
+                    flock_id=flock["id"],
+                    weekly_mortality=weekly_mortality,
+                    cumulative_mortality_rate=cumulative_mortality_rate,
+                    expected_mortality_rate=expected_mortality_rate,
+                    deviation=deviation,
+                    is_deviating=deviation > threshold,
+                    computed_at=computed_at,
+                )
+            )
+        return curves
+
+    @classmethod
+    def refresh_mortality_curves(cls, threshold=DEFAULT_DEVIATION_THRESHOLD):
+        curves = cls.build_mortality_curves(threshold)
+        FlockMortalityCurve.objects.bulk_create(
+            curves,
+            update_conflicts=True,
+            unique_fields=["flock"],
+            update_fields=[
+                "weekly_mortality",
+                "cumulative_mortality_rate",
+                "expected_mortality_rate",
+                "deviation",
+                "is_deviating",
+                "computed_at",
+            ],
+        )
+        return len(curves)
@@ -1,5 +1,6 @@
 from django_filters import rest_framework as filters
 
+from efarm.filters import DateFromFilter, DateRangeFilterSet, DateToFilter
 from poultry.models import *
 
 
@@ -37,7 +38,7 @@ class HousingStructureFilterSet(filters.FilterSet):
         fields = ["housing_type", "category"]
 
 
-class FlockFilterSet(filters.FilterSet):
+class FlockFilterSet(DateRangeFilterSet):
     source = filters.CharFilter(lookup_expr="icontains")
     breed = filters.CharFilter(lookup_expr="icontains")
     chicken_type = filters.CharFilter(lookup_expr="icontains")
@@ -45,6 +46,8 @@ class FlockFilterSet(filters.FilterSet):
     date_established = filters.DateFilter(
         field_name="date_established", lookup_expr="exact"
     )
+    date_established_from = DateFromFilter(field_name="date_established")
+    date_established_to = DateToFilter(field_name="date_established")
     year_established = filters.NumberFilter(
         field_name="date_established__year", lookup_expr="exact"
     )
@@ -58,6 +61,15 @@ class FlockFilterSet(filters.FilterSet):
         field_name="date_established__day", lookup_expr="exact"
     )
 
+    date_part_filters = {
+        "date_established": {
+            "year": "year_established",
+            "month": "month_established",
+            "week": "week_established",
+            "day": "day_established",
+        }
+    }
+
     class Meta:
         model = Flock
         fields = [
@@ -65,6 +77,8 @@ class FlockFilterSet(filters.FilterSet):
             "breed",
             "chicken_type",
             "date_established",
+            "date_established_from",
+            "date_established_to",
             "is_present",
             "year_established",
             "month_established",
@@ -76,13 +90,15 @@ class FlockFilterSet(filters.FilterSet):
 class FlockHistoryFilterSet(filters.FilterSet):
     flock = filters.CharFilter(lookup_expr="icontains")
     rearing_method = filters.CharFilter(lookup_expr="icontains")
+    date_changed_from = DateFromFilter(field_name="date_changed")
+    date_changed_to = DateToFilter(field_name="date_changed")
 
     class Meta:
         model = FlockHistory
-        fields = ["flock", "rearing_method"]
+        fields = ["flock", "rearing_method", "date_changed_from", "date_changed_to"]
 
 
-class FlockMovementFilterSet(filters.FilterSet):
+class FlockMovementFilterSet(DateRangeFilterSet):
     flock = filters.CharFilter(lookup_expr="icontains")
     from_structure = filters.CharFilter(lookup_expr="icontains")
     to_structure = filters.CharFilter(lookup_expr="icontains")
@@ -98,6 +114,17 @@ class FlockMovementFilterSet(filters.FilterSet):
     day_of_movement = filters.NumberFilter(
         field_name="movement_date__day", lookup_expr="exact"
     )
+    movement_date_from = DateFromFilter(field_name="movement_date")
+    movement_date_to = DateToFilter(field_name="movement_date")
+
+    date_part_filters = {
+        "movement_date": {
+            "year": "year_of_movement",
+            "month": "month_of_movement",
+            "week": "week_of_movement",
+            "day": "day_of_movement",
+        }
+    }
 
     class Meta:
         model = FlockMovement
@@ -109,20 +136,46 @@ class FlockMovementFilterSet(filters.FilterSet):
             "month_of_movement",
             "week_of_movement",
             "day_of_movement",
+            "movement_date_from",
+            "movement_date_to",
         ]
 
 
-class FlockInspectionRecordFilterSet(filters.FilterSet):
+class FlockInspectionRecordFilterSet(DateRangeFilterSet):
     flock = filters.CharFilter(lookup_expr="icontains")
+    year_of_inspection = filters.NumberFilter(field_name="date_of_inspection__year", lookup_expr="exact")
     month_of_inspection = filters.NumberFilter(field_name="date_of_inspection__month", lookup_expr="exact")
     week_of_inspection = filters.NumberFilter(field_name="date_of_inspection__week", lookup_expr="exact")
     day_of_inspection = filters.NumberFilter(field_name="date_of_inspection__day", lookup_expr="exact")
+    date_of_inspection_from = DateFromFilter(field_name="date_of_inspection")
+    date_of_inspection_to = DateToFilter(field_name="date_of_inspection")
+
+    date_part_filters = {
+        "date_of_inspection": {
+            "year": "year_of_inspection",
+            "month": "month_of_inspection",
+            "week": "week_of_inspection",
+            "day": "day_of_inspection",
+        }
+    }
 
     class Meta:
         model = FlockInspectionRecord
         fields = [
             "flock",
+            "year_of_inspection",
             "month_of_inspection",
             "week_of_inspection",
-            "day_of_inspection"
-        ]
\ No newline at end of file
+            "day_of_inspection",
+            "date_of_inspection_from",
+            "date_of_inspection_to",
+        ]
+
+
+class FlockMortalityCurveFilterSet(filters.FilterSet):
+    flock = filters.NumberFilter(field_name="flock", lookup_expr="exact")
+    is_deviating = CaseInsensitiveBooleanFilter(field_name="is_deviating")
+
+    class Meta:
+        model = FlockMortalityCurve
+        fields = ["flock", "is_deviating"]
@@ -0,0 +1,26 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from poultry.analytics import FlockMortalityAnalytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the weekly and cumulative mortality curves of every flock and flags flocks "
+        "deviating from their breed expectations. Intended to run nightly, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threshold",
+            type=Decimal,
+            default=FlockMortalityAnalytics.DEFAULT_DEVIATION_THRESHOLD,
+            help="Percentage points above the expected cumulative mortality at which a flock is flagged.",
+        )
+
+    def handle(self, *args, **options):
+        number_of_flocks = FlockMortalityAnalytics.refresh_mortality_curves(options["threshold"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Computed mortality curves for {number_of_flocks} flock(s).")
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:12
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("poultry", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flockbreedinformation",
+            name="expected_weekly_mortality_rate",
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.CreateModel(
+            name="FlockMortalityCurve",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("weekly_mortality", models.JSONField(default=list)),
+                ("cumulative_mortality_rate", models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ("expected_mortality_rate", models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ("deviation", models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ("is_deviating", models.BooleanField(default=False)),
+                ("computed_at", models.DateTimeField()),
+                ("flock", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="mortality_curve", to="poultry.flock")),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("poultry", "0002_flock_mortality_curve"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="eggcollection",
+            index=models.Index(fields=["flock", "date"], name="egg_collection_flock_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="flockinspectionrecord",
+            index=models.Index(fields=["flock", "date_of_inspection"], name="inspection_flock_date_idx"),
+        ),
+        # Replaced by the composite indexes leading with the same column, dropped once they exist
+        migrations.AlterField(
+            model_name="eggcollection",
+            name="flock",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to="poultry.flock"),
+        ),
+        migrations.AlterField(
+            model_name="flockinspectionrecord",
+            name="flock",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to="poultry.flock"),
+        ),
+    ]
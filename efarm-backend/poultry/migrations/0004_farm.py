@@ -0,0 +1,32 @@
+# Generated by Django 4.1.7 on 2026-10-19 11:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_farm"),
+        ("poultry", "0003_hot_table_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flock",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="flocks", to="users.farm"),
+        ),
+        migrations.AddField(
+            model_name="housingstructure",
+            name="farm",
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="housing_structures", to="users.farm"),
+        ),
+        migrations.AddIndex(
+            model_name="flock",
+            index=models.Index(fields=["farm", "is_present"], name="flock_farm_present_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="housingstructure",
+            index=models.Index(fields=["farm", "category"], name="housing_farm_category_idx"),
+        ),
+    ]
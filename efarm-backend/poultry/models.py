@@ -1,8 +1,10 @@
 from datetime import date
 
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models import Sum
 from django.utils import timezone
 
+from efarm.tenancy import FarmScopedManager
 from poultry.utils import todays_date
 from poultry.validators import *
 
@@ -67,6 +69,7 @@ class HousingStructure(models.Model):
     - `category`: A character field representing the category of the housing structure.
                   It is limited to a maximum length of 21 characters.
                   The available choices are defined in the `HousingStructureCategoryChoices` enum.
+    - `farm`: A foreign key to the `Farm` model, representing the farm the housing structure belongs to.
 
     Methods:
     - `clean()`: This method performs validation on the model instance.
@@ -85,6 +88,21 @@ class HousingStructure(models.Model):
     category = models.CharField(
         max_length=21, choices=HousingStructureCategoryChoices.choices
     )
+    farm = models.ForeignKey(
+        "users.Farm",
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        db_index=False,
+        related_name="housing_structures",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["farm", "category"], name="housing_farm_category_idx"),
+        ]
+
+    objects = FarmScopedManager("farm")
 
     def __str__(self):
         """
@@ -133,6 +151,7 @@ class Flock(models.Model):
                                   structure for the flock.
     - `date_established`: A date field that automatically records the date when the flock was established.
     - `is_present`: A boolean field indicating if the flock is currently present. It is set to True by default.
+    - `farm`: A foreign key to the `Farm` model, representing the farm the flock belongs to.
 
     Properties:
     - `name`: Returns a string representing the name of the flock, including its ID and the date of establishment.
@@ -152,6 +171,21 @@ class Flock(models.Model):
     current_housing_structure = models.ForeignKey(HousingStructure, on_delete=models.PROTECT, related_name="flocks")
     date_established = models.DateField(auto_now_add=True)
     is_present = models.BooleanField(default=True, editable=False)
+    farm = models.ForeignKey(
+        "users.Farm",
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        db_index=False,
+        related_name="flocks",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["farm", "is_present"], name="flock_farm_present_idx"),
+        ]
+
+    objects = FarmScopedManager("farm")
 
     @property
     def name(self):
@@ -228,6 +262,8 @@ class FlockHistory(models.Model):
     )
     date_changed = models.DateTimeField(auto_now_add=True)
 
+    objects = FarmScopedManager("flock__farm")
+
     def __str__(self):
         return f"History for {self.flock}"
 
@@ -238,6 +274,8 @@ class FlockMovement(models.Model):
     to_structure = models.ForeignKey(HousingStructure, on_delete=models.CASCADE, related_name='incoming_movements')
     movement_date = models.DateField(auto_now_add=True)
 
+    objects = FarmScopedManager("flock__farm")
+
     def clean(self):
         FlockMovementValidator.validate_flock_movement(self.flock, self.to_structure, self.from_structure)
 
@@ -250,10 +288,17 @@ class FlockMovement(models.Model):
 
 
 class FlockInspectionRecord(models.Model):
-    flock = models.ForeignKey(Flock, on_delete=models.CASCADE)
+    class Meta:
+        indexes = [
+            models.Index(fields=["flock", "date_of_inspection"], name="inspection_flock_date_idx"),
+        ]
+
+    flock = models.ForeignKey(Flock, on_delete=models.CASCADE, db_index=False)
     date_of_inspection = models.DateTimeField(auto_now_add=True)
     number_of_dead_birds = models.PositiveIntegerField(default=0)
 
+    objects = FarmScopedManager("flock__farm")
+
     def __str__(self):
         return f"{self.flock} Inspection Report on: {self.date_of_inspection}"
 
@@ -281,7 +326,9 @@ class FlockBreedInformation(models.Model):
     - average_egg_production: PositiveIntegerField specifying the average egg production of the flock,
       with the option to be null.
     - maturity_age_in_weeks: PositiveIntegerField specifying the maturity age of the flock in weeks,
-      with a minimum value of 6."""
+      with a minimum value of 6.
+    - expected_weekly_mortality_rate: DecimalField specifying the expected percentage of birds lost per week,
+      used as the benchmark for flock mortality curves. Defaults per chicken type are used when it is null."""
 
     breed = models.ForeignKey(FlockBreed, on_delete=models.CASCADE)
     chicken_type = models.CharField(max_length=15, choices=ChickenTypeChoices.choices)
@@ -289,6 +336,10 @@ class FlockBreedInformation(models.Model):
     average_mature_weight_in_kgs = models.DecimalField(max_digits=3, decimal_places=2)
     average_egg_production = models.PositiveIntegerField(null=True)
     maturity_age_in_weeks = models.PositiveIntegerField(validators=[MinValueValidator(8), MaxValueValidator(24)])
+    expected_weekly_mortality_rate = models.DecimalField(
+        max_digits=4, decimal_places=2, null=True, blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
 
     def clean(self):
         FlockBreedInformationValidator.validate_fields(self.chicken_type, self.average_egg_production,
@@ -299,6 +350,39 @@ class FlockBreedInformation(models.Model):
         super().save(*args, **kwargs)
 
 
+class FlockMortalityCurve(models.Model):
+    """
+    Model holding the precomputed mortality curve of a flock.
+
+    The curve is rebuilt nightly by the `compute_flock_mortality_curves` management command from the
+    flock inspection records, so dashboards read one row per flock instead of aggregating inspections.
+
+    Fields:
+    - `flock`: A one-to-one relationship to the `Flock` model the curve belongs to.
+    - `weekly_mortality`: A JSON list with one entry per week of age holding the dead birds, the weekly
+                          and cumulative mortality rates and the expected cumulative mortality rate.
+    - `cumulative_mortality_rate`: The percentage of the initial birds lost so far.
+    - `expected_mortality_rate`: The cumulative mortality rate expected for the breed and chicken type.
+    - `deviation`: The difference between the actual and the expected cumulative mortality rates.
+    - `is_deviating`: A boolean field flagging flocks whose deviation exceeds the threshold used.
+    - `computed_at`: The date and time the curve was last computed.
+
+    """
+
+    flock = models.OneToOneField(Flock, on_delete=models.CASCADE, related_name="mortality_curve")
+    weekly_mortality = models.JSONField(default=list)
+    cumulative_mortality_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    expected_mortality_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    deviation = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    is_deviating = models.BooleanField(default=False)
+    computed_at = models.DateTimeField()
+
+    objects = FarmScopedManager("flock__farm")
+
+    def __str__(self):
+        return f"Mortality curve for {self.flock}"
+
+
 class EggCollection(models.Model):
     """
     Model representing the collection of eggs from a flock.
@@ -320,13 +404,18 @@ class EggCollection(models.Model):
 
     class Meta:
         verbose_name_plural = "Egg Collections"
+        indexes = [
+            models.Index(fields=["flock", "date"], name="egg_collection_flock_date_idx"),
+        ]
 
-    flock = models.ForeignKey(Flock, on_delete=models.CASCADE)
+    flock = models.ForeignKey(Flock, on_delete=models.CASCADE, db_index=False)
     date = models.DateField(auto_now_add=True)
     time = models.TimeField(auto_now_add=True)
     collected_eggs = models.PositiveIntegerField(default=0)
     broken_eggs = models.PositiveIntegerField(default=0)
 
+    objects = FarmScopedManager("flock__farm")
+
     @property
     def picking_time(self):
         """
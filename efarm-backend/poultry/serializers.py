@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from poultry.analytics import EggProductionAnalytics
 from poultry.models import *
 
 
@@ -26,7 +27,7 @@ class FlockSerializer(serializers.ModelSerializer):
     age_in_weeks_in_farm = serializers.ReadOnlyField()
     age_in_months_in_farm = serializers.ReadOnlyField()
     current_housing_structure = serializers.PrimaryKeyRelatedField(
-        queryset=HousingStructure.objects.all()
+        queryset=HousingStructure.objects
     )
     source = FlockSourceSerializer()
     breed = FlockBreedSerializer()
@@ -83,12 +84,12 @@ class FlockMovementSerializer(serializers.ModelSerializer):
 
     """
 
-    flock = serializers.PrimaryKeyRelatedField(queryset=Flock.objects.all())
+    flock = serializers.PrimaryKeyRelatedField(queryset=Flock.objects)
     from_structure = serializers.PrimaryKeyRelatedField(
-        queryset=HousingStructure.objects.all()
+        queryset=HousingStructure.objects
     )
     to_structure = serializers.PrimaryKeyRelatedField(
-        queryset=HousingStructure.objects.all()
+        queryset=HousingStructure.objects
     )
 
     class Meta:
@@ -107,7 +108,7 @@ class FlockInspectionRecordSerializer(serializers.ModelSerializer):
 
     """
 
-    flock = serializers.PrimaryKeyRelatedField(queryset=Flock.objects.all())
+    flock = serializers.PrimaryKeyRelatedField(queryset=Flock.objects)
 
     class Meta:
         model = FlockInspectionRecord
@@ -150,8 +151,55 @@ class EggCollectionSerializer(serializers.ModelSerializer):
     Provides serialization and deserialization of EggCollection instances.
     """
 
-    flock = serializers.PrimaryKeyRelatedField(queryset=Flock.objects.all())
+    flock = serializers.PrimaryKeyRelatedField(queryset=Flock.objects)
 
     class Meta:
         model = EggCollection
         fields = "__all__"
+
+
+class EggProductionQuerySerializer(serializers.Serializer):
+    """
+    Serializer validating the query parameters of the egg production analytics endpoint.
+
+    Validates the following parameters:
+    - `flock`: Optional flock ids to restrict the series to, may be repeated.
+    - `period`: The resolution of the series, either `day` or `week`.
+    - `start_date`: Optional first collection date to include.
+    - `end_date`: Optional last collection date to include.
+
+    """
+
+    flock = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False)
+    period = serializers.ChoiceField(
+        choices=EggProductionAnalytics.PERIODS, default=EggProductionAnalytics.DAY
+    )
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start_date = attrs.get("start_date")
+        end_date = attrs.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("The start date must not be after the end date.")
+        return attrs
+
+
+class FlockMortalityCurveSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the FlockMortalityCurve model.
+
+    Serializes the following fields:
+    - `flock`: The flock the curve belongs to.
+    - `weekly_mortality`: The weekly and cumulative mortality rates per week of age.
+    - `cumulative_mortality_rate`: The percentage of the initial birds lost so far.
+    - `expected_mortality_rate`: The cumulative mortality rate expected for the breed and chicken type.
+    - `deviation`: The difference between the actual and the expected cumulative mortality rates.
+    - `is_deviating`: Whether the flock deviates beyond the threshold.
+    - `computed_at`: The date and time the curve was last computed.
+
+    """
+
+    class Meta:
+        model = FlockMortalityCurve
+        fields = "__all__"
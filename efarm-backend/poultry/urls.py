@@ -15,7 +15,9 @@ router.register(r'flock-histories', FlockHistoryViewSet, basename='flock-histori
 router.register(r'housing-structures', HousingStructureViewSet, basename='housing-structures')
 router.register(r'flock-movements', FlockMovementViewSet, basename='flock-movements')
 router.register(r'flock-inspection-records', FlockInspectionRecordViewSet, basename='flock-inspection-records')
+router.register(r'flock-mortality-curves', FlockMortalityCurveViewSet, basename='flock-mortality-curves')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('analytics/egg-production/', EggProductionAnalyticsView.as_view(), name='egg-production-analytics'),
 ]
@@ -3,13 +3,15 @@ from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.filters import OrderingFilter
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from efarm.mixins import FarmScopeMixin, ReplicaReadMixin
 from poultry.filters import *
 from poultry.permissions import *
 from poultry.serializers import *
 
 
-class FlockSourceViewSet(viewsets.ModelViewSet):
+class FlockSourceViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = FlockSource.objects.all()
     serializer_class = FlockSourceSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -56,7 +58,7 @@ class FlockSourceViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class FlockBreedViewSet(viewsets.ModelViewSet):
+class FlockBreedViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = FlockBreed.objects.all()
     serializer_class = FlockBreedSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -104,7 +106,7 @@ class FlockBreedViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class HousingStructureViewSet(viewsets.ModelViewSet):
+class HousingStructureViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = HousingStructure.objects.all()
     serializer_class = HousingStructureSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -136,7 +138,7 @@ class HousingStructureViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class FlockViewSet(viewsets.ModelViewSet):
+class FlockViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Flock.objects.all()
     serializer_class = FlockSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -187,7 +189,7 @@ class FlockViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class FlockHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class FlockHistoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = FlockHistory.objects.all()
     serializer_class = FlockHistorySerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -217,7 +219,7 @@ class FlockHistoryViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class FlockMovementViewSet(viewsets.ModelViewSet):
+class FlockMovementViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = FlockMovement.objects.all()
     serializer_class = FlockMovementSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -249,7 +251,7 @@ class FlockMovementViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class FlockInspectionRecordViewSet(viewsets.ModelViewSet):
+class FlockInspectionRecordViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = FlockInspectionRecord.objects.all()
     serializer_class = FlockInspectionRecordSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -301,13 +303,13 @@ class FlockInspectionRecordViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class FlockBreedInformationViewSet(viewsets.ModelViewSet):
+class FlockBreedInformationViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = FlockBreedInformation.objects.all()
     serializer_class = FlockBreedInformationSerializer
     permission_classes = [CanActOnFlockBreedInformation]
 
 
-class EggCollectionViewSet(viewsets.ModelViewSet):
+class EggCollectionViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing EggCollection instances.
 
@@ -322,3 +324,69 @@ class EggCollectionViewSet(viewsets.ModelViewSet):
 
     queryset = EggCollection.objects.all()
     serializer_class = EggCollectionSerializer
+
+
+class FlockMortalityCurveViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for retrieving the nightly precomputed FlockMortalityCurve instances.
+
+    Provides the following actions:
+    - `list`: Retrieves the mortality curves of all flocks, filterable by deviating flocks.
+    - `retrieve`: Retrieves the mortality curve of a specific flock by its ID.
+
+    """
+
+    queryset = FlockMortalityCurve.objects.all()
+    serializer_class = FlockMortalityCurveSerializer
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = FlockMortalityCurveFilterSet
+    ordering_fields = ["deviation", "cumulative_mortality_rate"]
+    permission_classes = [CanViewFlock]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if not queryset.exists():
+            if request.query_params:
+                # If query parameters are provided, but there are no matching mortality curves.
+                return Response(
+                    {"detail": "No flock mortality curves found matching the provided filters."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            else:
+                # If no query parameters are provided, and the curves have not been computed yet
+                return Response(
+                    {"detail": "No flock mortality curves computed yet."},
+                    status=status.HTTP_200_OK,
+                )
+
+        serializer = self.get_serializer(queryset, many=True)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class EggProductionAnalyticsView(FarmScopeMixin, ReplicaReadMixin, APIView):
+    """
+    View returning the hen-day production time series of one or many flocks.
+
+    Query parameters:
+    - `flock`: Optional flock id, may be repeated to select several flocks.
+    - `period`: `day` (default) or `week`.
+    - `start_date` / `end_date`: Optional inclusive collection date range.
+
+    """
+
+    permission_classes = [CanViewFlock]
+
+    def get(self, request, format=None):
+        serializer = EggProductionQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        production = EggProductionAnalytics.production_time_series(
+            flock_ids=params.get("flock"),
+            period=params["period"],
+            start_date=params.get("start_date"),
+            end_date=params.get("end_date"),
+        )
+        return Response(production, status=status.HTTP_200_OK)
@@ -0,0 +1,16 @@
+# Generated by Django 4.1.7 on 2026-10-19 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("poultry_inventory", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flockinventoryhistory",
+            index=models.Index(fields=["flock_inventory", "date"], name="flock_inv_history_date_idx"),
+        ),
+    ]
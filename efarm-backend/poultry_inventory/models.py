@@ -1,5 +1,7 @@
 from decimal import Decimal
 
+from efarm.history import record_history, register_history
+from efarm.tenancy import FarmScopedManager
 from poultry.models import *
 
 
@@ -29,6 +31,8 @@ class FlockInventory(models.Model):
     last_update = models.DateTimeField(auto_now=True)
     date_added = models.DateField(auto_now_add=True)
 
+    objects = FarmScopedManager("flock__farm")
+
     @property
     def calculate_mortality_rate(self):
         """
@@ -54,11 +58,13 @@ class FlockInventory(models.Model):
     def save(self, *args, **kwargs):
         """
         Overrides the default save method to create a `FlockInventoryHistory` instance after saving the inventory.
+        No instance is created when the number of birds and the mortality rate did not change.
 
         """
         super().save(*args, **kwargs)
 
-        FlockInventoryHistory.objects.create(
+        record_history(
+            FlockInventoryHistory,
             flock_inventory=self,
             date=self.last_update.date(),
             number_of_birds=self.number_of_alive_birds,
@@ -80,8 +86,17 @@ class FlockInventoryHistory(models.Model):
 
     class Meta:
         verbose_name_plural = "Flock Inventory Histories"
+        indexes = [
+            models.Index(fields=["flock_inventory", "date"], name="flock_inv_history_date_idx"),
+        ]
 
     flock_inventory = models.ForeignKey(FlockInventory, on_delete=models.CASCADE, related_name='history')
     date = models.DateField()
     number_of_birds = models.PositiveIntegerField()
     mortality_rate = models.DecimalField(max_digits=5, decimal_places=2)
+
+    objects = FarmScopedManager("flock_inventory__flock__farm")
+
+
+# Snapshots repeating the previous snapshot of their inventory are not recorded, see efarm/history.py
+register_history(FlockInventoryHistory, ['flock_inventory'], ['number_of_birds', 'mortality_rate'], 'date')
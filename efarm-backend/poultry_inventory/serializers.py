@@ -19,7 +19,7 @@ class FlockInventorySerializer(serializers.ModelSerializer):
 
     """
 
-    flock = serializers.PrimaryKeyRelatedField(queryset=Flock.objects.all())
+    flock = serializers.PrimaryKeyRelatedField(queryset=Flock.objects)
     calculate_mortality_rate = serializers.ReadOnlyField()
 
     class Meta:
@@ -39,7 +39,7 @@ class FlockInventoryHistorySerializer(serializers.ModelSerializer):
 
     """
 
-    flock_inventory = serializers.PrimaryKeyRelatedField(queryset=FlockInventory.objects.all())
+    flock_inventory = serializers.PrimaryKeyRelatedField(queryset=FlockInventory.objects)
     mortality_rate = serializers.DecimalField(max_digits=4, decimal_places=2, coerce_to_string=False)
 
     class Meta:
@@ -1,9 +1,11 @@
 from rest_framework import viewsets
 
+from efarm.mixins import FarmScopeMixin, ReplicaReadMixin
+
 from .serializers import *
 
 
-class FlockInventoryViewSet(viewsets.ReadOnlyModelViewSet):
+class FlockInventoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for retrieving FlockInventory instances.
 
@@ -16,7 +18,7 @@ class FlockInventoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = FlockInventorySerializer
 
 
-class FlockInventoryHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class FlockInventoryHistoryViewSet(FarmScopeMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for retrieving FlockInventoryHistory instances.
 
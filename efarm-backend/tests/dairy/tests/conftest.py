@@ -1,10 +1,13 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from dairy.serializers import *
+from efarm.routers import REPLICA_DATABASE
 from users.choices import *
 
 User = get_user_model()
@@ -377,3 +380,85 @@ def setup_quarantine_record_data():
         "reason": QuarantineReasonChoices.NEW_COW,
     }
     return quarantine_data
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def setup_fertility_data():
+    """
+    Fixture to create a cow with two calvings, its heats and its inseminations.
+
+    The records are bulk created so that they can be backdated past the model validators.
+    """
+    inseminators_data = {
+        "first_name": "Peter",
+        "last_name": "Evance",
+        "phone_number": "+254712345678",
+        "sex": SexChoices.MALE,
+        "company": "Peter's Breeders",
+        "license_number": "ABC-2023",
+    }
+    serializer1 = InseminatorSerializer(data=inseminators_data)
+    assert serializer1.is_valid()
+    inseminator = serializer1.save()
+
+    general_cow = {
+        "name": "General Cow",
+        "breed": {"name": CowBreedChoices.AYRSHIRE},
+        "date_of_birth": todays_date - timedelta(days=1500),
+        "gender": SexChoices.FEMALE,
+        "availability_status": CowAvailabilityChoices.ALIVE,
+        "current_pregnancy_status": CowPregnancyChoices.OPEN,
+        "category": CowCategoryChoices.HEIFER,
+        "current_production_status": CowProductionStatusChoices.OPEN,
+    }
+    serializer2 = CowSerializer(data=general_cow)
+    assert serializer2.is_valid()
+    cow = serializer2.save()
+
+    Pregnancy.objects.bulk_create(
+        [
+            Pregnancy(
+                cow=cow,
+                start_date=todays_date - timedelta(days=start_days_ago),
+                date_of_calving=todays_date - timedelta(days=calving_days_ago),
+                pregnancy_status=PregnancyStatusChoices.CONFIRMED,
+                pregnancy_outcome=PregnancyOutcomeChoices.LIVE,
+            )
+            for start_days_ago, calving_days_ago in [(800, 520), (420, 140)]
+        ]
+    )
+    Heat.objects.bulk_create(
+        [
+            Heat(cow=cow, observation_time=timezone.now() - timedelta(days=days_ago))
+            for days_ago in [450, 100, 79]
+        ]
+    )
+    for days_ago, success in [(830, True), (460, False), (440, True), (100, False), (79, False)]:
+        insemination = Insemination.objects.bulk_create(
+            [Insemination(cow=cow, inseminator=inseminator, success=success)]
+        )[0]
+        Insemination.objects.filter(pk=insemination.pk).update(
+            date_of_insemination=timezone.now() - timedelta(days=days_ago)
+        )
+
+    return {"cow": cow}
+
+
+@pytest.fixture(scope="class")
+def setup_replica_database(tmp_path_factory, django_db_setup, django_db_blocker):
+    """
+    Fixture adding a replica database, a second local SQLite database migrated separately from
+    the default one, so tests tell which database served a request.
+    """
+    connections.settings[REPLICA_DATABASE] = dict(
+        connections["default"].settings_dict,
+        NAME=str(tmp_path_factory.mktemp("replica") / "replica.sqlite3"),
+    )
+    with django_db_blocker.unblock():
+        call_command("migrate", database=REPLICA_DATABASE, verbosity=0)
+    yield REPLICA_DATABASE
+    with django_db_blocker.unblock():
+        connections[REPLICA_DATABASE].close()
+    del connections[REPLICA_DATABASE]
+    del connections.settings[REPLICA_DATABASE]
@@ -1,4 +1,8 @@
+from datetime import timedelta
+
 import pytest
+from django.db import connection
+from django.utils import timezone
 
 from dairy.serializers import *
 
@@ -22,3 +26,68 @@ class TestCowBreedModel:
         with pytest.raises(ValidationError) as context:
             cow_breed.save()
         assert f"Invalid cow breed: '{cow_breed.name}'." in context.value
+
+
+@pytest.mark.django_db
+class TestHotQueryPlans:
+    """
+    Captures the query plans of the most frequent lookups on the cow history tables and checks
+    they are served by an index rather than a full table scan.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        if connection.vendor == "postgresql":
+            # Empty tables are cheaper to scan, make the planner show the index it would use
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    @staticmethod
+    def assert_uses_index(queryset, index_name):
+        plan = queryset.explain()
+        assert index_name in plan, plan
+
+    def test_milk_of_cow_in_range(self):
+        queryset = Milk.objects.filter(
+            cow_id=1, milking_date__gte=timezone.now() - timedelta(days=7)
+        ).order_by("milking_date")
+        self.assert_uses_index(queryset, "milk_cow_date_idx")
+
+    def test_latest_milk_of_cow(self):
+        queryset = Milk.objects.filter(cow_id=1).order_by("-milking_date")[:1]
+        self.assert_uses_index(queryset, "milk_cow_date_idx")
+
+    def test_recent_heat_of_cow(self):
+        queryset = Heat.objects.filter(
+            cow_id=1,
+            observation_time__range=(timezone.now() - timedelta(days=21), timezone.now()),
+        )
+        self.assert_uses_index(queryset, "heat_cow_time_idx")
+
+    def test_recent_inseminations_of_cow(self):
+        queryset = Insemination.objects.filter(
+            cow_id=1, date_of_insemination__gte=timezone.now() - timedelta(days=21)
+        )
+        self.assert_uses_index(queryset, "insemination_cow_date_idx")
+
+    def test_latest_lactation_of_cow(self):
+        queryset = Lactation.objects.filter(cow_id=1).order_by("-start_date")[:1]
+        self.assert_uses_index(queryset, "lactation_cow_start_idx")
+
+    def test_open_lactation_of_cow(self):
+        queryset = Lactation.objects.filter(cow_id=1, end_date__isnull=True)
+        self.assert_uses_index(queryset, "lactation_open_idx")
+
+    def test_latest_calving_of_cow(self):
+        queryset = Pregnancy.objects.filter(cow_id=1).order_by("-date_of_calving")[:1]
+        self.assert_uses_index(queryset, "pregnancy_cow_calving_idx")
+
+    def test_ongoing_pregnancy_of_cow(self):
+        queryset = Pregnancy.objects.filter(cow_id=1, date_of_calving__isnull=True).order_by(
+            "-start_date"
+        )
+        self.assert_uses_index(queryset, "pregnancy_ongoing_idx")
+
+    def test_weighings_of_cow_on_date(self):
+        queryset = WeightRecord.objects.filter(cow_id=1, date=timezone.localdate())
+        self.assert_uses_index(queryset, "weight_record_cow_date_idx")
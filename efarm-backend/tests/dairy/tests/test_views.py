@@ -1,6 +1,20 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
 import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connections, transaction
+from django.db.models import F
 from django.urls import reverse
+from django.utils import timezone
 
+from dairy.analytics import OccupancyAnalytics, start_of_day
+from dairy.archiving import MilkArchive
+from dairy.audit import HerdAudit
+from dairy.genetics import HerdPedigree
+from dairy.search import SearchIndex
 from dairy.views import *
 
 
@@ -3281,3 +3295,2017 @@ class TestQuarantineViewSet:
         )
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert QuarantineRecord.objects.filter(pk=quarantine_record.pk).exists()
+
+
+@pytest.mark.django_db
+class TestFertilityViews:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_fertility_data):
+        self.client = setup_users["client"]
+
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        self.cow = setup_fertility_data["cow"]
+
+    def test_list_fertility_records_before_computation(self):
+        """
+        Test listing fertility records before they have been computed.
+        """
+        response = self.client.get(
+            reverse("dairy:fertility-records-list"),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"detail": "No fertility records computed yet."}
+
+    def test_cow_fertility_record_as_farm_owner(self):
+        """
+        Test the fertility indicators computed for a cow.
+        """
+        call_command("compute_fertility_records", stdout=StringIO())
+
+        response = self.client.get(
+            reverse("dairy:fertility-records-list"),
+            {"cow": self.cow.id},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+        fertility_record = response.data[0]
+        assert fertility_record["calving_interval"] == 380
+        assert fertility_record["days_open"] == 140
+        assert fertility_record["number_of_services"] == 5
+        assert fertility_record["services_per_conception"] == "2.50"
+        assert fertility_record["number_of_first_services"] == 3
+        assert fertility_record["first_service_conception_rate"] == "33.33"
+        assert fertility_record["number_of_heats_detected"] == 2
+        assert fertility_record["number_of_expected_heats"] == 6
+        assert fertility_record["heat_detection_rate"] == "33.33"
+
+    def test_herd_fertility_as_farm_owner(self):
+        """
+        Test the herd fertility indicators aggregated from the cow records.
+        """
+        call_command("compute_fertility_records", stdout=StringIO())
+
+        response = self.client.get(
+            reverse("dairy:herd-fertility"),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["number_of_cows"] == 1
+        assert response.data["average_days_open"] == Decimal("140.00")
+        assert response.data["services_per_conception"] == Decimal("2.50")
+
+    def test_fertility_record_refreshed_on_deleted_heat(self):
+        """
+        Test the fertility record of a cow is refreshed when one of its heat records is deleted.
+        """
+        call_command("compute_fertility_records", stdout=StringIO())
+
+        Heat.objects.filter(cow=self.cow).latest("observation_time").delete()
+
+        self.cow.fertility_record.refresh_from_db()
+        assert self.cow.fertility_record.number_of_heats_detected == 1
+        assert self.cow.fertility_record.heat_detection_rate == Decimal("16.67")
+
+    def test_herd_fertility_as_regular_user_permission_denied(self):
+        """
+        Test retrieving herd fertility indicators as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:herd-fertility"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestBreedingCalendarView:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_fertility_data, setup_cows):
+        self.client = setup_users["client"]
+
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        # The open cow was last in heat 79 days ago
+        self.open_cow = setup_fertility_data["cow"]
+
+        # The pregnant cow was inseminated 230 days ago and has not been scanned yet
+        serializer = CowSerializer(data={**setup_cows, "name": "Pregnant Cow"})
+        assert serializer.is_valid()
+        self.pregnant_cow = serializer.save()
+        pregnancy = Pregnancy.objects.bulk_create(
+            [Pregnancy(cow=self.pregnant_cow, start_date=todays_date - timedelta(days=230))]
+        )[0]
+        insemination = Insemination.objects.bulk_create(
+            [
+                Insemination(
+                    cow=self.pregnant_cow,
+                    inseminator=Inseminator.objects.first(),
+                    pregnancy=pregnancy,
+                    success=True,
+                )
+            ]
+        )[0]
+        Insemination.objects.filter(pk=insemination.pk).update(
+            date_of_insemination=timezone.now() - timedelta(days=230)
+        )
+
+        cache.clear()
+
+    def test_breeding_calendar_for_next_week(self):
+        """
+        Test the events expected within the next week, overdue events included.
+        """
+        response = self.client.get(
+            reverse("dairy:breeding-calendar"),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["expected_heats"] == [
+            {"cow": self.open_cow.id, "cow_name": self.open_cow.name, "date": todays_date + timedelta(days=5)}
+        ]
+        assert response.data["pregnancy_scans_due"][0]["cow"] == self.pregnant_cow.id
+        assert response.data["dry_offs_due"][0]["date"] == todays_date - timedelta(days=5)
+        assert response.data["calvings_due"] == []
+
+    def test_breeding_calendar_for_custom_number_of_days(self):
+        """
+        Test the calendar window can be widened with the days parameter.
+        """
+        response = self.client.get(
+            reverse("dairy:breeding-calendar"),
+            {"days": 60},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["calvings_due"][0]["date"] == todays_date + timedelta(days=55)
+
+    def test_breeding_calendar_is_cached_until_a_reproductive_event_is_saved(self):
+        """
+        Test the calendar is served from the cache and recomputed once a heat record changes.
+        """
+        url = reverse("dairy:breeding-calendar")
+        self.client.get(url, HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}")
+
+        # Bulk updates do not send signals, so the cached calendar is still served
+        latest_heat = Heat.objects.filter(cow=self.open_cow).latest("observation_time")
+        Heat.objects.filter(pk=latest_heat.pk).update(
+            observation_time=timezone.now() - timedelta(days=75)
+        )
+        response = self.client.get(url, HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}")
+        assert len(response.data["expected_heats"]) == 1
+
+        Heat.objects.filter(cow=self.open_cow).earliest("observation_time").delete()
+        response = self.client.get(url, HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}")
+        assert response.data["expected_heats"] == []
+
+    def test_breeding_calendar_with_invalid_number_of_days(self):
+        """
+        Test requesting the calendar for a non-positive number of days (should be rejected).
+        """
+        response = self.client.get(
+            reverse("dairy:breeding-calendar"),
+            {"days": 0},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_breeding_calendar_as_regular_user_permission_denied(self):
+        """
+        Test retrieving the breeding calendar as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:breeding-calendar"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestInseminationAnalyticsView:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_fertility_data):
+        self.client = setup_users["client"]
+
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        self.cow = setup_fertility_data["cow"]
+        self.inseminator = Inseminator.objects.get()
+
+        # The two most recent, unsuccessful, inseminations used semen from the same batch
+        semen = Semen.objects.create(
+            inseminator=self.inseminator,
+            producer=SemenSourceChoices.KALRO,
+            semen_batch="KAL-001",
+            date_of_production=todays_date - timedelta(days=200),
+            date_of_expiry=todays_date + timedelta(days=200),
+        )
+        recent_inseminations = Insemination.objects.filter(
+            date_of_insemination__gte=timezone.now() - timedelta(days=200)
+        )
+        recent_inseminations.update(semen=semen)
+
+    def test_success_rates_by_inseminator(self):
+        """
+        Test the conception rate, services per pregnancy and days to pregnancy of an inseminator.
+        """
+        response = self.client.get(
+            reverse("dairy:insemination-analytics"),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [
+            {
+                "inseminator": self.inseminator.id,
+                "first_name": "Peter",
+                "last_name": "Evance",
+                "number_of_services": 5,
+                "number_of_conceptions": 2,
+                "conception_rate": Decimal("40.00"),
+                "services_per_pregnancy": Decimal("2.50"),
+                # Only the conception 80 days after the first calving follows a calving
+                "average_days_to_pregnancy": Decimal("80.00"),
+            }
+        ]
+
+    def test_success_rates_by_semen_batch_within_date_range(self):
+        """
+        Test grouping by semen batch restricted to an insemination date range.
+        """
+        response = self.client.get(
+            reverse("dairy:insemination-analytics"),
+            {
+                "group_by": "semen_batch",
+                "start_date": todays_date - timedelta(days=200),
+                "end_date": todays_date,
+            },
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+        assert response.data[0]["producer"] == SemenSourceChoices.KALRO
+        assert response.data[0]["semen_batch"] == "KAL-001"
+        assert response.data[0]["number_of_services"] == 2
+        assert response.data[0]["conception_rate"] == Decimal("0.00")
+        assert response.data[0]["services_per_pregnancy"] is None
+
+    def test_success_rates_with_invalid_group(self):
+        """
+        Test grouping inseminations by an unsupported field (should be rejected).
+        """
+        response = self.client.get(
+            reverse("dairy:insemination-analytics"),
+            {"group_by": "cow"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_success_rates_as_regular_user_permission_denied(self):
+        """
+        Test retrieving insemination analytics as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:insemination-analytics"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestCowPedigree:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        cows = {}
+        for name in ["Grand Sire", "Grand Dam", "Sire", "Dam", "Calf"]:
+            serializer = CowSerializer(data={**setup_cows, "name": name})
+            assert serializer.is_valid()
+            cows[name] = serializer.save()
+
+        # The genealogy is linked with bulk updates to bypass the age and category validators
+        Cow.objects.filter(pk__in=[cows["Grand Sire"].pk, cows["Sire"].pk]).update(gender=SexChoices.MALE)
+        Cow.objects.filter(pk=cows["Dam"].pk).update(sire=cows["Grand Sire"], dam=cows["Grand Dam"])
+        Cow.objects.filter(pk=cows["Calf"].pk).update(sire=cows["Sire"], dam=cows["Dam"])
+        self.cows = cows
+
+    def test_cow_pedigree_as_farm_owner(self):
+        """
+        Test the ancestors of a cow are returned as a nested tree.
+        """
+        response = self.client.get(
+            reverse("dairy:cows-pedigree", kwargs={"pk": self.cows["Calf"].pk}),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["name"] == "Calf"
+        assert response.data["sire"]["name"] == "Sire"
+        assert response.data["sire"]["sire"] is None
+        assert response.data["dam"]["name"] == "Dam"
+        assert response.data["dam"]["sire"]["name"] == "Grand Sire"
+        assert response.data["dam"]["dam"]["tag_number"] == self.cows["Grand Dam"].tag_number
+
+    def test_cow_pedigree_limited_to_one_generation(self):
+        """
+        Test the pedigree stops at the requested number of generations.
+        """
+        response = self.client.get(
+            reverse("dairy:cows-pedigree", kwargs={"pk": self.cows["Calf"].pk}),
+            {"generations": 1},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["dam"]["name"] == "Dam"
+        assert response.data["dam"]["sire"] is None
+
+    def test_cow_descendants_as_farm_owner(self):
+        """
+        Test the descendants of a cow are returned as a nested tree.
+        """
+        response = self.client.get(
+            reverse("dairy:cows-pedigree", kwargs={"pk": self.cows["Grand Dam"].pk}),
+            {"direction": "descendants"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [dam["name"] for dam in response.data["offspring"]] == ["Dam"]
+        assert [calf["name"] for calf in response.data["offspring"][0]["offspring"]] == ["Calf"]
+
+    def test_calf_records_over_several_generations(self):
+        """
+        Test calf records can include the calves of the calves of a cow.
+        """
+        grand_dam = self.cows["Grand Dam"]
+        assert Cow.manager.get_calf_records(grand_dam) == [self.cows["Dam"]]
+        assert Cow.manager.get_calf_records(grand_dam, generations=2) == [self.cows["Dam"], self.cows["Calf"]]
+
+    def test_cow_pedigree_as_regular_user_permission_denied(self):
+        """
+        Test retrieving the pedigree of a cow as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:cows-pedigree", kwargs={"pk": self.cows["Calf"].pk}),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestHerdGenetics:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        cows = {}
+        for name in ["Grand Sire", "Grand Dam", "Sire", "Dam", "Outside Bull", "Calf"]:
+            serializer = CowSerializer(data={**setup_cows, "name": name})
+            assert serializer.is_valid()
+            cows[name] = serializer.save()
+
+        # Sire and Dam are full siblings, and Calf is their offspring
+        bulls = [cows["Grand Sire"].pk, cows["Sire"].pk, cows["Outside Bull"].pk]
+        Cow.objects.filter(pk__in=bulls).update(gender=SexChoices.MALE)
+        Cow.objects.filter(pk__in=[cows["Sire"].pk, cows["Dam"].pk]).update(
+            sire=cows["Grand Sire"], dam=cows["Grand Dam"]
+        )
+        Cow.objects.filter(pk=cows["Calf"].pk).update(
+            sire=cows["Sire"], dam=cows["Dam"], current_pregnancy_status=CowPregnancyChoices.UNAVAILABLE
+        )
+        # Bulk updates do not send signals, so the pedigree is invalidated explicitly
+        HerdPedigree.invalidate()
+        self.cows = cows
+        self.general_cow = setup_cows
+
+    def test_additive_relationships(self):
+        """
+        Test the tabular method against known relationship coefficients.
+        """
+        pedigree = HerdPedigree.current()
+        assert pedigree.additive_relationship(self.cows["Sire"].pk, self.cows["Dam"].pk) == 0.5
+        assert pedigree.additive_relationship(self.cows["Grand Sire"].pk, self.cows["Calf"].pk) == 0.5
+        assert pedigree.additive_relationship(self.cows["Calf"].pk, self.cows["Calf"].pk) == 1.25
+        assert pedigree.additive_relationship(self.cows["Outside Bull"].pk, self.cows["Dam"].pk) == 0
+
+    def test_inbreeding_coefficient_as_farm_owner(self):
+        """
+        Test the inbreeding coefficient of the offspring of full siblings.
+        """
+        response = self.client.get(
+            reverse("dairy:cows-inbreeding", kwargs={"pk": self.cows["Calf"].pk}),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"cow": self.cows["Calf"].pk, "inbreeding_coefficient": 0.25}
+
+    def test_mating_ranking_for_a_dam(self):
+        """
+        Test the bulls are ranked by the inbreeding coefficient of the prospective calf.
+        """
+        response = self.client.get(
+            reverse("dairy:mating-ranking"),
+            {"dam": self.cows["Dam"].pk},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+        assert [
+            (sire["sire_name"], sire["inbreeding_coefficient"]) for sire in response.data[0]["sires"]
+        ] == [("Outside Bull", 0.0), ("Grand Sire", 0.25), ("Sire", 0.25)]
+
+    def test_ranking_leaves_the_shared_pedigree_unchanged(self):
+        """
+        Test the relationships computed to rank bulls are not kept by the pedigree shared between
+        requests.
+        """
+        pedigree = HerdPedigree.current()
+        state = repr(vars(pedigree))
+        bulls = [self.cows["Grand Sire"].pk, self.cows["Sire"].pk]
+
+        assert pedigree.rank_sires(self.cows["Dam"].pk, bulls)[0][0] == 0.25
+        assert repr(vars(pedigree)) == state
+
+    def test_pedigree_rebuilt_when_a_cow_is_added(self):
+        """
+        Test adding a cow invalidates the pedigree shared between requests.
+        """
+        pedigree = HerdPedigree.current()
+        assert HerdPedigree.current() is pedigree
+
+        serializer = CowSerializer(data={**self.general_cow, "name": "New Cow"})
+        assert serializer.is_valid()
+        new_cow = serializer.save()
+
+        assert HerdPedigree.current() is not pedigree
+        assert new_cow.pk in HerdPedigree.current().indices
+
+    def test_mating_ranking_as_regular_user_permission_denied(self):
+        """
+        Test ranking bulls as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:mating-ranking"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestCowCurrentLocation:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        serializer = CowSerializer(data=setup_cows)
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+
+        self.barn = Barn.objects.create(name="Barn 1", capacity=10)
+        self.other_barn = Barn.objects.create(name="Barn 2", capacity=10)
+        self.pen = CowPen.objects.create(
+            barn=self.barn, type=CowPenTypeChoices.Fixed, category=CowPenCategoriesChoices.Calf_Pen
+        )
+
+    def test_pen_movement_sets_current_pen_and_barn(self):
+        """
+        Test moving a cow into a pen records the pen and its barn on the cow.
+        """
+        response = self.client.post(
+            reverse("dairy:cow-in-pen-movement-list"),
+            data={"cow": self.cow.id, "new_pen": self.pen.id},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+            format="json",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        self.cow.refresh_from_db()
+        assert self.cow.current_pen == self.pen
+        assert self.cow.current_barn == self.barn
+
+    def test_barn_movement_clears_pen_of_previous_barn(self):
+        """
+        Test moving a cow to another barn clears the pen it occupied in the previous barn.
+        """
+        CowInPenMovement.objects.create(cow=self.cow, new_pen=self.pen)
+        CowInBarnMovement.objects.create(cow=self.cow, previous_barn=self.barn, new_barn=self.other_barn)
+
+        self.cow.refresh_from_db()
+        assert self.cow.current_pen is None
+        assert self.cow.current_barn == self.other_barn
+
+    def test_filter_cows_by_current_barn(self):
+        """
+        Test listing the cows currently in a barn.
+        """
+        CowInPenMovement.objects.create(cow=self.cow, new_pen=self.pen)
+
+        response = self.client.get(
+            reverse("dairy:cows-list"),
+            {"current_barn": self.barn.id},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [cow["id"] for cow in response.data] == [self.cow.id]
+
+        response = self.client.get(
+            reverse("dairy:cows-list"),
+            {"current_barn": self.other_barn.id},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestOccupancyAnalyticsView:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        cows = []
+        for name in ["First Cow", "Second Cow"]:
+            serializer = CowSerializer(data={**setup_cows, "name": name})
+            assert serializer.is_valid()
+            cows.append(serializer.save())
+
+        self.barn = Barn.objects.create(name="Barn 1", capacity=2)
+        self.other_barn = Barn.objects.create(name="Barn 2", capacity=4)
+        self.pen = CowPen.objects.create(
+            barn=self.barn, type=CowPenTypeChoices.Fixed, category=CowPenCategoriesChoices.Calf_Pen, capacity=2
+        )
+        self.other_pen = CowPen.objects.create(
+            barn=self.other_barn, type=CowPenTypeChoices.Fixed, category=CowPenCategoriesChoices.Calf_Pen, capacity=2
+        )
+
+        yesterday = timezone.make_aware(datetime.combine(todays_date - timedelta(days=1), datetime.min.time()))
+        movements = [
+            (cows[0], None, self.pen, yesterday - timedelta(days=4)),
+            (cows[1], None, self.pen, yesterday + timedelta(hours=10)),
+            (cows[0], self.pen, self.other_pen, yesterday + timedelta(hours=12)),
+        ]
+        for cow, previous_pen, new_pen, timestamp in movements:
+            movement = CowInPenMovement.objects.create(cow=cow, previous_pen=previous_pen, new_pen=new_pen)
+            CowInPenMovement.objects.filter(pk=movement.pk).update(timestamp=timestamp)
+            # Along with the barn movements recorded for it
+            CowInBarnMovement.objects.filter(cow=cow, timestamp__gte=movement.timestamp).update(
+                timestamp=timestamp
+            )
+        self.cows = cows
+        self.yesterday = yesterday
+
+    def test_daily_barn_occupancy_as_farm_owner(self):
+        """
+        Test the daily occupancy and peak utilization of each barn.
+        """
+        response = self.client.get(
+            reverse("dairy:occupancy-analytics"),
+            {"start_date": todays_date - timedelta(days=2), "end_date": todays_date},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        barn, other_barn = response.data
+        assert [bucket["occupancy"] for bucket in barn["buckets"]] == [1, 1, 1]
+        assert [bucket["peak_occupancy"] for bucket in barn["buckets"]] == [1, 2, 1]
+        assert barn["peak_occupancy"] == 2
+        assert barn["peak_utilization"] == Decimal("100.00")
+        assert [bucket["occupancy"] for bucket in other_barn["buckets"]] == [0, 1, 1]
+        assert other_barn["peak_utilization"] == Decimal("25.00")
+
+    def test_hourly_pen_occupancy(self):
+        """
+        Test the hourly occupancy of each pen changes in the hour of the movement.
+        """
+        response = self.client.get(
+            reverse("dairy:occupancy-analytics"),
+            {
+                "scope": "pen",
+                "interval": "hour",
+                "start_date": todays_date - timedelta(days=1),
+                "end_date": todays_date - timedelta(days=1),
+            },
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        pen = response.data[0]
+        assert len(pen["buckets"]) == 24
+        assert [bucket["occupancy"] for bucket in pen["buckets"][9:13]] == [1, 2, 2, 1]
+        assert pen["peak_occupancy"] == 2
+
+    def test_barn_movement_leaves_pen(self):
+        """
+        Test a cow moved to another barn leaves its pen and barn.
+        """
+        movement = CowInBarnMovement.objects.create(
+            cow=self.cows[1], previous_barn=self.barn, new_barn=self.other_barn
+        )
+        CowInBarnMovement.objects.filter(pk=movement.pk).update(
+            timestamp=self.yesterday + timedelta(hours=20)
+        )
+
+        pen, other_pen = OccupancyAnalytics.occupancy(
+            scope=OccupancyAnalytics.PEN,
+            interval=OccupancyAnalytics.HOUR,
+            start_date=todays_date - timedelta(days=1),
+            end_date=todays_date - timedelta(days=1),
+        )
+        assert [bucket["occupancy"] for bucket in pen["buckets"][19:22]] == [1, 0, 0]
+        assert [bucket["occupancy"] for bucket in other_pen["buckets"][19:22]] == [1, 1, 1]
+
+        barn, other_barn = OccupancyAnalytics.occupancy(
+            start_date=todays_date - timedelta(days=1), end_date=todays_date
+        )
+        assert [bucket["occupancy"] for bucket in barn["buckets"]] == [0, 0]
+        assert [bucket["occupancy"] for bucket in other_barn["buckets"]] == [2, 2]
+
+    def test_occupancy_with_too_many_buckets(self):
+        """
+        Test requesting an hourly series over more than three months (should be rejected).
+        """
+        response = self.client.get(
+            reverse("dairy:occupancy-analytics"),
+            {"interval": "hour", "start_date": todays_date - timedelta(days=365)},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_occupancy_as_regular_user_permission_denied(self):
+        """
+        Test retrieving occupancy analytics as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:occupancy-analytics"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestHerdLifecycle:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        def create_cow(name, age, gender, category, production_status):
+            cow_data = dict(
+                setup_cows,
+                name=name,
+                date_of_birth=todays_date - timedelta(days=age),
+                gender=gender,
+                category=category,
+                current_production_status=production_status,
+            )
+            if age < 365 or gender == SexChoices.MALE:
+                cow_data["current_pregnancy_status"] = CowPregnancyChoices.UNAVAILABLE
+            serializer = CowSerializer(data=cow_data)
+            assert serializer.is_valid(), serializer.errors
+            return serializer.save()
+
+        self.calf = create_cow(
+            "Calf", 80, SexChoices.FEMALE, CowCategoryChoices.CALF, CowProductionStatusChoices.CALF
+        )
+        self.young_heifer = create_cow(
+            "Young Heifer", 300, SexChoices.FEMALE, CowCategoryChoices.HEIFER,
+            CowProductionStatusChoices.YOUNG_HEIFER,
+        )
+        self.bull = create_cow(
+            "Bull", 700, SexChoices.MALE, CowCategoryChoices.BULL, CowProductionStatusChoices.BULL
+        )
+        self.heifer = create_cow(
+            "Heifer", 400, SexChoices.FEMALE, CowCategoryChoices.HEIFER, CowProductionStatusChoices.OPEN
+        )
+
+        # Age the herd by 100 days without going through the validators
+        Cow.objects.update(date_of_birth=F("date_of_birth") - timedelta(days=100))
+
+    def test_update_herd_lifecycle(self, monkeypatch):
+        """
+        Test the command moves aged cows to their expected category and production status.
+        """
+        from dairy_inventory.models import CowInventory, CowInventoryUpdateHistory
+
+        refresh, refreshes = CowInventory.refresh, []
+        monkeypatch.setattr(
+            CowInventory,
+            "refresh",
+            classmethod(lambda cls, farm_id=None: refreshes.append(farm_id) or refresh(farm_id)),
+        )
+        number_of_history_entries = CowInventoryUpdateHistory.objects.count()
+        out = StringIO()
+        call_command("update_herd_lifecycle", "--batch-size", "2", stdout=out)
+        assert "Updated 3 cow(s)." in out.getvalue()
+
+        self.calf.refresh_from_db()
+        assert self.calf.category == CowCategoryChoices.WEANER
+        assert self.calf.current_production_status == CowProductionStatusChoices.WEANER
+
+        self.young_heifer.refresh_from_db()
+        assert self.young_heifer.category == CowCategoryChoices.HEIFER
+        assert self.young_heifer.current_production_status == CowProductionStatusChoices.OPEN
+
+        self.bull.refresh_from_db()
+        assert self.bull.current_production_status == CowProductionStatusChoices.MATURE_BULL
+
+        self.heifer.refresh_from_db()
+        assert self.heifer.current_production_status == CowProductionStatusChoices.OPEN
+
+        # The inventory is refreshed once for the whole run, its unchanged count is not recorded again
+        assert len(refreshes) == 1
+        assert CowInventoryUpdateHistory.objects.count() == number_of_history_entries
+
+    def test_update_herd_lifecycle_keeps_culled_cows(self):
+        """
+        Test the command does not change the production status of culled cows.
+        """
+        Cow.objects.filter(pk=self.heifer.pk).update(
+            current_production_status=CowProductionStatusChoices.CULLED
+        )
+        call_command("update_herd_lifecycle", stdout=StringIO())
+
+        self.heifer.refresh_from_db()
+        assert self.heifer.current_production_status == CowProductionStatusChoices.CULLED
+
+    def test_update_herd_lifecycle_dry_run(self):
+        """
+        Test a dry run lists the transitions without applying them.
+        """
+        out = StringIO()
+        call_command("update_herd_lifecycle", "--dry-run", stdout=out)
+        assert "Calf: Calf -> Weaner, Calf -> Weaner" in out.getvalue()
+        assert "Would update 3 cow(s)." in out.getvalue()
+
+        self.calf.refresh_from_db()
+        assert self.calf.category == CowCategoryChoices.CALF
+
+
+@pytest.mark.django_db
+class TestHerdAudit:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        serializer = CowSerializer(data=setup_cows)
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+
+    def test_audit_consistent_herd(self):
+        """
+        Test auditing a herd that satisfies every invariant.
+        """
+        out = StringIO()
+        call_command("audit_herd", "--fail-on-violations", stdout=out)
+        assert "Found 0 violation(s)." in out.getvalue()
+
+    def test_audit_reports_violations(self):
+        """
+        Test the audit reports records bypassing the validators.
+        """
+        Cow.objects.filter(pk=self.cow.pk).update(
+            gender=SexChoices.MALE, current_pregnancy_status=CowPregnancyChoices.OPEN
+        )
+        lactations = Lactation.objects.bulk_create(
+            [
+                Lactation(cow=self.cow, start_date=todays_date - timedelta(days=100)),
+                Lactation(cow=self.cow, start_date=todays_date - timedelta(days=50), lactation_number=2),
+                Lactation(
+                    cow=self.cow,
+                    start_date=todays_date - timedelta(days=300),
+                    end_date=todays_date - timedelta(days=200),
+                    lactation_number=3,
+                ),
+            ]
+        )
+        milk = Milk.objects.bulk_create([Milk(cow=self.cow, amount_in_kgs=Decimal("12.00"))])
+
+        report = {result["check"]: result for result in HerdAudit.run()}
+        assert report["male_cows_with_pregnancy_status"]["sample_ids"] == [self.cow.id]
+        assert report["multiple_open_lactations"]["number_of_violations"] == 2
+        assert report["overlapping_lactations"]["sample_ids"] == sorted(
+            lactation.id for lactation in lactations[:2]
+        )
+        assert report["milk_without_lactation"]["sample_ids"] == [milk[0].id]
+        assert report["milk_from_male_cows"]["number_of_violations"] == 1
+        assert report["dead_cows_without_date_of_death"]["number_of_violations"] == 0
+
+        with pytest.raises(CommandError):
+            call_command("audit_herd", "--fail-on-violations", stdout=StringIO())
+
+    def test_audit_single_check(self):
+        """
+        Test running a single check by name.
+        """
+        out = StringIO()
+        call_command("audit_herd", "--check", "milk_without_lactation", stdout=out)
+        assert "milk_without_lactation: OK" in out.getvalue()
+        assert "male_cows_with_pregnancy_status" not in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestDiseaseAnalyticsView:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.regular_user_token = setup_users["regular_user_token"]
+
+        cows = []
+        for name in ["Cow One", "Cow Two", "Cow Three", "Cow Four"]:
+            serializer = CowSerializer(data=dict(setup_cows, name=name))
+            assert serializer.is_valid()
+            cows.append(serializer.save())
+
+        pathogen = Pathogen.objects.create(name="Bacteria")
+        infectious = DiseaseCategory.objects.create(name="Infectious")
+        DiseaseCategory.objects.create(name="Nutrition")
+
+        # The first day of the last complete week, so every case falls in a known week
+        self.week_start = todays_date - timedelta(days=todays_date.weekday() + 7)
+        mastitis = Disease.objects.create(
+            name="Mastitis",
+            pathogen=pathogen,
+            categories=infectious,
+            occurrence_date=self.week_start - timedelta(weeks=2),
+            is_recovered=True,
+            recovered_date=self.week_start + timedelta(days=4),
+        )
+        mastitis.cows.set(cows[:2])
+        foot_rot = Disease.objects.create(
+            name="Foot Rot",
+            pathogen=pathogen,
+            categories=infectious,
+            occurrence_date=self.week_start,
+        )
+        foot_rot.cows.set(cows[2:3])
+
+        treatment = Treatment.objects.create(
+            disease=mastitis, cow=cows[0], treatment_method="Antibiotics", cost=Decimal("150.00")
+        )
+        Treatment.objects.filter(pk=treatment.pk).update(
+            date_of_treatment=start_of_day(self.week_start) + timedelta(days=1)
+        )
+        self.setup_users = setup_users
+        self.cows = cows
+        self.pathogen = pathogen
+        self.infectious = infectious
+
+    def test_disease_statistics_per_week(self):
+        """
+        Test computing weekly incidence, prevalence, recovery time and treatment cost per category.
+        """
+        response = self.client.get(
+            reverse("dairy:disease-analytics"),
+            {
+                "period": "week",
+                "start_date": self.week_start - timedelta(weeks=1),
+                "end_date": self.week_start + timedelta(days=6),
+            },
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 4
+
+        infectious = [row for row in response.data if row["category"] == "Infectious"]
+        previous_week, last_week = infectious
+        assert previous_week["period_start"] == self.week_start - timedelta(weeks=1)
+        assert previous_week["new_cases"] == 0
+        assert previous_week["active_cases"] == 2
+        assert previous_week["prevalence"] == Decimal("50.00")
+
+        assert last_week["new_cases"] == 1
+        assert last_week["recovered_cases"] == 2
+        assert last_week["active_cases"] == 1
+        assert last_week["incidence_rate"] == Decimal("25.00")
+        assert last_week["average_recovery_days"] == Decimal("18.000")
+        assert last_week["number_of_treatments"] == 1
+        assert last_week["treatment_cost"] == Decimal("150.00")
+
+        nutrition = [row for row in response.data if row["category"] == "Nutrition"]
+        assert all(row["active_cases"] == 0 for row in nutrition)
+
+    def test_disease_statistics_scoped_to_farm(self):
+        """
+        Test the cases and treatments of another farm are neither counted nor divided by the herd
+        of the farm of the user.
+        """
+        from users.models import CustomUser, Farm
+
+        farm, other_farm = Farm.objects.bulk_create([Farm(name="Green Pastures"), Farm(name="Hill Top")])
+        CustomUser.objects.filter(pk=self.setup_users["farm_owner_user_id"]).update(farm=farm)
+        CustomUser.objects.filter(pk=self.setup_users["farm_manager_user_id"]).update(farm=other_farm)
+        Cow.objects.update(farm=farm)
+        Disease.objects.update(farm=farm)
+
+        other_cow = Cow.objects.bulk_create(
+            [Cow(name="Other Cow", breed=self.cows[0].breed, date_of_birth=self.cows[0].date_of_birth,
+                 gender=SexChoices.FEMALE, farm=other_farm)]
+        )[0]
+        # Each farm records its own mastitis
+        other_mastitis = Disease.objects.create(
+            name="Mastitis",
+            pathogen=self.pathogen,
+            categories=self.infectious,
+            occurrence_date=self.week_start - timedelta(weeks=2),
+            farm=other_farm,
+        )
+        other_mastitis.cows.set([other_cow])
+        treatment = Treatment.objects.create(
+            disease=other_mastitis, cow=other_cow, treatment_method="Antibiotics", cost=Decimal("500.00")
+        )
+        Treatment.objects.filter(pk=treatment.pk).update(
+            date_of_treatment=start_of_day(self.week_start) + timedelta(days=2)
+        )
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Disease.objects.create(
+                name="Mastitis",
+                pathogen=self.pathogen,
+                categories=self.infectious,
+                occurrence_date=self.week_start,
+                farm=other_farm,
+            )
+
+        params = {"period": "week", "start_date": self.week_start, "end_date": self.week_start + timedelta(days=6)}
+        response = self.client.get(
+            reverse("dairy:disease-analytics"), params, HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        week = [row for row in response.data if row["category"] == "Infectious"][0]
+        assert (week["herd_size"], week["new_cases"], week["recovered_cases"], week["active_cases"]) == (4, 1, 2, 1)
+        assert week["prevalence"] == Decimal("25.00")
+        assert week["treatment_cost"] == Decimal("150.00")
+
+        response = self.client.get(
+            reverse("dairy:disease-analytics"),
+            params,
+            HTTP_AUTHORIZATION=f"Token {self.setup_users['farm_manager_token']}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        week = [row for row in response.data if row["category"] == "Infectious"][0]
+        assert (week["herd_size"], week["new_cases"], week["recovered_cases"], week["active_cases"]) == (1, 0, 0, 1)
+        assert week["prevalence"] == Decimal("100.00")
+        assert week["treatment_cost"] == Decimal("500.00")
+
+    def test_disease_statistics_with_too_many_periods(self):
+        """
+        Test requesting weekly statistics over more than five years (should be rejected).
+        """
+        response = self.client.get(
+            reverse("dairy:disease-analytics"),
+            {"period": "week", "start_date": todays_date - timedelta(days=365 * 6)},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_disease_statistics_as_regular_user_permission_denied(self):
+        """
+        Test retrieving disease statistics as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:disease-analytics"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestHealthDueListView:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.regular_user_token = setup_users["regular_user_token"]
+
+        serializer = CowSerializer(data=setup_cows)
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+        serializer = CowSerializer(data=dict(setup_cows, name="Stray Cow"))
+        assert serializer.is_valid()
+        self.stray_cow = serializer.save()
+
+        self.barn = Barn.objects.create(name="Barn 1", capacity=10)
+        pen = CowPen.objects.create(
+            barn=self.barn, type=CowPenTypeChoices.Fixed, category=CowPenCategoriesChoices.General_Pen
+        )
+        CowInPenMovement.objects.create(cow=self.cow, new_pen=pen)
+
+        vaccination = Vaccination.objects.create(cow=self.cow, vaccine_name="FMD", dose_amount=Decimal("2.00"))
+        Vaccination.objects.filter(pk=vaccination.pk).update(date_given=todays_date - timedelta(days=190))
+        VaccinationProtocol.objects.create(vaccine_name="FMD", interval_in_days=180)
+
+        disease = Disease.objects.create(
+            name="Mastitis",
+            pathogen=Pathogen.objects.create(name="Bacteria"),
+            categories=DiseaseCategory.objects.create(name="Infectious"),
+            occurrence_date=todays_date,
+        )
+        self.treatment = Treatment.objects.create(
+            disease=disease, cow=self.stray_cow, treatment_method="Antibiotics"
+        )
+
+    def test_health_due_list_grouped_by_barn(self):
+        """
+        Test the worklist contains the overdue booster and the scheduled treatment, grouped by barn.
+        """
+        response = self.client.get(
+            reverse("dairy:health-due-list"),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+
+        unassigned, barn = response.data
+        assert unassigned["barn"] is None
+        assert unassigned["items"][0]["protocol"] == "Mastitis: Antibiotics"
+        assert barn["barn"] == self.barn.id
+        assert barn["items"][0]["protocol"] == "FMD"
+        assert barn["items"][0]["days_overdue"] == 10
+
+    def test_completed_treatment_leaves_the_due_list(self):
+        """
+        Test completing a treatment takes it off the worklist.
+        """
+        self.treatment.treatment_status = "Completed"
+        self.treatment.duration = 3
+        self.treatment.save()
+
+        response = self.client.get(
+            reverse("dairy:health-due-list"),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [barn["barn"] for barn in response.data] == [self.barn.id]
+
+    def test_health_due_list_before_booster_date(self):
+        """
+        Test the booster is not listed on a day before it is due.
+        """
+        response = self.client.get(
+            reverse("dairy:health-due-list"),
+            {"date": todays_date - timedelta(days=11)},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == []
+
+    def test_rebuild_health_due_list(self):
+        """
+        Test rebuilding the due list from the vaccinations and treatments.
+        """
+        HealthDueItem.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_health_due_list", stdout=out)
+        assert "Scheduled 2 health due item(s)." in out.getvalue()
+
+    def test_health_due_list_as_regular_user_permission_denied(self):
+        """
+        Test retrieving the due list as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:health-due-list"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestWeightGainViews:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.regular_user_token = setup_users["regular_user_token"]
+
+        serializer = CowSerializer(data=setup_cows)
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+        serializer = CowSerializer(data=dict(setup_cows, name="Other Cow"))
+        assert serializer.is_valid()
+        self.other_cow = serializer.save()
+
+        WeightRecord.objects.bulk_create(
+            [
+                WeightRecord(cow=self.cow, weight_in_kgs=Decimal("300.00")),
+                WeightRecord(cow=self.cow, weight_in_kgs=Decimal("310.00")),
+                WeightRecord(cow=self.cow, weight_in_kgs=Decimal("325.00")),
+                WeightRecord(cow=self.other_cow, weight_in_kgs=Decimal("280.00")),
+                WeightRecord(cow=self.other_cow, weight_in_kgs=Decimal("300.00")),
+            ]
+        )
+        dates = [60, 40, 10, 30, 10]
+        for record, days_ago in zip(WeightRecord.objects.order_by("id"), dates):
+            WeightRecord.objects.filter(pk=record.pk).update(date=todays_date - timedelta(days=days_ago))
+
+    def test_daily_gains(self):
+        """
+        Test computing the average daily gain between consecutive weighings of a cow.
+        """
+        response = self.client.get(
+            reverse("dairy:weight-gain"),
+            {"cow": self.cow.id},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [gain["average_daily_gain"] for gain in response.data] == [
+            Decimal("0.500"),
+            Decimal("0.500"),
+        ]
+        assert response.data[1]["days"] == 30
+        assert response.data[1]["gain_in_kgs"] == Decimal("15.00")
+
+    def test_daily_gains_in_range_keep_previous_weighing(self):
+        """
+        Test the first weighing in the range is compared with the weighing before the range.
+        """
+        response = self.client.get(
+            reverse("dairy:weight-gain"),
+            {"start_date": todays_date - timedelta(days=20)},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+        assert response.data[1]["previous_date"] == todays_date - timedelta(days=30)
+        assert response.data[1]["average_daily_gain"] == Decimal("1.000")
+
+    def test_cohort_percentiles(self):
+        """
+        Test computing the average daily gain percentiles per breed and age band.
+        """
+        response = self.client.get(
+            reverse("dairy:weight-gain-cohorts"),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+        cohort = response.data[0]
+        assert cohort["breed"] == CowBreedChoices.AYRSHIRE
+        assert cohort["age_band"] == "6-12 months"
+        assert cohort["number_of_gains"] == 3
+        assert cohort["p50"] == Decimal("0.500")
+        assert cohort["p90"] == Decimal("0.900")
+
+    def test_weight_gain_as_regular_user_permission_denied(self):
+        """
+        Test retrieving weight gains as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:weight-gain"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestMilkYieldMonitoring:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.regular_user_token = setup_users["regular_user_token"]
+
+        serializer = CowSerializer(data=setup_cows)
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+        # Old enough to be milked, bypassing the category validators
+        Cow.objects.filter(pk=self.cow.pk).update(date_of_birth=todays_date - timedelta(days=900))
+        self.cow.refresh_from_db()
+        Lactation.objects.bulk_create(
+            [Lactation(cow=self.cow, start_date=todays_date - timedelta(days=30))]
+        )
+
+    def test_alert_raised_on_yield_drop(self):
+        """
+        Test recording a milking far below the recent yield of the cow raises an alert.
+        """
+        for amount in ["20.00", "21.00"] * 5:
+            Milk.objects.create(cow=self.cow, amount_in_kgs=Decimal(amount))
+        assert not MilkYieldAlert.objects.exists()
+
+        milk = Milk.objects.create(cow=self.cow, amount_in_kgs=Decimal("8.00"))
+
+        statistics = MilkYieldStatistics.objects.get(cow=self.cow)
+        assert statistics.number_of_milkings == 11
+        alert = MilkYieldAlert.objects.get()
+        assert alert.milk == milk
+        assert alert.z_score < -3
+
+        response = self.client.get(
+            reverse("dairy:milk-yield-alerts-list"),
+            {"cow": self.cow.id, "is_acknowledged": False},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["milk"] == milk.id
+
+        response = self.client.patch(
+            reverse("dairy:milk-yield-alerts-detail", kwargs={"pk": alert.id}),
+            {"is_acknowledged": True, "z_score": "0.00"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        alert.refresh_from_db()
+        assert alert.is_acknowledged
+        assert alert.z_score < -3
+
+    def test_rebuild_milk_yield_statistics(self):
+        """
+        Test replaying imported milk records raises the alerts and keeps acknowledgements.
+        """
+        amounts = ["20.00", "21.00"] * 6 + ["9.00", "20.00"]
+        Milk.objects.bulk_create(
+            [Milk(cow=self.cow, amount_in_kgs=Decimal(amount)) for amount in amounts]
+        )
+
+        out = StringIO()
+        call_command("rebuild_milk_yield_statistics", stdout=out)
+        assert "Rebuilt the milk yield statistics of 1 cow(s)." in out.getvalue()
+        assert MilkYieldStatistics.objects.get(cow=self.cow).number_of_milkings == 14
+
+        alert = MilkYieldAlert.objects.get()
+        assert alert.amount_in_kgs == Decimal("9.00")
+        MilkYieldAlert.objects.filter(pk=alert.pk).update(is_acknowledged=True)
+
+        call_command("rebuild_milk_yield_statistics", "--cow", str(self.cow.id), stdout=StringIO())
+        assert MilkYieldAlert.objects.get().is_acknowledged
+
+    def test_milk_yield_alerts_as_regular_user_permission_denied(self):
+        """
+        Test retrieving milk yield alerts as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:milk-yield-alerts-list"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestDateRangeFilters:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        serializer = CowSerializer(data=setup_cows)
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+
+        # Milkings around the turn of a year whose first days belong to the previous ISO year
+        milking_dates = [
+            datetime(2025, 12, 28, 23, 30),
+            datetime(2025, 12, 29, 0, 30),
+            datetime(2025, 12, 31, 12, 0),
+            datetime(2026, 1, 1, 0, 10),
+            datetime(2026, 1, 4, 23, 59),
+            datetime(2026, 1, 5, 6, 0),
+            datetime(2026, 2, 28, 18, 0),
+            datetime(2026, 3, 1, 0, 0),
+        ]
+        milk_records = Milk.objects.bulk_create(
+            [Milk(cow=self.cow, amount_in_kgs=Decimal("10.00")) for _ in milking_dates]
+        )
+        for milk, milking_date in zip(milk_records, milking_dates):
+            Milk.objects.filter(pk=milk.pk).update(milking_date=timezone.make_aware(milking_date))
+
+    @pytest.mark.parametrize(
+        "params, lookups",
+        [
+            ({"year_of_milking": 2025, "week_of_milking": 1}, {"year": 2025, "week": 1}),
+            ({"year_of_milking": 2026, "week_of_milking": 1}, {"year": 2026, "week": 1}),
+            ({"year_of_milking": 2026, "week_of_milking": 53}, {"year": 2026, "week": 53}),
+            ({"year_of_milking": 2026, "month_of_milking": 2}, {"year": 2026, "month": 2}),
+            ({"year_of_milking": 2026, "day_of_milking": 1}, {"year": 2026, "day": 1}),
+            (
+                {"year_of_milking": 2025, "month_of_milking": 12, "day_of_milking": 31},
+                {"year": 2025, "month": 12, "day": 31},
+            ),
+            ({"year_of_milking": 2026, "month_of_milking": 13}, {"year": 2026, "month": 13}),
+        ],
+    )
+    def test_combined_date_parts_match_extracting_lookups(self, params, lookups):
+        """
+        Test date parts combined with a year select the same milk records as the extracting lookups,
+        filtering ranges of the milking date rather than extracting its parts.
+        """
+        expected_ids = set(
+            Milk.objects.filter(
+                **{f"milking_date__{part}": value for part, value in lookups.items()}
+            ).values_list("id", flat=True)
+        )
+        queryset = MilkFilterSet(params, queryset=Milk.objects.all()).qs
+        assert set(queryset.values_list("id", flat=True)) == expected_ids
+        if not queryset.query.is_empty():
+            assert "extract" not in str(queryset.query).lower()
+
+        response = self.client.get(
+            reverse("dairy:milk-records-list"),
+            params,
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        if expected_ids:
+            assert response.status_code == status.HTTP_200_OK
+            assert {milk["id"] for milk in response.data} == expected_ids
+        else:
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_date_parts_without_year_use_extracting_lookups(self):
+        """
+        Test a month given without a year still selects the month of every year.
+        """
+        queryset = MilkFilterSet({"month_of_milking": 12}, queryset=Milk.objects.all()).qs
+        assert queryset.count() == 3
+
+    def test_filter_milk_records_by_date_range(self):
+        """
+        Test the from and to filters include every milking of the days they are given.
+        """
+        response = self.client.get(
+            reverse("dairy:milk-records-list"),
+            {"milking_date_from": "2025-12-29", "milking_date_to": "2026-01-04"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 4
+
+    def test_filter_lactation_records_by_start_date(self):
+        """
+        Test filtering lactations by year and month and by a start date range.
+        """
+        Lactation.objects.bulk_create(
+            [
+                Lactation(cow=self.cow, start_date=date(2024, 1, 31), end_date=date(2024, 11, 1)),
+                Lactation(cow=self.cow, start_date=date(2025, 1, 15), end_date=date(2025, 11, 1)),
+                Lactation(cow=self.cow, start_date=date(2026, 2, 1)),
+            ]
+        )
+
+        response = self.client.get(
+            reverse("dairy:lactation-records-list"),
+            {"year": 2025, "month": 1},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [lactation["start_date"] for lactation in response.data] == ["2025-01-15"]
+
+        response = self.client.get(
+            reverse("dairy:lactation-records-list"),
+            {"start_date_from": "2024-01-31", "start_date_to": "2025-01-15"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+@pytest.mark.usefixtures("setup_replica_database")
+class TestReplicaRouting:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.farm_manager_token = setup_users["farm_manager_token"]
+        self.cow_data = dict(setup_cows, name="Primary Cow")
+        cache.clear()
+
+        # The replica is a step ahead, only it knows about this cow
+        breed = CowBreed.objects.using("replica").create(name=CowBreedChoices.JERSEY)
+        Cow.objects.using("replica").bulk_create(
+            [
+                Cow(
+                    name="Replica Cow",
+                    breed=breed,
+                    date_of_birth=todays_date - timedelta(days=370),
+                    gender=SexChoices.FEMALE,
+                )
+            ]
+        )
+        self.url = "/dairy/admin/dashboard/total-alive-cows"
+
+    def count_alive_cows(self, token):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Token {token}")
+        assert response.status_code == status.HTTP_200_OK
+        return response.data["total_alive_cows"]
+
+    def list_cow_names(self, token):
+        response = self.client.get(reverse("dairy:cows-list"), HTTP_AUTHORIZATION=f"Token {token}")
+        assert response.status_code == status.HTTP_200_OK
+        return [cow["name"] for cow in response.data]
+
+    def test_dashboard_reads_from_replica(self):
+        """
+        Test dashboard reads are served by the replica while writes go to the primary database.
+        """
+        assert self.count_alive_cows(self.farm_owner_token) == 1
+
+        response = self.client.post(
+            reverse("dairy:cows-list"),
+            self.cow_data,
+            HTTP_AUTHORIZATION=f"Token {self.farm_manager_token}",
+            format="json",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Cow.objects.using("default").filter(name="Primary Cow").exists()
+        assert not Cow.objects.using("replica").filter(name="Primary Cow").exists()
+
+        # Other users keep reading from the replica
+        assert self.list_cow_names(self.farm_owner_token) == ["Replica Cow"]
+
+    def test_reads_stick_to_primary_after_write(self):
+        """
+        Test a user reads their own writes from the primary database until the stickiness expires.
+        """
+        response = self.client.post(
+            reverse("dairy:cows-list"),
+            self.cow_data,
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+            format="json",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert self.list_cow_names(self.farm_owner_token) == ["Primary Cow"]
+        assert self.list_cow_names(self.farm_manager_token) == ["Replica Cow"]
+
+        # The pin expires with its cache entry
+        cache.clear()
+        assert self.list_cow_names(self.farm_owner_token) == ["Replica Cow"]
+
+    def test_falls_back_to_primary_when_replica_unavailable(self, monkeypatch):
+        """
+        Test reads are served by the primary database when the replica cannot be reached.
+        """
+
+        attempts = []
+
+        def refuse_connection():
+            attempts.append(True)
+            raise OperationalError("could not connect to server")
+
+        monkeypatch.setattr(connections["replica"], "ensure_connection", refuse_connection)
+        assert self.count_alive_cows(self.farm_owner_token) == 0
+        # The replica is not tried again until the retry period is over
+        assert self.count_alive_cows(self.farm_owner_token) == 0
+        assert len(attempts) == 1
+
+        monkeypatch.undo()
+        cache.clear()
+        assert self.count_alive_cows(self.farm_owner_token) == 1
+
+
+@pytest.mark.django_db
+class TestMilkArchive:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.regular_user_token = setup_users["regular_user_token"]
+
+        serializer = CowSerializer(data=setup_cows)
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+        Cow.objects.filter(pk=self.cow.pk).update(date_of_birth=todays_date - timedelta(days=1500))
+        self.closed_lactation, self.open_lactation = Lactation.objects.bulk_create(
+            [
+                Lactation(
+                    cow=self.cow,
+                    start_date=todays_date - timedelta(days=500),
+                    end_date=todays_date - timedelta(days=400),
+                ),
+                Lactation(
+                    cow=self.cow,
+                    start_date=todays_date - timedelta(days=30),
+                    lactation_number=2,
+                ),
+            ]
+        )
+
+        milkings = [
+            (self.closed_lactation, 450, "10.00"),
+            (self.closed_lactation, 450, "12.50"),
+            (self.closed_lactation, 420, "11.00"),
+            (self.open_lactation, 10, "20.00"),
+            (self.open_lactation, 5, "21.00"),
+        ]
+        self.milk_records = Milk.objects.bulk_create(
+            [
+                Milk(cow=self.cow, lactation=lactation, amount_in_kgs=Decimal(amount))
+                for lactation, _, amount in milkings
+            ]
+        )
+        for milk, (_, days_ago, _) in zip(self.milk_records, milkings):
+            Milk.objects.filter(pk=milk.pk).update(
+                milking_date=start_of_day(todays_date - timedelta(days=days_ago)) + timedelta(hours=6)
+            )
+        self.alert = MilkYieldAlert.objects.create(
+            cow=self.cow,
+            milk=self.milk_records[2],
+            milking_date=timezone.now() - timedelta(days=420),
+            amount_in_kgs=Decimal("11.00"),
+            expected_amount_in_kgs=Decimal("20.00"),
+            z_score=Decimal("-4.00"),
+        )
+
+    def test_archive_closed_lactations(self):
+        """
+        Test archiving moves the milk of lactations closed before the horizon with daily rollups.
+        """
+        out = StringIO()
+        call_command("archive_milk", stdout=out)
+        assert "Archived 3 milk record(s) of 1 lactation(s)." in out.getvalue()
+
+        assert set(Milk.objects.values_list("lactation", flat=True)) == {self.open_lactation.id}
+        assert set(ArchivedMilk.objects.values_list("id", flat=True)) == {
+            milk.id for milk in self.milk_records[:3]
+        }
+        rollups = MilkRollup.objects.filter(lactation=self.closed_lactation).order_by("date")
+        assert [
+            (rollup.date, rollup.number_of_milkings, rollup.total_amount_in_kgs)
+            for rollup in rollups
+        ] == [
+            (todays_date - timedelta(days=450), 2, Decimal("22.50")),
+            (todays_date - timedelta(days=420), 1, Decimal("11.00")),
+        ]
+
+        self.alert.refresh_from_db()
+        assert self.alert.milk is None
+        assert self.alert.amount_in_kgs == Decimal("11.00")
+
+        out = StringIO()
+        call_command("archive_milk", stdout=out)
+        assert "Archived 0 milk record(s) of 0 lactation(s)." in out.getvalue()
+
+    def test_archive_horizon(self):
+        """
+        Test lactations closed after the horizon, and open lactations, stay in the milk records.
+        """
+        out = StringIO()
+        call_command("archive_milk", "--horizon-days", "500", stdout=out)
+        assert "Archived 0 milk record(s) of 0 lactation(s)." in out.getvalue()
+        assert Milk.objects.count() == 5
+
+        with pytest.raises(CommandError):
+            call_command("archive_milk", "--horizon-days", "-1")
+
+    def test_milk_production_spans_archive(self):
+        """
+        Test the daily milk production is the same before and after archiving.
+        """
+        url = reverse("dairy:milk-production")
+        authorization = f"Token {self.farm_owner_token}"
+        before = self.client.get(url, HTTP_AUTHORIZATION=authorization)
+        assert before.status_code == status.HTTP_200_OK
+        assert len(before.data) == 4
+
+        MilkArchive.archive()
+
+        after = self.client.get(url, HTTP_AUTHORIZATION=authorization)
+        assert after.status_code == status.HTTP_200_OK
+        assert after.data == before.data
+        assert after.data[0]["number_of_milkings"] == 2
+        assert after.data[0]["total_amount_in_kgs"] == Decimal("22.50")
+
+        response = self.client.get(
+            url,
+            {"start_date": todays_date - timedelta(days=420), "end_date": todays_date - timedelta(days=10)},
+            HTTP_AUTHORIZATION=authorization,
+        )
+        assert [total["date"] for total in response.data] == [
+            todays_date - timedelta(days=420),
+            todays_date - timedelta(days=10),
+        ]
+
+    def test_recent_ranges_skip_archive(self, django_assert_num_queries):
+        """
+        Test the archived records are only read when the range starts before the archived milk.
+        """
+        MilkArchive.archive()
+
+        records = MilkArchive.records(start_date=todays_date - timedelta(days=30))
+        assert "dairy_archivedmilk" not in str(records.query)
+        assert [record["id"] for record in records] == [milk.id for milk in self.milk_records[3:]]
+        # The hot totals and the check for rollups in the range
+        with django_assert_num_queries(2):
+            assert len(MilkArchive.daily_totals(start_date=todays_date - timedelta(days=30))) == 2
+
+        records = MilkArchive.records(start_date=todays_date - timedelta(days=430))
+        assert "dairy_archivedmilk" in str(records.query)
+        assert [record["id"] for record in records] == [milk.id for milk in self.milk_records[2:]]
+
+    def test_milk_production_as_regular_user_permission_denied(self):
+        """
+        Test retrieving the milk production as a regular user (permission denied).
+        """
+        response = self.client.get(
+            reverse("dairy:milk-production"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestFarmTenancy:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows):
+        from users.models import CustomUser, Farm
+
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.farm_manager_token = setup_users["farm_manager_token"]
+        self.general_cow = setup_cows
+
+        # The owner and the manager work on two different farms
+        self.farm, self.other_farm = Farm.objects.bulk_create(
+            [Farm(name="Green Pastures"), Farm(name="Hill Top")]
+        )
+        CustomUser.objects.filter(pk=setup_users["farm_owner_user_id"]).update(farm=self.farm)
+        CustomUser.objects.filter(pk=setup_users["farm_manager_user_id"]).update(
+            farm=self.other_farm
+        )
+
+    def add_cow(self, token, name):
+        response = self.client.post(
+            reverse("dairy:cows-list"),
+            data={**self.general_cow, "name": name},
+            format="json",
+            HTTP_AUTHORIZATION=f"Token {token}",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        return Cow.objects.get(pk=response.data["id"])
+
+    def test_cows_are_scoped_to_the_farm_of_the_user(self):
+        """
+        Test the cows added by a user belong to their farm and are hidden from the other farms.
+        """
+        cow = self.add_cow(self.farm_owner_token, "Daisy")
+        other_cow = self.add_cow(self.farm_manager_token, "Bella")
+        assert cow.farm == self.farm
+        assert other_cow.farm == self.other_farm
+        # Outside the views every farm is visible
+        assert Cow.objects.count() == 2
+
+        response = self.client.get(
+            reverse("dairy:cows-list"), HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [cow["id"] for cow in response.data] == [cow.id]
+
+        response = self.client.get(
+            reverse("dairy:cows-detail", kwargs={"pk": cow.id}),
+            HTTP_AUTHORIZATION=f"Token {self.farm_manager_token}",
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_records_can_not_reference_the_cows_of_another_farm(self):
+        """
+        Test a user can not record a weight for a cow of another farm.
+        """
+        cow = self.add_cow(self.farm_owner_token, "Daisy")
+        response = self.client.post(
+            reverse("dairy:weight-records-list"),
+            data={"cow": cow.id, "weight_in_kgs": 100},
+            format="json",
+            HTTP_AUTHORIZATION=f"Token {self.farm_manager_token}",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "cow" in response.data
+
+    def test_mating_ranking_is_scoped_to_the_farm(self):
+        """
+        Test the bulls of the mating ranking and the cows they are ranked for belong to the farm of
+        the user.
+        """
+        cow = self.add_cow(self.farm_owner_token, "Daisy")
+        bull = self.add_cow(self.farm_owner_token, "Bull")
+        other_bull = self.add_cow(self.farm_manager_token, "Other Bull")
+        Cow.objects.filter(pk__in=[bull.pk, other_bull.pk]).update(gender=SexChoices.MALE)
+
+        response = self.client.get(
+            reverse("dairy:mating-ranking"), HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [
+            (ranking["dam"], [sire["sire"] for sire in ranking["sires"]]) for ranking in response.data
+        ] == [(cow.pk, [bull.pk])]
+
+        response = self.client.get(
+            reverse("dairy:mating-ranking"), HTTP_AUTHORIZATION=f"Token {self.farm_manager_token}"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == []
+
+    def test_pedigree_is_scoped_to_the_farm(self):
+        """
+        Test the sires and dams of another farm, or without a farm, are left out of the pedigree.
+        """
+        cow = self.add_cow(self.farm_owner_token, "Daisy")
+        dam = self.add_cow(self.farm_owner_token, "Dam")
+        sire = self.add_cow(self.farm_manager_token, "Sire")
+        Cow.objects.filter(pk=sire.pk).update(gender=SexChoices.MALE, farm=None)
+        Cow.objects.filter(pk=cow.pk).update(sire=sire, dam=dam)
+
+        response = self.client.get(
+            reverse("dairy:cows-pedigree", kwargs={"pk": cow.pk}),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["sire"] is None
+        assert response.data["dam"]["id"] == dam.pk
+
+        response = self.client.get(
+            reverse("dairy:cows-pedigree", kwargs={"pk": dam.pk}),
+            {"direction": "descendants"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert [offspring["id"] for offspring in response.data["offspring"]] == [cow.pk]
+
+    def test_inventories_are_kept_per_farm(self, monkeypatch):
+        """
+        Test each farm has its own cow and milk inventories.
+        """
+        from dairy.validators import MilkValidator
+        from dairy_inventory.models import CowInventory, MilkInventory
+
+        cow = self.add_cow(self.farm_owner_token, "Daisy")
+        self.add_cow(self.farm_manager_token, "Bella")
+        self.add_cow(self.farm_manager_token, "Luna")
+        cow_inventories = CowInventory.objects.all_farms()
+        assert cow_inventories.get(farm=self.farm).total_number_of_cows == 1
+        assert cow_inventories.get(farm=self.other_farm).total_number_of_cows == 2
+
+        monkeypatch.setattr(MilkValidator, "validate_cow_eligibility", staticmethod(lambda cow: None))
+        Lactation.objects.bulk_create([Lactation(cow=cow, start_date=todays_date - timedelta(days=30))])
+        Milk.objects.create(cow=cow, amount_in_kgs=Decimal("12.50"))
+        milk_inventory = MilkInventory.objects.all_farms().get(farm=self.farm)
+        assert milk_inventory.total_amount_in_kgs == Decimal("12.50")
+        assert not MilkInventory.objects.all_farms().filter(farm=self.other_farm).exists()
+
+    def test_one_inventory_without_farm(self):
+        """
+        Test the records without a farm have a single milk inventory, NULLs being distinct in
+        unique indexes.
+        """
+        from dairy_inventory.models import MilkInventory
+
+        MilkInventory.objects.all_farms().get_or_create(farm=None)
+        with pytest.raises(IntegrityError), transaction.atomic():
+            MilkInventory.objects.create()
+
+
+@pytest.mark.django_db
+class TestSearch:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows, setup_inseminators_data):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.farm_manager_token = setup_users["farm_manager_token"]
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_user_id = setup_users["farm_owner_user_id"]
+
+        serializer = CowSerializer(data=dict(setup_cows, name="Daisy"))
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+        serializer = InseminatorSerializer(data=setup_inseminators_data)
+        assert serializer.is_valid()
+        self.inseminator = serializer.save()
+
+        self.disease = Disease.objects.create(
+            name="Mastitis",
+            pathogen=Pathogen.objects.create(name="Bacteria"),
+            categories=DiseaseCategory.objects.create(name="Infectious"),
+            occurrence_date=todays_date,
+            notes="Inflammation of the udder",
+        )
+        self.treatment = Treatment.objects.create(
+            disease=self.disease,
+            cow=self.cow,
+            treatment_method="Antibiotics",
+            notes="Swollen udder, milk discarded for three days",
+        )
+
+    def search(self, params, token=None):
+        response = self.client.get(
+            reverse("dairy:search"),
+            params,
+            HTTP_AUTHORIZATION=f"Token {token or self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return [(result["type"], result["id"]) for result in response.data]
+
+    def test_search_ranks_matches(self):
+        """
+        Test partial words match and the records named after the words come first.
+        """
+        assert self.search({"q": "dai"}) == [("Cow", self.cow.id), ("Treatment", self.treatment.id)]
+        assert self.search({"q": "udder"}) == [
+            ("Disease", self.disease.id),
+            ("Treatment", self.treatment.id),
+        ]
+        assert self.search({"q": "peter breeders"}) == [("Inseminator", self.inseminator.id)]
+        assert self.search({"q": "dai", "type": "Treatment"}) == [("Treatment", self.treatment.id)]
+        assert self.search({"q": "daisy mastitis"}) == [("Treatment", self.treatment.id)]
+        assert self.search({"q": "?!"}) == []
+
+    def test_search_index_kept_in_sync(self):
+        """
+        Test renaming, editing and deleting records updates their search results.
+        """
+        self.cow.name = "Clover"
+        self.cow.save()
+        assert self.search({"q": "daisy"}) == []
+        assert self.search({"q": "clover"}) == [
+            ("Cow", self.cow.id),
+            ("Treatment", self.treatment.id),
+        ]
+
+        self.treatment.notes = ""
+        self.treatment.save()
+        assert self.search({"q": "swollen"}) == []
+
+        self.disease.delete()
+        assert self.search({"q": "mastitis"}) == []
+
+    def test_search_scoped_to_farm(self):
+        """
+        Test the records of another farm, its diseases included, are not found, unlike the shared
+        inseminators.
+        """
+        from users.models import CustomUser, Farm
+
+        farm = Farm.objects.create(name="Green Pastures")
+        CustomUser.objects.filter(pk=self.farm_owner_user_id).update(farm=farm)
+        Cow.objects.filter(pk=self.cow.pk).update(farm=farm)
+        Disease.objects.filter(pk=self.disease.pk).update(farm=farm)
+        SearchIndex.rebuild()
+
+        assert self.search({"q": "daisy"}) == [("Cow", self.cow.id), ("Treatment", self.treatment.id)]
+        assert self.search({"q": "daisy"}, token=self.farm_manager_token) == []
+        assert self.search({"q": "mastitis"}) == [
+            ("Disease", self.disease.id),
+            ("Treatment", self.treatment.id),
+        ]
+        assert self.search({"q": "udder"}, token=self.farm_manager_token) == []
+        assert self.search({"q": "evance"}, token=self.farm_manager_token) == [
+            ("Inseminator", self.inseminator.id)
+        ]
+
+    def test_rebuild_search_index(self):
+        """
+        Test the command indexes the records missing from the search index.
+        """
+        SearchDocument.objects.all().delete()
+        assert self.search({"q": "daisy"}) == []
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        assert "Indexed 4 record(s)." in out.getvalue()
+        assert self.search({"q": "daisy"}) == [("Cow", self.cow.id), ("Treatment", self.treatment.id)]
+
+    def test_search_without_query(self):
+        response = self.client.get(
+            reverse("dairy:search"), HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_search_as_regular_user_permission_denied(self):
+        response = self.client.get(
+            reverse("dairy:search"),
+            {"q": "daisy"},
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestPrefixFilters:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_cows, setup_inseminators_data):
+        self.client = setup_users["client"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        serializer = CowSerializer(data=setup_cows)
+        assert serializer.is_valid()
+        self.cow = serializer.save()
+        serializer = InseminatorSerializer(
+            data=dict(setup_inseminators_data, first_name="José", last_name="Ñúñez  Ruiz")
+        )
+        assert serializer.is_valid()
+        self.inseminator = serializer.save()
+
+    def test_tag_number_is_stored(self):
+        """
+        Test the tag number is stored once the cow is inserted and follows its date of birth.
+        """
+        tag_number = f"AY-{self.cow.date_of_birth.year}-{self.cow.id}"
+        assert Cow.objects.values_list("tag_number", flat=True).get(pk=self.cow.pk) == tag_number
+
+        self.cow.date_of_birth = self.cow.date_of_birth - timedelta(days=400)
+        self.cow.save()
+        assert Cow.objects.get(pk=self.cow.pk).tag_number == (
+            f"AY-{self.cow.date_of_birth.year}-{self.cow.id}"
+        )
+
+    def test_filter_by_tag_number_prefix(self):
+        """
+        Test tag numbers are matched by prefix whatever their case, through an index range.
+        """
+        prefix = self.cow.tag_number[:7].lower()
+        queryset = CowFilterSet({"tag_number_prefix": prefix}, queryset=Cow.objects.all()).qs
+        assert list(queryset) == [self.cow]
+        assert " like " not in str(queryset.query).lower()
+        assert not CowFilterSet({"tag_number_prefix": "2"}, queryset=Cow.objects.all()).qs.exists()
+
+        Milk.objects.bulk_create([Milk(cow=self.cow, amount_in_kgs=Decimal("10.00"))])
+        response = self.client.get(
+            reverse("dairy:milk-records-list"),
+            {"cow_prefix": prefix},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+    def test_filter_inseminators_by_normalized_name(self):
+        """
+        Test names are matched ignoring accents and case, and are not returned.
+        """
+        for params, found in [
+            ({"first_name": "JOSE"}, True),
+            ({"first_name": "ose"}, True),
+            ({"first_name_prefix": "jos"}, True),
+            ({"last_name_prefix": "nunez r"}, True),
+            ({"last_name_prefix": "Ñú", "first_name": "José"}, True),
+            ({"first_name_prefix": "ose"}, False),
+        ]:
+            response = self.client.get(
+                reverse("dairy:inseminator-records-list"),
+                params,
+                HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+            )
+            if found:
+                assert response.status_code == status.HTTP_200_OK
+                assert [inseminator["id"] for inseminator in response.data] == [self.inseminator.id]
+                assert "normalized_first_name" not in response.data[0]
+            else:
+                assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        insemination = Insemination.objects.bulk_create(
+            [Insemination(cow=self.cow, inseminator=self.inseminator)]
+        )[0]
+        for params in [{"inseminator": "sé"}, {"inseminator_prefix": "Jo"}]:
+            queryset = InseminationFilterSet(params, queryset=Insemination.objects.all()).qs
+            assert list(queryset) == [insemination]
+
+    def test_filter_by_tag_number_substring(self):
+        """
+        Test tag numbers are matched by any part of them whatever their case, such as their year.
+        """
+        year = str(self.cow.date_of_birth.year)
+        for params in [{"tag_number": year}, {"tag_number": f"ay-{year}"}]:
+            queryset = CowFilterSet(params, queryset=Cow.objects.all()).qs
+            assert list(queryset) == [self.cow]
+        assert not CowFilterSet({"tag_number_prefix": year}, queryset=Cow.objects.all()).qs.exists()
+
+        Pregnancy.objects.bulk_create([Pregnancy(cow=self.cow, start_date=todays_date)])
+        response = self.client.get(
+            reverse("dairy:pregnancy-records-list"),
+            {"cow": year},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+    def test_filter_pregnancies_by_choice(self):
+        """
+        Test statuses and outcomes match the choices containing the value given.
+        """
+        confirmed, unconfirmed, failed = Pregnancy.objects.bulk_create(
+            [
+                Pregnancy(cow=self.cow, start_date=todays_date, pregnancy_status=pregnancy_status)
+                for pregnancy_status in [
+                    PregnancyStatusChoices.CONFIRMED,
+                    PregnancyStatusChoices.UNCONFIRMED,
+                    PregnancyStatusChoices.FAILED,
+                ]
+            ]
+        )
+        Pregnancy.objects.filter(pk=failed.pk).update(
+            pregnancy_outcome=PregnancyOutcomeChoices.MISCARRIAGE
+        )
+
+        def filtered(params):
+            queryset = PregnancyFilterSet(params, queryset=Pregnancy.objects.all()).qs
+            return set(queryset.values_list("id", flat=True))
+
+        assert filtered({"pregnancy_status": "CONFIRM"}) == {confirmed.id, unconfirmed.id}
+        assert filtered({"pregnancy_status": "failed"}) == {failed.id}
+        assert filtered({"pregnancy_outcome": "carriage"}) == {failed.id}
+        assert filtered({"pregnancy_status": "pending"}) == set()
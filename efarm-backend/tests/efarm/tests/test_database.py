@@ -0,0 +1,107 @@
+from pathlib import Path
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from efarm.backends.sqlite3.base import DatabaseWrapper
+from efarm.database import database_settings, databases
+
+BASE_DIR = Path("/srv/efarm")
+
+
+class TestDatabaseSettings:
+    def test_defaults_to_sqlite_file(self):
+        settings = database_settings(BASE_DIR, environ={})
+        assert settings["ENGINE"] == "efarm.backends.sqlite3"
+        assert settings["NAME"] == BASE_DIR / "db.sqlite3"
+        assert settings["CONN_MAX_AGE"] == 0
+
+    def test_postgresql_keeps_connections_open(self):
+        settings = database_settings(
+            BASE_DIR,
+            environ={
+                "EFARM_DB_ENGINE": "postgresql",
+                "EFARM_DB_NAME": "farm",
+                "EFARM_DB_USER": "efarm",
+                "EFARM_DB_HOST": "db",
+            },
+        )
+        assert settings["ENGINE"] == "django.db.backends.postgresql"
+        assert (settings["NAME"], settings["USER"], settings["HOST"], settings["PORT"]) == (
+            "farm",
+            "efarm",
+            "db",
+            "5432",
+        )
+        assert settings["CONN_MAX_AGE"] == 60
+        assert settings["CONN_HEALTH_CHECKS"] is True
+        assert settings["DISABLE_SERVER_SIDE_CURSORS"] is False
+
+    def test_postgresql_behind_transaction_pooler(self):
+        settings = database_settings(
+            BASE_DIR,
+            environ={
+                "EFARM_DB_ENGINE": "postgresql",
+                "EFARM_DB_CONN_MAX_AGE": "0",
+                "EFARM_DB_TRANSACTION_POOLING": "true",
+            },
+        )
+        assert settings["CONN_MAX_AGE"] == 0
+        assert settings["CONN_HEALTH_CHECKS"] is False
+        assert settings["DISABLE_SERVER_SIDE_CURSORS"] is True
+
+    @pytest.mark.parametrize(
+        "environ",
+        [
+            {"EFARM_DB_ENGINE": "mysql"},
+            {"EFARM_DB_ENGINE": "postgresql", "EFARM_DB_CONN_MAX_AGE": "forever"},
+        ],
+    )
+    def test_invalid_settings(self, environ):
+        with pytest.raises(ImproperlyConfigured):
+            database_settings(BASE_DIR, environ=environ)
+
+    def test_without_replica(self):
+        assert list(databases(BASE_DIR, environ={})) == ["default"]
+
+    def test_replica_shares_default_settings(self):
+        settings = databases(
+            BASE_DIR,
+            environ={
+                "EFARM_DB_ENGINE": "postgresql",
+                "EFARM_DB_USER": "efarm",
+                "EFARM_DB_REPLICA_HOST": "replica.local",
+            },
+        )
+        assert settings["replica"]["HOST"] == "replica.local"
+        assert settings["replica"]["USER"] == "efarm"
+        assert settings["replica"]["NAME"] == settings["default"]["NAME"]
+        assert settings["replica"]["TEST"] == {"MIRROR": "default"}
+        assert settings["default"]["HOST"] == "localhost"
+
+
+@pytest.mark.django_db
+class TestSQLiteProfile:
+    def test_pragmas_applied_on_connection(self, tmp_path):
+        """
+        Test new connections are switched to WAL and tuned, with `OPTIONS` overriding the profile.
+        """
+        wrapper = DatabaseWrapper(
+            dict(
+                connection.settings_dict,
+                ENGINE="efarm.backends.sqlite3",
+                NAME=str(tmp_path / "efarm.sqlite3"),
+                OPTIONS={"pragmas": {"busy_timeout": 2500}},
+            )
+        )
+        try:
+            with wrapper.cursor() as cursor:
+                pragmas = {
+                    name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                    for name in ["journal_mode", "busy_timeout", "synchronous", "temp_store"]
+                }
+        finally:
+            wrapper.close()
+        # synchronous 1 is NORMAL and temp_store 2 is MEMORY
+        assert pragmas == {"journal_mode": "wal", "busy_timeout": 2500, "synchronous": 1, "temp_store": 2}
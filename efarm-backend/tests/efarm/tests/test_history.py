@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from dairy.analytics import start_of_day
+from dairy.choices import CowPenCategoriesChoices, CowPenTypeChoices
+from dairy.models import Barn, CowPen
+from dairy_inventory.models import (
+    BarnInventory,
+    BarnInventoryHistory,
+    CowInventoryUpdateHistory,
+    CowPenHistory,
+)
+from efarm.history import compact_history, record_history
+
+
+@pytest.mark.django_db
+class TestHistoryDeduplication:
+    def test_unchanged_snapshot_is_not_recorded(self):
+        assert record_history(CowInventoryUpdateHistory, farm_id=None, number_of_cows=3)
+        assert record_history(CowInventoryUpdateHistory, farm_id=None, number_of_cows=3) is None
+        assert record_history(CowInventoryUpdateHistory, farm_id=None, number_of_cows=4)
+        assert list(CowInventoryUpdateHistory.objects.values_list("number_of_cows", flat=True)) == [3, 4]
+
+    def test_snapshots_are_compared_per_inventory(self):
+        barn = Barn.objects.create(name="Barn", capacity=10)
+        other_barn = Barn.objects.create(name="Other barn", capacity=10)
+        for inventory in BarnInventory.objects.filter(barn__in=[barn, other_barn]):
+            assert record_history(BarnInventoryHistory, barn_inventory=inventory, number_of_cows=0)
+        assert BarnInventoryHistory.objects.count() == 2
+
+    def test_saving_an_unchanged_pen_records_no_history(self):
+        barn = Barn.objects.create(name="Barn", capacity=10)
+        pen = CowPen.objects.create(
+            barn=barn, type=CowPenTypeChoices.Movable, category=CowPenCategoriesChoices.Calf_Pen
+        )
+        pen.save()
+        pen.save()
+        assert CowPenHistory.objects.filter(pen=pen).count() == 1
+
+        pen.type = CowPenTypeChoices.Fixed
+        pen.save()
+        assert CowPenHistory.objects.filter(pen=pen).count() == 2
+
+
+@pytest.mark.django_db
+class TestHistoryCompaction:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.barn = Barn.objects.create(name="Barn", capacity=10)
+        self.inventory = BarnInventory.objects.get(barn=self.barn)
+        today = timezone.localdate()
+        # Snapshots as (days ago, hour, number of cows), as written before deduplication existed
+        snapshots = [
+            (200, 8, 1),
+            (200, 10, 2),
+            (200, 12, 3),
+            (150, 12, 3),
+            (120, 12, 3),
+            (100, 12, 4),
+            (10, 8, 4),
+            (10, 9, 5),
+            (10, 10, 5),
+            (5, 12, 4),
+        ]
+        BarnInventoryHistory.objects.bulk_create(
+            [
+                BarnInventoryHistory(barn_inventory=self.inventory, number_of_cows=number_of_cows)
+                for _, _, number_of_cows in snapshots
+            ]
+        )
+        for history, (days_ago, hour, _) in zip(BarnInventoryHistory.objects.order_by("id"), snapshots):
+            BarnInventoryHistory.objects.filter(pk=history.pk).update(
+                timestamp=start_of_day(today - timedelta(days=days_ago)) + timedelta(hours=hour)
+            )
+
+    def test_compact_history(self):
+        """
+        Test old snapshots are downsampled to their day and repeated snapshots are deleted.
+        """
+        assert compact_history(BarnInventoryHistory, full_resolution_days=90) == 6
+        assert list(
+            BarnInventoryHistory.objects.order_by("timestamp").values_list("number_of_cows", flat=True)
+        ) == [3, 4, 5, 4]
+        assert compact_history(BarnInventoryHistory, full_resolution_days=90) == 0
+
+    def test_compact_inventory_history_command(self):
+        out = StringIO()
+        call_command(
+            "compact_inventory_history",
+            "--model",
+            "dairy_inventory.BarnInventoryHistory",
+            "--full-resolution-days",
+            "365",
+            stdout=out,
+        )
+        assert "Deleted 4 snapshot(s) of dairy_inventory.BarnInventoryHistory." in out.getvalue()
+        assert BarnInventoryHistory.objects.count() == 6
+
+        with pytest.raises(CommandError):
+            call_command("compact_inventory_history", "--model", "dairy.Barn")
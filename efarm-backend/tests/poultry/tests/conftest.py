@@ -299,3 +299,31 @@ def setup_flock_breed_information_data():
     }
 
     return {"flock_breed_information_data": flock_breed_information_data}
+
+
+@pytest.fixture()
+@pytest.mark.django_db
+def setup_egg_collection_data():
+    housing_structure_data = {
+        "house_type": HousingStructureTypeChoices.DEEP_LITTER_HOUSE,
+        "category": HousingStructureCategoryChoices.LAYERS_HOUSE,
+    }
+
+    serializer1 = HousingStructureSerializer(data=housing_structure_data)
+    serializer1.is_valid()
+    housing_structure = serializer1.save()
+
+    flock_data = {
+        "source": {"name": FlockSourceChoices.KEN_CHICK},
+        "breed": {"name": FlockBreedTypeChoices.KENBRO},
+        "date_of_hatching": todays_date - timedelta(weeks=20),
+        "chicken_type": ChickenTypeChoices.LAYERS,
+        "initial_number_of_birds": 200,
+        "current_rearing_method": RearingMethodChoices.DEEP_LITTER,
+        "current_housing_structure": housing_structure.id,
+    }
+    serializer2 = FlockSerializer(data=flock_data)
+    serializer2.is_valid()
+    flock = serializer2.save()
+
+    return {"flock": flock}
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from poultry.models import *
+
+
+@pytest.mark.django_db
+class TestHotQueryPlans:
+    """
+    Captures the query plans of the most frequent lookups on the flock history tables and checks
+    they are served by an index rather than a full table scan.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        if connection.vendor == "postgresql":
+            # Empty tables are cheaper to scan, make the planner show the index it would use
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    @staticmethod
+    def assert_uses_index(queryset, index_name):
+        plan = queryset.explain()
+        assert index_name in plan, plan
+
+    def test_egg_collections_of_flock_on_date(self):
+        queryset = EggCollection.objects.filter(flock_id=1, date=timezone.localdate())
+        self.assert_uses_index(queryset, "egg_collection_flock_date_idx")
+
+    def test_inspections_of_flock_in_range(self):
+        queryset = FlockInspectionRecord.objects.filter(
+            flock_id=1, date_of_inspection__gte=timezone.now() - timedelta(days=1)
+        ).order_by("-date_of_inspection")
+        self.assert_uses_index(queryset, "inspection_flock_date_idx")
@@ -1,5 +1,10 @@
+from datetime import datetime
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
 from poultry.serializers import *
@@ -2265,6 +2270,43 @@ class TestFlockInspectionViewSet:
         )
         assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
 
+    def test_filter_flock_inspections_by_date(self):
+        """
+        Test filtering flock inspection records by year and week and by a date range.
+        """
+        inspection_dates = [
+            datetime(2025, 12, 28, 23, 30),
+            datetime(2025, 12, 29, 0, 30),
+            datetime(2026, 1, 4, 23, 59),
+            datetime(2026, 1, 5, 6, 0),
+        ]
+        inspection_ids = []
+        for inspection_date in inspection_dates:
+            serializer = FlockInspectionRecordSerializer(data=self.flock_inspection_data)
+            serializer.is_valid()
+            flock_inspection = serializer.save()
+            FlockInspectionRecord.objects.filter(pk=flock_inspection.pk).update(
+                date_of_inspection=timezone.make_aware(inspection_date)
+            )
+            inspection_ids.append(flock_inspection.id)
+
+        # The last days of 2025 belong to the first ISO week of 2026
+        response = self.client.get(
+            reverse("poultry:flock-inspection-records-list"),
+            {"year_of_inspection": 2025, "week_of_inspection": 1},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [inspection["id"] for inspection in response.data] == inspection_ids[1:2]
+
+        response = self.client.get(
+            reverse("poultry:flock-inspection-records-list"),
+            {"date_of_inspection_from": "2025-12-29", "date_of_inspection_to": "2026-01-04"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(inspection["id"] for inspection in response.data) == inspection_ids[1:3]
+
 
 @pytest.mark.django_db
 class TestFlockBreedInformationViewSet:
@@ -2689,3 +2731,170 @@ class TestFlockBreedInformationViewSet:
             format="json"
         )
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestEggProductionAnalyticsView:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_egg_collection_data):
+        self.client = setup_users["client"]
+
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+        self.flock = setup_egg_collection_data["flock"]
+
+        # Backdate the inventory snapshot so it covers the whole test week
+        FlockInventoryHistory.objects.update(date=todays_date - timedelta(days=14))
+
+        for days_ago, collected_eggs, broken_eggs in [(1, 150, 3), (0, 100, 2)]:
+            egg_collection = EggCollection.objects.create(
+                flock=self.flock, collected_eggs=collected_eggs, broken_eggs=broken_eggs
+            )
+            EggCollection.objects.filter(pk=egg_collection.pk).update(
+                date=todays_date - timedelta(days=days_ago)
+            )
+
+        # A mid-period inspection reduces the live bird count for today
+        FlockInventoryHistory.objects.create(
+            flock_inventory=self.flock.inventory,
+            date=todays_date,
+            number_of_birds=100,
+            mortality_rate=50,
+        )
+
+    def test_daily_egg_production_as_farm_owner(self):
+        """
+        Test the daily hen-day production series is joined against the bird count of each date.
+        """
+        response = self.client.get(
+            reverse("poultry:egg-production-analytics"),
+            {"flock": self.flock.id},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+
+        yesterday, today = response.data
+        assert yesterday["date"] == todays_date - timedelta(days=1)
+        assert yesterday["hen_days"] == 200
+        assert yesterday["hen_day_production"] == Decimal("75.00")
+        assert yesterday["broken_egg_ratio"] == Decimal("2.00")
+        assert yesterday["eggs_per_hen_housed"] == Decimal("0.750")
+        assert today["hen_days"] == 100
+        assert today["hen_day_production"] == Decimal("100.00")
+
+    def test_weekly_egg_production_as_farm_owner(self):
+        """
+        Test the weekly series sums eggs and hen-days of the days in each week.
+        """
+        response = self.client.get(
+            reverse("poultry:egg-production-analytics"),
+            {"flock": self.flock.id, "period": "week", "start_date": todays_date},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+        assert response.data[0]["collected_eggs"] == 100
+        assert response.data[0]["week_start"] == todays_date - timedelta(days=todays_date.weekday())
+
+    def test_egg_production_with_invalid_date_range(self):
+        """
+        Test requesting a series whose start date is after its end date (should be rejected).
+        """
+        response = self.client.get(
+            reverse("poultry:egg-production-analytics"),
+            {"start_date": todays_date, "end_date": todays_date - timedelta(days=1)},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_egg_production_as_regular_user_permission_denied(self):
+        """
+        Test retrieving egg production analytics by a regular user (should be denied).
+        """
+        response = self.client.get(
+            reverse("poultry:egg-production-analytics"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestFlockMortalityCurveViewSet:
+    @pytest.fixture(autouse=True)
+    def setup(self, setup_users, setup_flock_inspection_data):
+        self.client = setup_users["client"]
+
+        self.regular_user_token = setup_users["regular_user_token"]
+        self.farm_owner_token = setup_users["farm_owner_token"]
+
+        serializer = FlockInspectionRecordSerializer(data=setup_flock_inspection_data["flock_inspection_data"])
+        serializer.is_valid()
+        self.flock_inspection = serializer.save()
+        self.flock = self.flock_inspection.flock
+
+    def test_list_mortality_curves_before_computation(self):
+        """
+        Test listing mortality curves before the nightly computation has run.
+        """
+        response = self.client.get(
+            reverse("poultry:flock-mortality-curves-list"),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"detail": "No flock mortality curves computed yet."}
+
+    def test_computed_mortality_curve_as_farm_owner(self):
+        """
+        Test the computed curve is overlaid with the expected mortality of the chicken type.
+        """
+        call_command("compute_flock_mortality_curves", stdout=StringIO())
+
+        response = self.client.get(
+            reverse("poultry:flock-mortality-curves-detail", kwargs={"pk": self.flock.mortality_curve.pk}),
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["cumulative_mortality_rate"] == "1.67"
+        assert response.data["expected_mortality_rate"] == "0.10"
+        assert response.data["deviation"] == "1.57"
+        assert response.data["is_deviating"] is False
+        assert len(response.data["weekly_mortality"]) == 1
+        assert response.data["weekly_mortality"][0]["dead_birds"] == 5
+        assert response.data["weekly_mortality"][0]["age_in_weeks"] == 3
+
+    def test_filter_deviating_flocks(self):
+        """
+        Test flocks whose mortality exceeds the expected curve beyond the threshold are flagged.
+        """
+        call_command("compute_flock_mortality_curves", "--threshold", "1.00", stdout=StringIO())
+
+        response = self.client.get(
+            reverse("poultry:flock-mortality-curves-list"),
+            {"is_deviating": "true"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+        assert response.data[0]["flock"] == self.flock.id
+
+        # Recomputing with a wider threshold updates the existing curve in place
+        call_command("compute_flock_mortality_curves", stdout=StringIO())
+        assert FlockMortalityCurve.objects.count() == 1
+
+        response = self.client.get(
+            reverse("poultry:flock-mortality-curves-list"),
+            {"is_deviating": "true"},
+            HTTP_AUTHORIZATION=f"Token {self.farm_owner_token}",
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_list_mortality_curves_as_regular_user_permission_denied(self):
+        """
+        Test listing mortality curves by a regular user (should be denied).
+        """
+        response = self.client.get(
+            reverse("poultry:flock-mortality-curves-list"),
+            HTTP_AUTHORIZATION=f"Token {self.regular_user_token}",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -6,6 +6,24 @@ from users.choices import *
 from users.validators import *
 
 
+class Farm(models.Model):
+    """
+    Farm model representing a farm hosted by the farm management system.
+
+    Herds, barns, flocks, housing structures and inventories belong to a farm, and users only
+    work on the records of their own farm.
+
+    Fields:
+    - `name`: A unique character field representing the name of the farm.
+    - `created_at`: A date and time field representing when the farm was registered.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
 class CustomUser(AbstractUser):
     """
         Custom user model representing a user in the farm management system.
@@ -27,6 +45,7 @@ class CustomUser(AbstractUser):
         - `is_assistant_farm_manager`: A boolean field representing whether the user is an assistant farm manager.
         - `is_team_leader`: A boolean field representing whether the user is a team leader.
         - `is_farm_worker`: A boolean field representing whether the user is a farm worker.
+        - `farm`: The farm the user works on, none for a deployment hosting a single farm.
 
         Methods:
         - `assign_farm_owner()`: Assigns the user as a farm owner and updates related fields accordingly.
@@ -59,6 +78,7 @@ class CustomUser(AbstractUser):
     is_assistant_farm_manager = models.BooleanField(default=False)
     is_team_leader = models.BooleanField(default=False)
     is_farm_worker = models.BooleanField(default=False)
+    farm = models.ForeignKey(Farm, on_delete=models.SET_NULL, null=True, blank=True, related_name='members')
 
     REQUIRED_FIELDS = ['first_name', 'last_name', 'phone_number', 'sex']
 